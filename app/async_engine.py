@@ -0,0 +1,340 @@
+"""asyncio OCR engine that keeps many Drive conversions in flight on one thread."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+import mimetypes
+import ssl
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from . import concurrency
+from .constants import DRIVE_UPLOAD_PROPERTIES
+from .logger import LOGGER
+from .metrics import METRICS
+
+GOOGLE_ROOT_URL = "https://www.googleapis.com/"
+DOCUMENT_MIME = "application/vnd.google-apps.document"
+STOP_POLL_INTERVAL = 0.1
+
+
+class _Response(dict):
+    """Lower-cased response headers with a ``status`` attribute, like ``httplib2.Response``."""
+
+    def __init__(self, status: int, headers: Dict[str, str]):
+        super().__init__(headers)
+        self.status = status
+
+
+class HTTPStatusError(Exception):
+    """Non-2xx response; shaped like ``HttpError`` so ``classify_error`` understands it."""
+
+    def __init__(self, status: int, headers: Dict[str, str], content: bytes):
+        super().__init__(f"HTTP {status}: {content[:200]!r}")
+        self.resp = _Response(status, headers)
+        self.content = content
+
+
+class DriveTransport:
+    """The three Drive calls an OCR conversion needs; subclass to swap the HTTP layer."""
+
+    async def create(self, name: str, data: bytes, media_type: str, folder_id: str) -> str:
+        raise NotImplementedError
+
+    async def export_text(self, file_id: str) -> str:
+        raise NotImplementedError
+
+    async def delete(self, file_id: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return None
+
+
+class CredentialsTokenProvider:
+    """Cache an oauth2client access token, refreshing it off the event loop."""
+
+    def __init__(self, credentials, margin: float = 60.0):
+        self._credentials = credentials
+        self._margin = margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __call__(self) -> str:
+        async with self._lock:
+            if self._token is None or time.monotonic() > self._expires_at - self._margin:
+                loop = asyncio.get_running_loop()
+                info = await loop.run_in_executor(None, self._credentials.get_access_token)
+                self._token = info.access_token
+                self._expires_at = time.monotonic() + (info.expires_in or 3600)
+            return self._token
+
+
+class AsyncHttpTransport(DriveTransport):
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams.
+
+    Only the standard library is used, so the engine adds no dependency.
+    ``root_url`` can point at a local fake Drive server for tests and
+    benchmarks, in which case ``token_provider`` may be ``None``.
+    """
+
+    def __init__(
+        self,
+        token_provider: Optional[Callable[[], Awaitable[str]]] = None,
+        root_url: str = GOOGLE_ROOT_URL,
+        max_connections: int = 100,
+        timeout: float = 60.0,
+    ):
+        parts = urlsplit(root_url)
+        self._host = parts.hostname
+        self._secure = parts.scheme == "https"
+        self._port = parts.port or (443 if self._secure else 80)
+        self._prefix = parts.path.rstrip("/")
+        self._host_header = parts.netloc
+        self._token_provider = token_provider
+        self._timeout = timeout
+        self._ssl = ssl.create_default_context() if self._secure else None
+        self._idle: collections.deque = collections.deque()
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _open(self):
+        return await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port, ssl=self._ssl), self._timeout
+        )
+
+    async def _read_response(self, reader) -> Tuple[int, Dict[str, str], bytes, bool]:
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, headers, body, keep_alive
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        """Send one request and return ``(status, headers, body)``, raising on non-2xx."""
+        request_headers = {
+            "Host": self._host_header,
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive",
+        }
+        if self._token_provider is not None:
+            request_headers["Authorization"] = f"Bearer {await self._token_provider()}"
+        request_headers.update(headers or {})
+        head = f"{method} {self._prefix}{path} HTTP/1.1\r\n" + "".join(
+            f"{key}: {value}\r\n" for key, value in request_headers.items()
+        )
+        payload = head.encode("latin-1") + b"\r\n" + body
+
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                reader, writer = self._idle.popleft() if reused else await self._open()
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status, response_headers, content, keep_alive = await asyncio.wait_for(
+                        self._read_response(reader), self._timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                    writer.close()
+                    # A pooled connection may have been closed by the server while idle.
+                    if reused and attempt == 0:
+                        continue
+                    raise ConnectionError(str(exc)) from exc
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                break
+
+        if status >= 300:
+            raise HTTPStatusError(status, response_headers, content)
+        return status, response_headers, content
+
+    async def create(self, name: str, data: bytes, media_type: str, folder_id: str) -> str:
+        boundary = uuid.uuid4().hex
+        metadata = json.dumps(
+            {"name": name, "mimeType": DOCUMENT_MIME, "parents": [folder_id], "appProperties": DRIVE_UPLOAD_PROPERTIES}
+        )
+        body = b"".join(
+            [
+                f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n".encode("utf-8"),
+                metadata.encode("utf-8"),
+                f"\r\n--{boundary}\r\nContent-Type: {media_type}\r\n\r\n".encode("utf-8"),
+                data,
+                f"\r\n--{boundary}--".encode("utf-8"),
+            ]
+        )
+        _, _, content = await self.request(
+            "POST",
+            "/upload/drive/v3/files?uploadType=multipart&fields=id",
+            body,
+            {"Content-Type": f"multipart/related; boundary={boundary}"},
+        )
+        return json.loads(content)["id"]
+
+    async def export_text(self, file_id: str) -> str:
+        _, _, content = await self.request("GET", f"/drive/v3/files/{quote(file_id)}/export?mimeType=text/plain")
+        return content.decode("utf-8")
+
+    async def delete(self, file_id: str) -> None:
+        await self.request("DELETE", f"/drive/v3/files/{quote(file_id)}")
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.popleft()
+            writer.close()
+
+
+def read_image(image_path: Path) -> Tuple[bytes, str]:
+    """The bytes and MIME type to upload for ``image_path`` as it is on disk."""
+    return image_path.read_bytes(), mimetypes.guess_type(image_path.name)[0] or "application/octet-stream"
+
+
+class AsyncOCREngine:
+    """Run upload → export → delete for many images concurrently on one event loop.
+
+    ``jobs`` may be any iterable, including the blocking stream used while
+    VideoSubFinder runs; it is drained on a helper thread. Results and
+    failures are reported through ``on_result(job, raw_text)`` and
+    ``on_error(job, exc)``, which run on the loop's executor threads, so
+    their disk and cache writes never hold up the other conversions. With
+    ``discard`` set, converted files are handed to it for deletion instead
+    of being deleted before the next image is taken. ``load(path)``
+    returns the ``(bytes, mime_type)`` to upload; it runs off the loop.
+    """
+
+    def __init__(
+        self,
+        transport_factory: Callable[[], DriveTransport],
+        folder_id: str,
+        concurrency_limit: int = 200,
+        max_tries: int = concurrency.MAX_ATTEMPTS,
+        discard: Optional[Callable[[str], None]] = None,
+        load: Callable[[Path], Tuple[bytes, str]] = read_image,
+    ):
+        self._transport_factory = transport_factory
+        self._discard = discard
+        self._load = load
+        self._folder_id = folder_id
+        self._concurrency_limit = max(1, concurrency_limit)
+        self._max_tries = max_tries
+
+    def run(
+        self,
+        jobs: Iterable[Tuple],
+        on_result: Callable[[Tuple, str], None],
+        on_error: Callable[[Tuple, BaseException], None],
+        should_stop: Callable[[], bool] = lambda: False,
+    ):
+        asyncio.run(self._run(iter(jobs), on_result, on_error, should_stop))
+
+    async def _run(self, jobs, on_result, on_error, should_stop):
+        transport = self._transport_factory()
+        tasks: set = set()
+        producer = asyncio.ensure_future(self._produce(jobs, transport, tasks, on_result, on_error, should_stop))
+        try:
+            # Poll for a stop request so in-flight HTTP calls are cancelled within a fraction of a second.
+            while not producer.done() or tasks:
+                if should_stop():
+                    producer.cancel()
+                    for task in list(tasks):
+                        task.cancel()
+                    await asyncio.gather(producer, *tasks, return_exceptions=True)
+                    return
+                await asyncio.sleep(STOP_POLL_INTERVAL)
+            producer.result()
+        finally:
+            await transport.close()
+
+    async def _produce(self, jobs, transport, tasks, on_result, on_error, should_stop):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self._concurrency_limit)
+        while not should_stop():
+            job = await loop.run_in_executor(None, next, jobs, None)
+            if job is None:
+                break
+            await slots.acquire()
+            task = loop.create_task(self._process(transport, job, slots, on_result, on_error, should_stop))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    async def _process(self, transport, job, slots, on_result, on_error, should_stop):
+        image_path = Path(job[0])
+        loop = asyncio.get_running_loop()
+        try:
+            data, media_type = await loop.run_in_executor(None, self._load, image_path)
+            tries = 0
+            while True:
+                if should_stop():
+                    return
+                try:
+                    raw_text = await self._convert(transport, image_path.name, data, media_type)
+                    break
+                except Exception as exc:
+                    METRICS.error("convert", exc)
+                    tries += 1
+                    if tries >= self._max_tries or not concurrency.is_retryable(exc):
+                        raise
+                    METRICS.count("retries")
+                    kind, retry_after = concurrency.classify_error(exc)
+                    delay = concurrency.backoff_delay(tries, retry_after)
+                    if kind == "throttle":
+                        LOGGER.log(f"⏳ Drive giới hạn tốc độ, thử lại sau {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            await loop.run_in_executor(None, on_result, job, raw_text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await loop.run_in_executor(None, on_error, job, exc)
+        finally:
+            slots.release()
+
+    async def _convert(self, transport, name: str, data: bytes, media_type: str) -> str:
+        with METRICS.time("drive_create"):
+            file_id = await transport.create(name, data, media_type, self._folder_id)
+        METRICS.count("bytes_uploaded", len(data))
+        try:
+            with METRICS.time("drive_export"):
+                return await transport.export_text(file_id)
+        finally:
+            if self._discard is not None:
+                self._discard(file_id)
+            else:
+                try:
+                    with METRICS.time("drive_delete"):
+                        await transport.delete(file_id)
+                except Exception as exc:
+                    LOGGER.log(f"⚠️ Không thể xóa tệp tạm trên Drive {file_id}: {exc}")
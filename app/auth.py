@@ -1,32 +1,56 @@
 """Authentication helpers for Google Drive API access."""
 
+import threading
 from pathlib import Path
 
-import httplib2
-from apiclient import discovery
 from oauth2client import client, tools
 from oauth2client.file import Storage
 
 from .constants import APPLICATION_NAME, CLIENT_SECRET_FILE, SCOPES
 
+CREDENTIAL_PATH = Path("token.json")
+_CREDENTIALS_LOCK = threading.Lock()
+_CACHED_CREDENTIALS = None
+
+
+def load_stored_credentials():
+    """Return valid stored credentials without starting the OAuth flow."""
+    global _CACHED_CREDENTIALS
+    with _CREDENTIALS_LOCK:
+        if _CACHED_CREDENTIALS is not None and not _CACHED_CREDENTIALS.invalid:
+            return _CACHED_CREDENTIALS
+        if not CREDENTIAL_PATH.exists():
+            return None
+        credentials = Storage(str(CREDENTIAL_PATH)).get()
+        if not credentials or credentials.invalid:
+            return None
+        _CACHED_CREDENTIALS = credentials
+        return credentials
+
 
 def get_credentials(flags):
     """Obtain or refresh OAuth2 credentials."""
-    credential_path = Path("token.json")
-    store = Storage(str(credential_path))
-    credentials = store.get()
-    if not credentials or credentials.invalid:
-        flow = client.flow_from_clientsecrets(CLIENT_SECRET_FILE, SCOPES)
-        flow.user_agent = APPLICATION_NAME
-        if flags:
-            credentials = tools.run_flow(flow, store, flags)
-        else:
-            credentials = tools.run(flow, store)
-        print(f"Storing credentials to {credential_path}")
+    global _CACHED_CREDENTIALS
+    credentials = load_stored_credentials()
+    if credentials is not None:
+        return credentials
+
+    store = Storage(str(CREDENTIAL_PATH))
+    flow = client.flow_from_clientsecrets(CLIENT_SECRET_FILE, SCOPES)
+    flow.user_agent = APPLICATION_NAME
+    if flags:
+        credentials = tools.run_flow(flow, store, flags)
+    else:
+        credentials = tools.run(flow, store)
+    print(f"Storing credentials to {CREDENTIAL_PATH}")
+    with _CREDENTIALS_LOCK:
+        _CACHED_CREDENTIALS = credentials
     return credentials
 
 
 def build_drive_service(credentials):
     """Create an authorized Drive service client."""
-    http = credentials.authorize(httplib2.Http())
-    return discovery.build("drive", "v3", http=http)
+    from .drive_pool import POOL
+
+    POOL.configure(credentials)
+    return POOL.get()
@@ -0,0 +1,270 @@
+"""OCR backends that ``ocr.start_processing`` dispatches through."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import mimetypes
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from apiclient.http import MediaFileUpload, MediaIoBaseUpload
+
+from . import concurrency, drive_cleanup, drive_pool
+from .constants import DRIVE_UPLOAD_PROPERTIES
+from .logger import LOGGER
+from .metrics import METRICS
+
+DOCUMENT_MIME = drive_cleanup.DOCUMENT_MIME
+# Drive accepts simple multipart uploads up to 5 MB; larger media needs a resumable session.
+MULTIPART_MAX_BYTES = 5 * 1024 * 1024
+BACKEND_LABELS = {"drive": "Google Drive", "tesseract": "Tesseract"}
+
+
+class OCRBackend:
+    """Turn one image into text.
+
+    ``recognize`` is called from the OCR worker threads and must be thread
+    safe. Backends that do not talk to Drive disable the Drive-only
+    features through the ``supports_*`` flags.
+    """
+
+    name = ""
+    supports_mosaic = False
+    supports_async = False
+    supports_preprocess = False
+    cache_namespace = ""
+
+    def start(self):
+        """Acquire resources before the first image."""
+
+    def recognize(
+        self,
+        image_path: Path,
+        raw_txtfile: Optional[Path],
+        data: Optional[bytes] = None,
+        original: Optional[bytes] = None,
+    ) -> str:
+        """Return the text of ``image_path``; keep the raw output in ``raw_txtfile`` if given.
+
+        ``data`` is a preprocessed PNG of the image to use instead of the file.
+        ``original`` is the file's content if the caller has already read it.
+        """
+        raise NotImplementedError
+
+    def abort(self):
+        """Make blocked ``recognize`` calls fail fast; called from the stop button."""
+
+    def close(self):
+        """Release resources, abandoning queued work."""
+
+
+class DriveBackend(OCRBackend):
+    """Google Docs OCR: upload as a Google Doc, export plain text, delete.
+
+    Deletes are handed to a :class:`drive_cleanup.DriveDeleter` instead of
+    holding up the worker. With ``sweep_min_age`` set, converted docs that
+    earlier runs left in the folder are swept at start and at close.
+    """
+
+    name = "drive"
+    supports_mosaic = True
+    supports_async = True
+    supports_preprocess = True
+
+    def __init__(
+        self,
+        folder_id: str,
+        limiter: concurrency.AdaptiveLimiter,
+        multipart_max_bytes: int = MULTIPART_MAX_BYTES,
+        sweep_min_age: Optional[float] = None,
+    ):
+        self.folder_id = folder_id
+        self.limiter = limiter
+        self.multipart_max_bytes = multipart_max_bytes
+        self.sweep_min_age = sweep_min_age
+        self._deleter: Optional[drive_cleanup.DriveDeleter] = None
+        self._aborted = False
+
+    def start(self):
+        self._aborted = False
+        self._deleter = drive_cleanup.DriveDeleter()
+        self._deleter.start()
+        if self.sweep_min_age is not None:
+            drive_cleanup.sweep_in_background(self.folder_id, self.sweep_min_age, self._deleter)
+
+    def discard(self, file_id: str):
+        """Delete a converted doc later, in a batch; synchronously if the backend was never started."""
+        if self._deleter is not None:
+            self._deleter.submit(file_id)
+            return
+        with METRICS.time("drive_delete"):
+            drive_pool.POOL.get().files().delete(fileId=file_id).execute()
+
+    def convert(self, name: str, media_body, raw_txtfile: Optional[Path] = None) -> str:
+        """Convert uploaded media to a Google Doc and return the exported plain text."""
+        waited = time.perf_counter()
+        with self.limiter.slot():
+            METRICS.observe("limiter_wait", time.perf_counter() - waited)
+            return self.convert_unlimited(name, media_body, raw_txtfile)
+
+    def convert_unlimited(self, name: str, media_body, raw_txtfile: Optional[Path] = None) -> str:
+        service = drive_pool.POOL.get()
+
+        with METRICS.time("drive_create"):
+            res = (
+                service.files()
+                .create(
+                    body={
+                        "name": name,
+                        "mimeType": DOCUMENT_MIME,
+                        "parents": [self.folder_id],
+                        "appProperties": DRIVE_UPLOAD_PROPERTIES,
+                    },
+                    media_body=media_body,
+                    fields="id",
+                )
+                .execute()
+            )
+        METRICS.count("bytes_uploaded", media_body.size() or 0)
+
+        try:
+            # files.export has no response schema, so execute() hands back the raw bytes.
+            with METRICS.time("drive_export"):
+                raw_text = service.files().export(fileId=res["id"], mimeType="text/plain").execute().decode("utf-8")
+        finally:
+            self.discard(res["id"])
+
+        if raw_txtfile is not None:
+            with METRICS.time("disk_write"), open(raw_txtfile, "w", encoding="utf-8") as raw_text_file:
+                raw_text_file.write(raw_text)
+        return raw_text
+
+    def media_body(self, image_path: Path, data: Optional[bytes] = None, original: Optional[bytes] = None):
+        """Upload small images from memory in one multipart request, large ones resumably.
+
+        Bytes already in memory, the preprocessed ``data`` or the ``original``
+        read for the cache lookup, are uploaded as they are instead of reading
+        the file again.
+        """
+        if data is not None:
+            resumable = len(data) > self.multipart_max_bytes
+            return MediaIoBaseUpload(io.BytesIO(data), mimetype="image/png", resumable=resumable)
+        mimetype = mimetypes.guess_type(image_path.name)[0] or "application/octet-stream"
+        if original is not None:
+            resumable = len(original) > self.multipart_max_bytes
+            return MediaIoBaseUpload(io.BytesIO(original), mimetype=mimetype, resumable=resumable)
+        if image_path.stat().st_size <= self.multipart_max_bytes:
+            return MediaIoBaseUpload(io.BytesIO(image_path.read_bytes()), mimetype=mimetype, resumable=False)
+        return MediaFileUpload(str(image_path.absolute()), mimetype=mimetype, resumable=True)
+
+    def abort(self):
+        self._aborted = True
+        drive_pool.POOL.abort()
+
+    def close(self):
+        """Delete the queued docs and sweep once more; after a stop, leave them to the next run's sweep."""
+        deleter, self._deleter = self._deleter, None
+        if deleter is None:
+            return
+        if not self._aborted and self.sweep_min_age is not None:
+            try:
+                drive_cleanup.sweep_folder(self.folder_id, self.sweep_min_age, deleter)
+            except Exception as exc:
+                LOGGER.log(f"⚠️ Không thể dọn thư mục Drive: {exc}")
+        if not deleter.close(drain=not self._aborted):
+            LOGGER.log("⚠️ Chưa xóa xong các tệp tạm trên Drive; lần chạy sau sẽ dọn tiếp.")
+        if deleter.deleted or deleter.abandoned:
+            LOGGER.log(f"🗑️ Đã xóa {deleter.deleted} tệp tạm trên Drive, bỏ lại {deleter.abandoned}.")
+
+    def recognize(
+        self,
+        image_path: Path,
+        raw_txtfile: Optional[Path],
+        data: Optional[bytes] = None,
+        original: Optional[bytes] = None,
+    ) -> str:
+        text_content = self.convert(str(image_path.name), self.media_body(image_path, data, original), raw_txtfile)
+        return "".join(text_content.split("\n")[2:])
+
+
+def _init_tesseract(tesseract_cmd: str):
+    import pytesseract
+
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _tesseract_image_to_string(image_path: str, lang: str) -> str:
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        return pytesseract.image_to_string(image, lang=lang)
+
+
+class TesseractBackend(OCRBackend):
+    """Offline OCR with Tesseract, one worker process per CPU core."""
+
+    name = "tesseract"
+    cache_namespace = "tesseract:"
+
+    def __init__(self, lang: str = "vie", tesseract_cmd: str = "", workers: Optional[int] = None):
+        self.lang = lang
+        self.tesseract_cmd = tesseract_cmd
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def start(self):
+        try:
+            import pytesseract
+        except ImportError as exc:
+            raise RuntimeError("Chưa cài đặt pytesseract (pip install pytesseract).") from exc
+        if self.tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        pytesseract.get_tesseract_version()
+
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_tesseract,
+            initargs=(self.tesseract_cmd,),
+        )
+
+    def recognize(
+        self,
+        image_path: Path,
+        raw_txtfile: Optional[Path],
+        data: Optional[bytes] = None,
+        original: Optional[bytes] = None,
+    ) -> str:
+        with METRICS.time("tesseract"):
+            raw_text = self._executor.submit(_tesseract_image_to_string, str(image_path), self.lang).result()
+        if raw_txtfile is not None:
+            with METRICS.time("disk_write"), open(raw_txtfile, "w", encoding="utf-8") as raw_text_file:
+                raw_text_file.write(raw_text)
+        return " ".join(line.strip() for line in raw_text.splitlines() if line.strip())
+
+    def abort(self):
+        # Queued images are cancelled; images already inside Tesseract finish on their own.
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def resolve_backend_name(settings, profile_backends=None, profile_name: Optional[str] = None) -> str:
+    """Pick the crop profile's backend if it has one, otherwise the run default."""
+    name = (profile_backends or {}).get(profile_name or "", "") or settings["ocr_backend"]
+    return name if name in BACKEND_LABELS else "drive"
+
+
+def create_backend(name: str, settings, folder_id: str, limiter: concurrency.AdaptiveLimiter) -> OCRBackend:
+    if name == "tesseract":
+        return TesseractBackend(settings["tesseract_lang"], settings["tesseract_cmd"])
+    sweep_min_age = settings["drive_orphan_min_age_minutes"] * 60 if settings["drive_sweep_orphans"] else None
+    return DriveBackend(folder_id, limiter, settings["multipart_upload_max_kb"] * 1024, sweep_min_age)
@@ -0,0 +1,272 @@
+"""Headless entry point: videos in, SRT files out, no Tk.
+
+Usage: python -m app.cli VIDEO [VIDEO ...] --profile sextop [--threads 20] [--backend drive]
+
+Several videos are processed as one batch: VideoSubFinder runs on a few of
+them at once while a shared OCR pool works through the ones already extracted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from . import backends, ocr, reporting, scheduler, segments, streaming, video_utils, vsf
+from .config_manager import load_config, load_pipeline_settings, load_profile_backends
+from .logger import LOGGER
+from .metrics import METRICS
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+EXIT_INTERRUPTED = 130
+
+
+def _oauth_parents() -> List[argparse.ArgumentParser]:
+    try:
+        from oauth2client import tools
+
+        return [tools.argparser]
+    except Exception:
+        return []
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Trích phụ đề cứng từ video bằng VideoSubFinder và OCR, không cần giao diện.",
+        parents=_oauth_parents(),
+        epilog=(
+            "Mã thoát: 0 thành công, 1 có video thất bại, 2 sai tham số, "
+            "3 xong nhưng một số ảnh OCR lỗi, 130 bị dừng (Ctrl+C)."
+        ),
+    )
+    parser.add_argument("videos", nargs="+", type=Path, help="Video cần trích phụ đề")
+    crop = parser.add_mutually_exclusive_group(required=True)
+    crop.add_argument("--profile", help="Tên profile cắt ảnh trong config.ini (vd: sextop)")
+    crop.add_argument(
+        "--crop",
+        nargs=4,
+        type=float,
+        metavar=("TOP", "BOTTOM", "LEFT", "RIGHT"),
+        help="Toạ độ cắt tuỳ chỉnh, giống các ô trong giao diện",
+    )
+    parser.add_argument("--threads", type=int, help="Số luồng OCR (mặc định theo config.ini)")
+    parser.add_argument("--backend", choices=sorted(backends.BACKEND_LABELS), help="Công cụ OCR")
+    parser.add_argument("--vsf", help="Đường dẫn VideoSubFinder (mặc định theo config.ini)")
+    parser.add_argument("--output-dir", type=Path, help="Thư mục lưu SRT (mặc định cạnh video)")
+    parser.add_argument("--stream", action="store_true", help="OCR song song trong lúc VideoSubFinder chạy")
+    parser.add_argument(
+        "--vsf-workers",
+        type=int,
+        help="Số VideoSubFinder chạy cùng lúc khi xử lý nhiều video (mặc định theo số nhân CPU)",
+    )
+    parser.add_argument("--resume", action="store_true", help="Tiếp tục lần chạy dở theo nhật ký")
+    parser.add_argument("--verbose", action="store_true", help="In toàn bộ log ra stdout, tiến độ in từng dòng ra stderr")
+    return parser
+
+
+def _exit_code(saved: bool, failed: int) -> int:
+    if not saved:
+        return EXIT_FAILED
+    if failed:
+        LOGGER.log(f"⚠️ {failed} ảnh OCR lỗi, chạy lại với --resume để thử lại.")
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def _merge_exit_codes(codes) -> int:
+    # A failed video outranks a partial one; neither stops the remaining videos.
+    exit_code = EXIT_OK
+    for code in codes:
+        if code == EXIT_FAILED or exit_code == EXIT_OK:
+            exit_code = code
+    return exit_code
+
+
+def _subtitle_path(video: Path, args) -> Path:
+    return (args.output_dir or video.parent) / f"{video.stem}.srt"
+
+
+def _output_base(video: Path) -> str:
+    return str(video.with_suffix("")) + "_out"
+
+
+def process_video(
+    video: Path,
+    args,
+    crop_values,
+    vsf_path: str,
+    delete_flags,
+    backend_name: str,
+    reporter: reporting.Reporter,
+) -> int:
+    """Extract and OCR one video; return its exit code."""
+    if not video.exists():
+        LOGGER.log(f"❌ Lỗi: Không tìm thấy video: {video}")
+        reporter.error("Lỗi", f"Không tìm thấy video: {video}")
+        return EXIT_FAILED
+
+    subtitle_path = _subtitle_path(video, args)
+    LOGGER.set_log_file(str(subtitle_path.with_suffix(".log")))
+    METRICS.reset()
+    output_base = _output_base(video)
+    rgb_images_folder = str(Path(output_base) / "RGBImages")
+    duration = video_utils.get_video_duration_opencv(str(video)) or "00:00:00"
+    command = vsf.build_command(vsf_path, str(video), output_base, *crop_values, False)
+    segment_plan = segments.plan_for_video(load_pipeline_settings(), duration)
+    delete_raw_texts, delete_texts, nen_raw_texts = delete_flags
+
+    def run_ocr(image_stream=None):
+        return ocr.start_processing(
+            reporter,
+            str(subtitle_path),
+            rgb_images_folder,
+            delete_raw_texts,
+            delete_texts,
+            nen_raw_texts,
+            args,
+            image_stream=image_stream,
+            backend_name=backend_name,
+            resume=args.resume,
+            threads=args.threads,
+        )
+
+    if args.stream:
+        image_stream = streaming.ImageStream()
+        result = {}
+        ocr_thread = threading.Thread(target=lambda: result.update(saved=run_ocr(image_stream)), daemon=True)
+        ocr_thread.start()
+        vsf.extract_images(
+            reporter,
+            command,
+            output_base,
+            "RGBImages",
+            duration,
+            image_stream=image_stream,
+            segment_plan=segment_plan,
+        )
+        ocr_thread.join()
+        saved = result.get("saved", False)
+    else:
+        extracted = vsf.extract_images(
+            reporter,
+            command,
+            output_base,
+            "RGBImages",
+            duration,
+            warm_up_clients=args.threads,
+            segment_plan=segment_plan,
+        )
+        if not extracted:
+            return EXIT_FAILED
+        saved = run_ocr()
+
+    return _exit_code(saved, ocr.JOB.failed if ocr.JOB is not None else 0)
+
+
+def process_batch(videos: List[Path], args, crop_values, vsf_path: str, delete_flags, backend_name: str) -> int:
+    """Extract and OCR several videos through one :class:`scheduler.PipelineScheduler`."""
+    codes = []
+    video_jobs = []
+    for index, video in enumerate(videos, start=1):
+        reporter = reporting.ConsoleReporter(
+            sys.stderr, prefix=f"[{index}/{len(videos)}] {video.name}: ", redraw=not args.verbose
+        )
+        if not video.exists():
+            LOGGER.log(f"❌ Lỗi: Không tìm thấy video: {video}")
+            reporter.error("Lỗi", f"Không tìm thấy video: {video}")
+            codes.append(EXIT_FAILED)
+            continue
+        output_base = _output_base(video)
+        video_jobs.append(
+            scheduler.VideoJob(
+                video,
+                vsf.build_command(vsf_path, str(video), output_base, *crop_values, False),
+                output_base,
+                _subtitle_path(video, args),
+                video_utils.get_video_duration_opencv(str(video)) or "00:00:00",
+                reporter,
+            )
+        )
+    if not video_jobs:
+        return EXIT_FAILED
+
+    LOGGER.set_log_file(str(_subtitle_path(video_jobs[0].video, args).with_name("batch.log")))
+    batch = scheduler.PipelineScheduler(
+        args,
+        delete_flags,
+        backend_name=backend_name,
+        threads=args.threads,
+        extraction_workers=args.vsf_workers,
+        resume=args.resume,
+    )
+    batch.run(video_jobs)
+    for video_job in video_jobs:
+        video_job.reporter.finished()
+        codes.append(_exit_code(video_job.saved, video_job.failed))
+    for line in scheduler.format_report(video_jobs, batch.wall_seconds):
+        print(line, file=sys.stderr)
+    return _merge_exit_codes(codes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        LOGGER.set_stream(sys.stdout)
+
+    _, delete_raw_texts, delete_texts, nen_raw_texts, vsf_path, threads, crop_profiles = load_config()
+    vsf_path = args.vsf or vsf_path
+    args.threads = args.threads or threads
+    if not vsf_path:
+        print("Chưa cấu hình đường dẫn VideoSubFinder (dùng --vsf).", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.profile is not None:
+        if args.profile not in crop_profiles:
+            print(f"Không có profile '{args.profile}'. Có: {', '.join(crop_profiles)}", file=sys.stderr)
+            return EXIT_USAGE
+        profile = crop_profiles[args.profile]
+        crop_values = (profile["top"], profile["bottom"], profile["left"], profile["right"])
+    else:
+        crop_values = tuple(args.crop)
+
+    backend_name = args.backend or backends.resolve_backend_name(
+        load_pipeline_settings(), load_profile_backends(), args.profile
+    )
+
+    delete_flags = (delete_raw_texts, delete_texts, nen_raw_texts)
+    try:
+        if len(args.videos) > 1 and not args.stream:
+            return process_batch(args.videos, args, crop_values, vsf_path, delete_flags, backend_name)
+
+        codes = []
+        for index, video in enumerate(args.videos, start=1):
+            reporter = reporting.ConsoleReporter(
+                sys.stderr, prefix=f"[{index}/{len(args.videos)}] {video.name}: ", redraw=not args.verbose
+            )
+            code = process_video(
+                video,
+                args,
+                crop_values,
+                vsf_path,
+                delete_flags,
+                backend_name,
+                reporter,
+            )
+            reporter.finished()
+            codes.append(code)
+    except KeyboardInterrupt:
+        ocr.request_stop()
+        vsf.cancel_all()
+        print("\nĐã dừng.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    return _merge_exit_codes(codes)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""AIMD concurrency control and backoff for Drive requests."""
+
+from __future__ import annotations
+
+import contextlib
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import httplib2
+
+from .logger import LOGGER
+
+
+class Cancelled(Exception):
+    """Raised by :meth:`AdaptiveLimiter.acquire` once the run has been stopped."""
+
+
+# Attempts at one Drive conversion, first try included, before the image is given up on.
+MAX_ATTEMPTS = 6
+THROTTLE_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded", "dailyLimitExceeded"})
+# Error kinds worth another attempt; anything else (a 400, a plain 403, a bad image) fails the same way again.
+RETRYABLE_KINDS = frozenset({"throttle", "server", "network"})
+# OSErrors about the local file rather than the connection.
+_LOCAL_ERRORS = (FileNotFoundError, IsADirectoryError, NotADirectoryError, PermissionError)
+
+
+def classify_error(exc: BaseException) -> Tuple[str, Optional[float]]:
+    """Return ``(kind, retry_after)`` for a failed request.
+
+    ``kind`` is ``"throttle"`` for 429 and rate-limit 403s, ``"server"`` for
+    5xx, ``"network"`` for socket and HTTP transport failures and ``"other"``
+    otherwise, including errors reading a local file.
+    """
+    resp = getattr(exc, "resp", None)
+    status = getattr(resp, "status", None)
+    if status is None:
+        if isinstance(exc, _LOCAL_ERRORS):
+            return "other", None
+        if isinstance(exc, (socket.timeout, OSError, http.client.HTTPException, httplib2.HttpLib2Error)):
+            return "network", None
+        return "other", None
+
+    retry_after = None
+    header = resp.get("retry-after") if hasattr(resp, "get") else None
+    if header:
+        try:
+            retry_after = float(header)
+        except ValueError:
+            retry_after = None
+
+    status = int(status)
+    if status == 429:
+        return "throttle", retry_after
+    if status == 403 and _error_reason(exc) in THROTTLE_REASONS:
+        return "throttle", retry_after
+    if status >= 500:
+        return "server", retry_after
+    return "other", retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether another attempt at the request could succeed."""
+    return classify_error(exc)[0] in RETRYABLE_KINDS
+
+
+def _error_reason(exc: BaseException) -> Optional[str]:
+    content = getattr(exc, "content", b"") or b""
+    try:
+        payload = json.loads(content.decode("utf-8") if isinstance(content, bytes) else content)
+        return payload["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None, base: float = 1.0, cap: float = 64.0) -> float:
+    """Exponential backoff with full jitter, never shorter than ``Retry-After``."""
+    delay = random.uniform(0, min(cap, base * (2 ** max(0, attempt - 1))))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    Every success adds ``1 / limit`` to the limit, so it grows by one per
+    full window of successes. Throttling and server errors halve it, at
+    most once per cooldown so a burst of simultaneous 429s counts once.
+    Latency well above the best observed latency shrinks it gently.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease_factor: float = 0.5,
+        latency_factor: float = 3.0,
+        cooldown: float = 2.0,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._decrease_factor = decrease_factor
+        self._latency_factor = latency_factor
+        self._cooldown = cooldown
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._latency_floor: Optional[float] = None
+        self._aborted = False
+        self.throttled = 0
+        self.history: List[Tuple[float, int, str]] = [(time.time(), int(self._limit), "start")]
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                if self._aborted:
+                    raise Cancelled()
+                self._condition.wait()
+            if self._aborted:
+                raise Cancelled()
+            self._in_flight += 1
+
+    def abort(self):
+        """Wake every waiting worker and refuse new slots."""
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold one request slot, feeding the outcome back into the limit."""
+        self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as exc:
+            self.on_failure(exc)
+            raise
+        else:
+            self.on_success(time.perf_counter() - started)
+        finally:
+            self.release()
+
+    def _set_limit(self, value: float, reason: str):
+        old = int(self._limit)
+        self._limit = min(float(self.maximum), max(float(self.minimum), value))
+        new = int(self._limit)
+        if new != old:
+            self.history.append((time.time(), new, reason))
+            LOGGER.log(f"⚖️ Giới hạn yêu cầu đồng thời: {old} → {new} ({reason})")
+            self._condition.notify_all()
+
+    def on_success(self, latency: float):
+        with self._condition:
+            self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+            if self._latency_floor is None:
+                self._latency_floor = latency
+            else:
+                # Track the best latency seen, but let it drift back up so one lucky request
+                # does not keep the limit pinned down forever.
+                drifted = self._latency_floor + 0.01 * (self._latency_ewma - self._latency_floor)
+                self._latency_floor = min(latency, drifted)
+            if self._latency_ewma > self._latency_factor * self._latency_floor and self._can_decrease():
+                self._set_limit(self._limit * 0.9, "latency")
+                return
+            self._set_limit(self._limit + 1.0 / self._limit, "increase")
+
+    def on_failure(self, exc: BaseException):
+        kind, _ = classify_error(exc)
+        if kind not in ("throttle", "server"):
+            return
+        with self._condition:
+            if kind == "throttle":
+                self.throttled += 1
+            if self._can_decrease():
+                self._set_limit(self._limit * self._decrease_factor, kind)
+
+    def _can_decrease(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_decrease < self._cooldown:
+            return False
+        self._last_decrease = now
+        return True
+
+    def summary(self) -> str:
+        limits = [limit for _, limit, _ in self.history]
+        return (
+            f"giới hạn cuối {self.limit}, thấp nhất {min(limits)}, cao nhất {max(limits)}, "
+            f"{len(self.history) - 1} lần thay đổi, {self.throttled} lần bị giới hạn tốc độ"
+        )
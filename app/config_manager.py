@@ -9,6 +9,7 @@ from typing import Dict, Tuple
 
 from .constants import (
     DEFAULT_FOLDER_ID,
+    DEFAULT_PIPELINE_SETTINGS,
     DEFAULT_THREADS,
     DEFAULT_VIDEOSUBFINDER_PATH,
 )
@@ -85,6 +86,52 @@ def load_config() -> Tuple[str, bool, bool, bool, str, int, Dict[str, Dict[str,
     )
 
 
+def load_pipeline_settings() -> Dict[str, object]:
+    """Read the optional [pipeline] section, typed after DEFAULT_PIPELINE_SETTINGS."""
+    config = configparser.ConfigParser()
+    config_path = Path("config.ini")
+    if config_path.exists():
+        config.read(config_path)
+
+    settings = dict(DEFAULT_PIPELINE_SETTINGS)
+    if "pipeline" not in config:
+        return settings
+
+    section = config["pipeline"]
+    for key, default in DEFAULT_PIPELINE_SETTINGS.items():
+        try:
+            if isinstance(default, bool):
+                settings[key] = section.getboolean(key, fallback=default)
+            elif isinstance(default, int):
+                settings[key] = section.getint(key, fallback=default)
+            elif isinstance(default, float):
+                settings[key] = section.getfloat(key, fallback=default)
+            else:
+                settings[key] = section.get(key, fallback=default)
+        except ValueError:
+            settings[key] = default
+    return settings
+
+
+def load_profile_backends() -> Dict[str, str]:
+    """Return the OCR backend pinned to each crop profile, if any."""
+    config = configparser.ConfigParser()
+    config_path = Path("config.ini")
+    if config_path.exists():
+        config.read(config_path)
+
+    backends: Dict[str, str] = {}
+    if "crop_profiles" not in config:
+        return backends
+    section = config["crop_profiles"]
+    for profile_name in list(DEFAULT_CROP_PROFILES) + ["custom"]:
+        profile_key = profile_name.replace(", ", "_").lower()
+        backend = section.get(f"{profile_key}_backend", fallback="").strip().lower()
+        if backend:
+            backends[profile_name] = backend
+    return backends
+
+
 def save_config(
     folder_id: str,
     delete_raw_texts: bool,
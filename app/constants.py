@@ -5,6 +5,10 @@ from pathlib import Path
 SCOPES = "https://www.googleapis.com/auth/drive"
 CLIENT_SECRET_FILE = "credentials.json"
 APPLICATION_NAME = "Drive API Python Quickstart"
+# The tool is "SEGG OCR Tool" (see the window title); files and metric names it writes start with this.
+APP_SLUG = "segg_ocr"
+# Set on every doc uploaded for OCR, so the orphan sweep only ever finds the app's own uploads.
+DRIVE_UPLOAD_PROPERTIES = {APP_SLUG: "upload"}
 
 DEFAULT_FOLDER_ID = ""
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -12,3 +16,44 @@ DEFAULT_VIDEOSUBFINDER_PATH = str(
     (PROJECT_ROOT / "video-app" / "VideoSubFinderWXW_intel.exe").resolve()
 )
 DEFAULT_THREADS = 20
+IMAGE_EXTENSIONS = frozenset({".jpeg", ".jpg", ".png", ".bmp", ".gif"})
+STREAM_QUEUE_SIZE = 256
+LOG_VIEW_MAX_LINES = 2000
+
+OCR_CACHE_PATH = Path("ocr_cache.sqlite3")
+
+# Tunables read from the optional [pipeline] section of config.ini.
+DEFAULT_PIPELINE_SETTINGS = {
+    "ocr_cache": True,
+    "ocr_cache_max_mb": 64,
+    "ocr_cache_max_age_days": 90,
+    # Off by default: merging near-identical frames changes which images are OCR'd and the SRT's lines and times.
+    "dedupe_frames": False,
+    "dedupe_max_distance": 16,
+    "dedupe_max_gap_ms": 250,
+    "mosaic_batch_size": 1,
+    "adaptive_concurrency": True,
+    "max_threads": 64,
+    "ocr_engine": "threads",
+    "async_concurrency": 200,
+    "ocr_backend": "drive",
+    "tesseract_lang": "vie",
+    "tesseract_cmd": "",
+    "multipart_upload_max_kb": 5120,
+    "vsf_workers": 0,
+    # Time segments of one video extracted by parallel VideoSubFinder processes; 0 picks one per two cores.
+    "vsf_segments": 1,
+    "vsf_segment_overlap_ms": 2000,
+    "vsf_min_segment_seconds": 120,
+    "progress_updates_per_second": 10,
+    # Off by default: cropped, downscaled uploads can change Drive's OCR text for the same image.
+    "preprocess_images": False,
+    "preprocess_binarize": False,
+    "preprocess_min_text_height": 32,
+    "preprocess_workers": 0,
+    "drive_sweep_orphans": True,
+    # Younger docs may still be in flight in another copy of the app.
+    "drive_orphan_min_age_minutes": 10,
+    # Empty means Google; a local fake Drive server for offline benchmarks.
+    "drive_root_url": "",
+}
@@ -0,0 +1,119 @@
+"""Collapse consecutive near-identical subtitle frames before OCR."""
+
+from __future__ import annotations
+
+import concurrent.futures
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from . import timecodes
+
+HASH_ROWS = 8
+HASH_COLUMNS = 32
+
+
+def _crop_to_content(pixels: np.ndarray, threshold: int = 40) -> np.ndarray:
+    """Trim uniform background so the hash describes the glyphs, not the margins."""
+    background = np.median(pixels)
+    mask = np.abs(pixels.astype(np.int16) - background) > threshold
+    rows = np.flatnonzero(mask.any(axis=1))
+    columns = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0 or columns.size == 0:
+        return pixels
+    return pixels[rows[0] : rows[-1] + 1, columns[0] : columns[-1] + 1]
+
+
+def dhash(image_path, rows: int = HASH_ROWS, columns: int = HASH_COLUMNS) -> int:
+    """Difference hash of the text area as a ``rows * columns``-bit integer.
+
+    Subtitle strips are wide and short, so the grid is wide as well; a
+    square 8x8 hash would blur whole words into a single cell.
+    """
+    with Image.open(image_path) as image:
+        pixels = np.asarray(image.convert("L"), dtype=np.uint8)
+    content = Image.fromarray(_crop_to_content(pixels))
+    small = np.asarray(content.resize((columns + 1, rows), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(left: int, right: int) -> int:
+    return bin(left ^ right).count("1")
+
+
+class FrameGroup:
+    """Time-adjacent frames that show the same subtitle line."""
+
+    __slots__ = ("members", "representative", "start_ms", "end_ms")
+
+    def __init__(self, path: Path, times: Optional[Tuple[int, int]]):
+        self.members: List[Path] = [path]
+        self.representative = path
+        self.start_ms, self.end_ms = times if times else (None, None)
+
+    @property
+    def time_range(self) -> Optional[Tuple[int, int]]:
+        if self.start_ms is None:
+            return None
+        return self.start_ms, self.end_ms
+
+
+def _safe_dhash(path: Path) -> Optional[int]:
+    try:
+        return dhash(path)
+    except Exception:
+        return None
+
+
+def group_frames(
+    images: Iterable[Path],
+    max_distance: int = 16,
+    max_gap_ms: int = 250,
+    workers: int = 8,
+    times: Optional[Sequence[Optional[Tuple[int, int]]]] = None,
+) -> List[FrameGroup]:
+    """Group time-adjacent images whose dHashes differ by at most ``max_distance`` of 256 bits.
+
+    Images are ordered by start time. Each group's representative is its
+    longest-lasting member and its time range covers every member.
+    ``times`` holds the already parsed time range of each image, if known.
+    """
+    paths = list(images)
+    if times is None:
+        times = [timecodes.parse_vsf_name(path.name) for path in paths]
+    timed = list(zip(paths, times))
+    timed.sort(key=lambda item: (item[1] is None, item[1] or (0, 0), item[0].name))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        hashes: Sequence[Optional[int]] = list(executor.map(_safe_dhash, (path for path, _ in timed)))
+
+    groups: List[FrameGroup] = []
+    previous_hash: Optional[int] = None
+    best_duration = -1
+    for (path, times), frame_hash in zip(timed, hashes):
+        group = groups[-1] if groups else None
+        joinable = (
+            group is not None
+            and times is not None
+            and group.end_ms is not None
+            and frame_hash is not None
+            and previous_hash is not None
+            and times[0] - group.end_ms <= max_gap_ms
+            and hamming(frame_hash, previous_hash) <= max_distance
+        )
+        duration = times[1] - times[0] if times else 0
+        if joinable:
+            group.members.append(path)
+            group.start_ms = min(group.start_ms, times[0])
+            group.end_ms = max(group.end_ms, times[1])
+            if duration > best_duration:
+                group.representative = path
+                best_duration = duration
+        else:
+            groups.append(FrameGroup(path, times))
+            best_duration = duration
+        previous_hash = frame_hash
+    return groups
@@ -0,0 +1,202 @@
+"""Delete converted Google Docs in the background and sweep the ones earlier runs left behind."""
+
+from __future__ import annotations
+
+import datetime
+import queue
+import threading
+import time
+from typing import Optional
+
+from apiclient.errors import HttpError
+
+from . import concurrency, drive_pool
+from .constants import DRIVE_UPLOAD_PROPERTIES
+from .logger import LOGGER
+from .metrics import METRICS
+
+DOCUMENT_MIME = "application/vnd.google-apps.document"
+# Drive rejects batch requests holding more calls than this.
+BATCH_LIMIT = 100
+
+_STOP = object()
+
+
+class DriveDeleter:
+    """Delete Drive files on one background thread, up to :data:`BATCH_LIMIT` per batch request.
+
+    :meth:`submit` only queues the id, so an OCR worker takes its next
+    image as soon as the text is exported instead of waiting one more
+    round trip. Ids arriving within ``linger`` seconds of each other share
+    a batch. Failed deletes are retried a few times; whatever is still
+    left is found by :func:`sweep_folder` on a later run.
+    """
+
+    def __init__(self, batch_limit: int = BATCH_LIMIT, linger: float = 0.05, max_attempts: int = 3):
+        self.batch_limit = max(1, min(batch_limit, BATCH_LIMIT))
+        self.linger = linger
+        self.max_attempts = max_attempts
+        self.deleted = 0
+        self.abandoned = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._drain = True
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="drive-deleter", daemon=True)
+        self._thread.start()
+
+    def submit(self, file_id: str, attempt: int = 1):
+        self._queue.put((file_id, attempt))
+
+    def close(self, drain: bool = True, timeout: float = 30.0) -> bool:
+        """Stop the thread, first deleting what is queued unless ``drain`` is false.
+
+        Returns ``False`` if the thread was still busy after ``timeout`` seconds.
+        """
+        if self._thread is None:
+            return True
+        self._drain = drain
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        finished = not self._thread.is_alive()
+        self._thread = None
+        return finished
+
+    def _loop(self):
+        stopping = False
+        while True:
+            if stopping:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+            else:
+                item = self._queue.get()
+            if item is _STOP:
+                stopping = True
+                continue
+            if stopping and not self._drain:
+                self.abandoned += 1
+                continue
+
+            batch = [item]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_limit:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if stopping or remaining <= 0:
+                        item = self._queue.get_nowait()
+                    else:
+                        item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    continue
+                batch.append(item)
+            self._delete(batch)
+
+    def _delete(self, batch):
+        """Send one batch request; failed ids go back on the queue with their attempt count raised."""
+        failed = []
+
+        def on_response(file_id, _response, exc):
+            if exc is None or (isinstance(exc, HttpError) and exc.resp.status == 404):
+                self.deleted += 1
+                METRICS.count("files_deleted")
+            else:
+                METRICS.error("drive_delete", exc)
+                failed.append((file_id, exc))
+
+        attempts = dict(batch)
+        try:
+            service = drive_pool.POOL.get()
+            request = service.new_batch_http_request(callback=on_response)
+            for file_id, _ in batch:
+                request.add(service.files().delete(fileId=file_id), request_id=file_id)
+            with METRICS.time("drive_delete_batch"):
+                request.execute()
+        except Exception as exc:
+            drive_pool.POOL.discard()
+            METRICS.error("drive_delete", exc)
+            failed = [(file_id, exc) for file_id, _ in batch]
+
+        delay = 0.0
+        for file_id, exc in failed:
+            attempt = attempts[file_id]
+            if attempt >= self.max_attempts:
+                self.abandoned += 1
+                LOGGER.log(f"⚠️ Không thể xóa tệp tạm trên Drive {file_id}: {exc}")
+                continue
+            _, retry_after = concurrency.classify_error(exc)
+            delay = max(delay, concurrency.backoff_delay(attempt, retry_after, cap=8.0))
+            self.submit(file_id, attempt + 1)
+        if delay and self._drain:
+            time.sleep(delay)
+
+
+def _created(entry) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(entry["createdTime"].replace("Z", "+00:00"))
+
+
+def _uploaded_by_us(entry) -> bool:
+    properties = entry.get("appProperties") or {}
+    return all(properties.get(key) == value for key, value in DRIVE_UPLOAD_PROPERTIES.items())
+
+
+def sweep_folder(folder_id: str, min_age_seconds: float, deleter: DriveDeleter) -> int:
+    """Queue for deletion the converted docs in ``folder_id`` older than ``min_age_seconds``.
+
+    Only Google Docs tagged with :data:`constants.DRIVE_UPLOAD_PROPERTIES` are
+    touched, so the user's own docs in the folder are never matched. The
+    age limit keeps conversions still in flight in another copy of the app
+    out of reach.
+    Returns how many stale docs were found.
+    """
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=min_age_seconds)
+    tags = "".join(
+        f" and appProperties has {{ key='{key}' and value='{value}' }}" for key, value in DRIVE_UPLOAD_PROPERTIES.items()
+    )
+    query = (
+        f"'{folder_id}' in parents and mimeType = '{DOCUMENT_MIME}' and trashed = false "
+        f"and createdTime < '{cutoff.strftime('%Y-%m-%dT%H:%M:%S')}'{tags}"
+    )
+    service = drive_pool.POOL.get()
+    found = 0
+    page_token = None
+    while True:
+        response = (
+            service.files()
+            .list(
+                q=query,
+                fields="nextPageToken, files(id, name, createdTime, appProperties)",
+                pageSize=1000,
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        for entry in response.get("files", []):
+            if _uploaded_by_us(entry) and _created(entry) < cutoff:
+                deleter.submit(entry["id"])
+                found += 1
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return found
+
+
+def sweep_in_background(folder_id: str, min_age_seconds: float, deleter: DriveDeleter) -> threading.Thread:
+    """Run :func:`sweep_folder` on a daemon thread, logging what it finds."""
+
+    def _sweep():
+        try:
+            found = sweep_folder(folder_id, min_age_seconds, deleter)
+        except Exception as exc:
+            LOGGER.log(f"⚠️ Không thể dọn thư mục Drive: {exc}")
+            return
+        if found:
+            LOGGER.log(f"🧹 Đã tìm thấy {found} tệp tạm còn sót trên Drive từ lần chạy trước, đang xóa.")
+
+    thread = threading.Thread(target=_sweep, name="drive-sweep", daemon=True)
+    thread.start()
+    return thread
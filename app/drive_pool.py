@@ -0,0 +1,180 @@
+"""Pool of authorized Drive service clients shared by the OCR workers."""
+
+from __future__ import annotations
+
+import copy
+import json
+import socket
+import threading
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import httplib2
+from apiclient import discovery
+
+from . import auth
+from .config_manager import load_pipeline_settings
+from .logger import LOGGER
+
+DISCOVERY_DOCUMENT_PATH = Path(__file__).resolve().parent / "discovery" / "drive_v3.json"
+HTTP_TIMEOUT = 60
+
+
+@lru_cache(maxsize=None)
+def _load_discovery_document() -> dict:
+    with DISCOVERY_DOCUMENT_PATH.open("r", encoding="utf-8") as document:
+        return json.load(document)
+
+
+def discovery_document(root_url: Optional[str] = None) -> dict:
+    """Return the bundled Drive v3 discovery document, optionally re-rooted."""
+    document = _load_discovery_document()
+    if not root_url:
+        return document
+    document = copy.deepcopy(document)
+    root_url = root_url.rstrip("/") + "/"
+    document["rootUrl"] = root_url
+    document["baseUrl"] = root_url + document["servicePath"]
+    return document
+
+
+def _refuse_connect():
+    raise ConnectionAbortedError("Drive connection aborted")
+
+
+class _TrackedConnections(dict):
+    """``Http.connections`` that also records every connection httplib2 opens in the pool.
+
+    Worker threads mutate this dict while they make requests, so :meth:`DriveClientPool.abort`
+    reads the pool's lock-protected registry instead of iterating it.
+    """
+
+    def __init__(self, pool: "DriveClientPool"):
+        super().__init__()
+        self._pool = pool
+
+    def __setitem__(self, key, connection):
+        super().__setitem__(key, connection)
+        self._pool._register(connection)
+
+
+class DriveClientPool:
+    """Hand out one Drive service per worker thread, reusing its HTTP connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._idle: list = []
+        self._credentials = None
+        self._root_url: Optional[str] = None
+        self._generation = 0
+        self._connections: weakref.WeakSet = weakref.WeakSet()
+
+    def configure(self, credentials, root_url: Optional[str] = None):
+        """Set the credentials used for new clients, discarding stale ones."""
+        with self._lock:
+            if credentials is self._credentials and root_url == self._root_url:
+                return
+            self._credentials = credentials
+            self._root_url = root_url
+            self._idle.clear()
+            self._generation += 1
+
+    def _build(self):
+        http = httplib2.Http(timeout=HTTP_TIMEOUT)
+        http.connections = _TrackedConnections(self)
+        if self._credentials is not None:
+            http = self._credentials.authorize(http)
+        return discovery.build_from_document(discovery_document(self._root_url), http=http)
+
+    def _register(self, connection):
+        with self._lock:
+            self._connections.add(connection)
+
+    def get(self):
+        """Return the Drive service bound to the calling thread."""
+        local = self._local
+        if getattr(local, "generation", None) == self._generation:
+            return local.service
+
+        with self._lock:
+            generation = self._generation
+            service = self._idle.pop() if self._idle else None
+        if service is None:
+            service = self._build()
+
+        local.service = service
+        local.generation = generation
+        return service
+
+    def discard(self):
+        """Drop the calling thread's client so the next call builds a fresh one."""
+        self._local.generation = None
+        self._local.service = None
+
+    def warm_up(self, count: int, prime: bool = True) -> int:
+        """Pre-build ``count`` idle clients and optionally open their connections."""
+        built = 0
+        with self._lock:
+            generation = self._generation
+            missing = max(0, count - len(self._idle))
+
+        for _ in range(missing):
+            service = self._build()
+            if prime:
+                try:
+                    service.files().list(pageSize=1, fields="files(id)").execute()
+                except Exception as exc:
+                    LOGGER.log(f"⚠️ Không thể kết nối trước tới Drive: {exc}")
+                    prime = False
+            with self._lock:
+                if generation != self._generation:
+                    break
+                self._idle.append(service)
+            built += 1
+        return built
+
+    def abort(self):
+        """Shut down every open Drive connection so blocked requests fail at once.
+
+        All clients are retired; the next :meth:`get` builds a fresh one.
+        """
+        with self._lock:
+            connections = list(self._connections)
+            self._idle.clear()
+            self._generation += 1
+        for connection in connections:
+            # httplib2 reconnects and resends after a dropped connection; refuse that too.
+            connection.connect = _refuse_connect
+            sock = getattr(connection, "sock", None)
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+POOL = DriveClientPool()
+
+
+def warm_up_in_background(count: int):
+    """Prepare Drive clients on a daemon thread if stored credentials exist.
+
+    The clients point at the configured ``drive_root_url``, as the run's own will.
+    """
+
+    def _warm_up():
+        credentials = auth.load_stored_credentials()
+        if credentials is None:
+            return
+        try:
+            POOL.configure(credentials, load_pipeline_settings()["drive_root_url"] or None)
+            built = POOL.warm_up(count)
+            LOGGER.log(f"🔌 Đã chuẩn bị sẵn {built} kết nối Google Drive.")
+        except Exception as exc:
+            LOGGER.log(f"⚠️ Lỗi khi chuẩn bị kết nối Google Drive: {exc}")
+
+    threading.Thread(target=_warm_up, daemon=True).start()
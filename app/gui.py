@@ -3,24 +3,119 @@
 from __future__ import annotations
 
 import os
-import signal
 import sys
 import threading
 from pathlib import Path
 
-import psutil
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
-from .config_manager import load_config, save_config
+from .config_manager import load_config, load_pipeline_settings, load_profile_backends, save_config
 from .crop_selector import CropSelectorApp
 from .logger import LOGGER
+from .metrics import METRICS
+from . import backends
+from . import journal
 from . import monitor
 from . import ocr
+from . import progress
+from . import reporting
+from . import segments
+from . import streaming
 from . import video_utils
 from . import vsf
 
 
+def preview_srt(gui, srt_content, save_callback):
+    """Show a modal window to preview and optionally edit SRT content."""
+    if gui.root.state() == "iconic":
+        gui.root.deiconify()
+
+    preview_window = tk.Toplevel(gui.root)
+    preview_window.title("Xem trước phụ đề SRT")
+    preview_window.geometry("600x400")
+    preview_window.transient(gui.root)
+    preview_window.grab_set()
+
+    srt_text = scrolledtext.ScrolledText(preview_window, wrap="word", height=20, width=70)
+    srt_text.pack(padx=5, pady=5, fill="both", expand=True)
+    srt_text.insert("end", srt_content)
+    srt_text.config(state="normal")
+
+    button_frame = tk.Frame(preview_window)
+    button_frame.pack(pady=10)
+
+    tk.Button(
+        button_frame,
+        text="Cập nhật và Đóng",
+        command=lambda: [save_callback(srt_text.get("1.0", "end")), preview_window.destroy()],
+    ).pack(side=tk.LEFT, padx=5)
+
+    tk.Button(
+        button_frame,
+        text="Hủy",
+        command=lambda: [save_callback(srt_content), preview_window.destroy()],
+    ).pack(side=tk.LEFT, padx=5)
+
+    preview_window.update_idletasks()
+    x = gui.root.winfo_x() + (gui.root.winfo_width() - preview_window.winfo_width()) // 2
+    y = gui.root.winfo_y() + (gui.root.winfo_height() - preview_window.winfo_height()) // 2
+    preview_window.geometry(f"+{x}+{y}")
+    preview_window.attributes("-topmost", True)
+    preview_window.focus_set()
+
+
+class GuiReporter(reporting.Reporter):
+    """Route pipeline callbacks to the main window on the Tk thread.
+
+    Progress and status go through a :class:`progress.ProgressBus` that the
+    Tk loop pumps, so thousands of image events become a few redraws a second.
+    """
+
+    def __init__(self, gui, max_updates_per_second: float = 10):
+        self.gui = gui
+        self.bus = progress.ProgressBus(self._publish, max_updates_per_second)
+        self._schedule_pump()
+
+    def _later(self, callback, *args):
+        self.gui.root.after(0, callback, *args)
+
+    def _schedule_pump(self):
+        self.gui.root.after(max(1, int(self.bus.interval * 1000)), self._pump)
+
+    def _pump(self):
+        self.bus.pump()
+        self._schedule_pump()
+
+    def _publish(self, percentage, text):
+        if percentage is not None:
+            self.gui.progress_bar.config(value=percentage)
+        if text:
+            self.gui.status_label.config(text=text)
+
+    def extraction_progress(self, percentage: float, text: str = ""):
+        self.bus.update_extraction(percentage, text)
+
+    def ocr_progress(self, done: int, total: int, streaming: bool = False):
+        self.bus.update_ocr(done, total, streaming)
+
+    def status(self, text: str):
+        self.bus.set_status(text)
+
+    def error(self, title: str, message: str):
+        self._later(messagebox.showerror, title, message)
+
+    def info(self, title: str, message: str):
+        self._later(messagebox.showinfo, title, message)
+
+    def review_srt(self, content, save):
+        self._later(preview_srt, self.gui, content, save)
+
+    def finished(self):
+        self.bus.reset()
+        self._later(self.gui.set_idle)
+
+
 class OCRGui:
     """Primary application window and event handlers."""
 
@@ -47,6 +142,10 @@ class OCRGui:
         self.delete_texts_var = tk.BooleanVar(value=delete_texts)
         self.nen_raw_texts_var = tk.BooleanVar(value=nen_raw_texts)
         self.create_txtimages_var = tk.BooleanVar(value=False)
+        self.stream_ocr_var = tk.BooleanVar(value=False)
+        self.default_backend = backends.resolve_backend_name(load_pipeline_settings())
+        self.profile_backends = load_profile_backends()
+        self.backend_var = tk.StringVar(value=backends.BACKEND_LABELS[self.default_backend])
 
         self.crop_top_var = tk.StringVar(value="0")
         self.crop_bottom_var = tk.StringVar(value="0")
@@ -55,6 +154,7 @@ class OCRGui:
 
         self._build_layout()
         LOGGER.configure(self.root, self.log_text)
+        self.reporter = GuiReporter(self, load_pipeline_settings()["progress_updates_per_second"])
 
         self.profile_combobox.set("Chọn profile")
         self.update_crop_values()
@@ -174,6 +274,15 @@ class OCRGui:
         self.profile_combobox.pack(side="left", padx=5)
         self.profile_combobox.bind("<<ComboboxSelected>>", self.update_crop_values)
 
+        self.backend_combobox = ttk.Combobox(
+            crop_frame,
+            textvariable=self.backend_var,
+            values=list(backends.BACKEND_LABELS.values()),
+            state="readonly",
+            width=13,
+        )
+        self.backend_combobox.pack(side="left", padx=5)
+
         delete_options_frame = tk.Frame(self.root)
         delete_options_frame.pack(pady=(0, 1), fill="x")
 
@@ -205,6 +314,13 @@ class OCRGui:
             anchor="w",
         ).pack(side="left", padx=5)
 
+        tk.Checkbutton(
+            delete_options_frame,
+            text="OCR song song",
+            variable=self.stream_ocr_var,
+            anchor="w",
+        ).pack(side="left", padx=5)
+
         button_frame = tk.Frame(self.root)
         button_frame.pack(pady=(0, 2), fill="x")
 
@@ -217,11 +333,19 @@ class OCRGui:
         )
         self.start_button.pack(side="left", padx=5)
 
+        self.resume_button = tk.Button(
+            button_frame,
+            text="♻️ Tiếp tục OCR",
+            width=12,
+            command=lambda: self.on_start_button_click(resume=True),
+        )
+        self.resume_button.pack(side="left", padx=2)
+
         self.stop_button = tk.Button(
             button_frame,
             text="❌ Dừng OCR",
             width=11,
-            command=lambda: ocr.stop_processing(self),
+            command=self.on_stop_button_click,
             state=tk.DISABLED,
         )
         self.stop_button.pack(side="left", padx=2)
@@ -232,11 +356,20 @@ class OCRGui:
         self.progress_bar = ttk.Progressbar(self.root, orient="horizontal", length=612, mode="determinate")
         self.progress_bar.pack(pady=(1, 0))
 
+        self.stats_label = tk.Label(self.root, text="", anchor="w", fg="#555555", font=("Segoe UI", 8))
+        self.stats_label.pack(fill="x", padx=5)
+        self.refresh_stats()
+
         log_frame = tk.Frame(self.root)
         log_frame.pack(pady=(0, 5), fill="both", expand=True)
         self.log_text = tk.Text(log_frame, height=5, wrap="word", state="disabled", bg="#0C0C0C", fg="#CCCCCC")
         self.log_text.pack(fill="both", expand=True, padx=5, pady=5)
 
+    def refresh_stats(self):
+        """Show the live stage latencies (p50/p95), upload volume, retries and errors once a second."""
+        self.stats_label.config(text=f"📈 {METRICS.panel_text()}")
+        self.root.after(1000, self.refresh_stats)
+
     def validate_float_input(self, action, value):
         if action != "1":
             return True
@@ -259,6 +392,13 @@ class OCRGui:
             self.crop_right_var.set(f"{right:.4f}")
 
         selected_profile = self.profile_combobox.get()
+        if event is not None:
+            profile_name = "custom" if selected_profile == "Tuỳ chỉnh" else selected_profile
+            backend_name = backends.resolve_backend_name(
+                {"ocr_backend": self.default_backend}, self.profile_backends, profile_name
+            )
+            self.backend_var.set(backends.BACKEND_LABELS[backend_name])
+
         if selected_profile in self.crop_profiles:
             profile = self.crop_profiles[selected_profile]
             self.crop_top_var.set(f"{profile['top']:.4f}")
@@ -308,15 +448,14 @@ class OCRGui:
         except ValueError:
             return None
 
-    def on_start_button_click(self):
-        file_sub = self.subtitle_entry.get()
-        images_dirr = self.images_entry.get()
-
-        if not file_sub or not images_dirr:
-            LOGGER.log("⚠️ Vui lòng nhập đầy đủ thông tin...")
-            messagebox.showwarning("Cảnh báo", "Vui lòng nhập đầy đủ thông tin.")
-            return
+    def _selected_backend(self) -> str:
+        label = self.backend_var.get()
+        for name, backend_label in backends.BACKEND_LABELS.items():
+            if backend_label == label:
+                return name
+        return self.default_backend
 
+    def _save_settings_and_open_log(self, file_sub: str):
         custom_crop = self._get_custom_crop()
         save_config(
             self.folder_id,
@@ -333,9 +472,48 @@ class OCRGui:
         log_file_path = log_file_path.replace(".srt", ".log")
         LOGGER.set_log_file(log_file_path)
 
+    def _start_streaming_ocr(self, file_sub: str, rgb_images_folder: str):
+        """Launch an OCR run that consumes RGBImages while VideoSubFinder runs."""
+        self._save_settings_and_open_log(file_sub)
+        LOGGER.log("🎬 Bắt đầu OCR song song với VideoSubFinder...")
+
+        image_stream = streaming.ImageStream()
+        self.stop_button.config(state=tk.NORMAL)
+        threading.Thread(
+            target=ocr.start_processing,
+            args=(
+                self.reporter,
+                file_sub,
+                rgb_images_folder,
+                self.delete_raw_texts_var.get(),
+                self.delete_texts_var.get(),
+                self.nen_raw_texts_var.get(),
+                self.flags,
+            ),
+            kwargs={"image_stream": image_stream, "backend_name": self._selected_backend()},
+            daemon=True,
+        ).start()
+        return image_stream
+
+    def on_start_button_click(self, resume: bool = False):
+        file_sub = self.subtitle_entry.get()
+        images_dirr = self.images_entry.get()
+
+        if not file_sub or not images_dirr:
+            LOGGER.log("⚠️ Vui lòng nhập đầy đủ thông tin...")
+            messagebox.showwarning("Cảnh báo", "Vui lòng nhập đầy đủ thông tin.")
+            return
+
+        if resume and not journal.journal_path(Path(file_sub).with_suffix(".srt")).exists():
+            LOGGER.log("⚠️ Không tìm thấy nhật ký của lần chạy trước cho file phụ đề này.")
+            messagebox.showwarning("Cảnh báo", "Không có lần chạy dở nào để tiếp tục cho file phụ đề này.")
+            return
+
+        self._save_settings_and_open_log(file_sub)
         LOGGER.log("🎬 Bắt đầu quá trình xử lý...")
 
         self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.VSF_button.config(state=tk.DISABLED)
         self.subtitle_button.config(state=tk.DISABLED)
@@ -345,7 +523,7 @@ class OCRGui:
         threading.Thread(
             target=ocr.start_processing,
             args=(
-                self,
+                self.reporter,
                 file_sub,
                 images_dirr,
                 self.delete_raw_texts_var.get(),
@@ -353,6 +531,7 @@ class OCRGui:
                 self.nen_raw_texts_var.get(),
                 self.flags,
             ),
+            kwargs={"backend_name": self._selected_backend(), "resume": resume},
             daemon=True,
         ).start()
 
@@ -416,10 +595,66 @@ class OCRGui:
 
         self.VSF_button.config(state=tk.DISABLED)
         self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
         self.subtitle_button.config(state=tk.DISABLED)
         self.images_button.config(state=tk.DISABLED)
 
-        vsf.run_vsf(self, command, output_base, output_folder)
+        # Reset before a streaming OCR thread starts, or its first figures would be wiped.
+        METRICS.reset()
+        image_stream = None
+        if self.stream_ocr_var.get():
+            if self.create_txtimages_var.get():
+                LOGGER.log("⚠️ OCR song song chỉ hỗ trợ RGBImages, bỏ qua vì đang bật Tạo TXTImages.")
+            else:
+                rgb_images_folder = os.path.join(output_base, "RGBImages")
+                self.images_entry.delete(0, tk.END)
+                self.images_entry.insert(0, rgb_images_folder)
+                image_stream = self._start_streaming_ocr(str(subtitle_file), rgb_images_folder)
+
+        self._run_vsf(command, output_base, output_folder, image_stream)
+
+    def _run_vsf(self, command, output_base: str, output_folder: str, image_stream=None):
+        """Run VideoSubFinder on a worker thread and prepare the OCR step when it ends."""
+
+        def run_videosubfinder():
+            ok = vsf.extract_images(
+                self.reporter,
+                command,
+                output_base,
+                output_folder,
+                self.duration or "00:00:00",
+                warm_up_clients=self.threads,
+                image_stream=image_stream,
+                segment_plan=segments.plan_for_video(load_pipeline_settings(), self.duration or "00:00:00"),
+            )
+            if ok:
+                images_folder = os.path.join(output_base, output_folder)
+                self.root.after(0, lambda: self.images_entry.delete(0, "end"))
+                self.root.after(0, lambda: self.images_entry.insert(0, images_folder))
+                self.images_dirr = images_folder
+            if image_stream is None:
+                # A streaming OCR run re-enables the controls when it finishes.
+                self.root.after(0, self.set_idle)
+
+        threading.Thread(target=run_videosubfinder, daemon=True).start()
+
+    def set_idle(self):
+        """Re-enable the controls once nothing is running."""
+        self.start_button.config(state=tk.NORMAL)
+        self.resume_button.config(state=tk.NORMAL)
+        self.VSF_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.subtitle_button.config(state=tk.NORMAL)
+        self.images_button.config(state=tk.NORMAL)
+
+    def on_stop_button_click(self):
+        ocr.request_stop()
+        vsf.cancel_all()
+        self.start_button.config(state=tk.NORMAL)
+        self.resume_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.VSF_button.config(state=tk.NORMAL)
+        LOGGER.log("Quá trình đã được dừng.")
 
     def _apply_video_after_crop(self, video_path: str):
         self.entry_video.delete(0, tk.END)
@@ -461,17 +696,9 @@ class OCRGui:
 
         LOGGER.log("✅ Chương trình đã được đóng.")
 
+        vsf.cancel_all()
         monitor.STATE.stop_all()
 
-        for process in psutil.process_iter(attrs=["pid", "name"]):
-            if "VideoSubFinderWXW_intel.exe" in process.info["name"]:
-                try:
-                    LOGGER.log("⚠️ Đang đóng VideoSubFinderWXW_intel.exe...")
-                    os.kill(process.info["pid"], signal.SIGTERM)
-                    LOGGER.log("✅ Đã đóng VideoSubFinderWXW_intel.exe thành công!")
-                except Exception as exc:
-                    LOGGER.log(f"❌ Lỗi khi đóng VideoSubFinderWXW_intel.exe: {exc}")
-
         self.root.destroy()
         sys.exit(0)
 
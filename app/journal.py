@@ -0,0 +1,96 @@
+"""Append-only per-run journal so an interrupted OCR run can be resumed."""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+def journal_path(subtitle_path: Path) -> Path:
+    """Journal file kept next to the subtitle it belongs to."""
+    return subtitle_path.with_name(f"{subtitle_path.stem}.journal.jsonl")
+
+
+def _image_key(image_path) -> str:
+    return str(Path(image_path).resolve())
+
+
+class RunJournal:
+    """One JSON line per finished image: path, content hash, timecodes, text, status.
+
+    Each entry is flushed as soon as it is written, so everything up to the
+    moment the process died is on disk. When opened with ``resume=True`` the
+    existing entries are loaded first and new ones are appended after them.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.completed: Dict[str, Tuple[Optional[str], str]] = {}
+        if resume and self.path.exists():
+            self._load()
+        self.resumed = len(self.completed)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._file.tell() and not self._ends_with_newline():
+            # Terminate a line cut short by a crash so the next entry starts cleanly.
+            self._file.write("\n")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as journal_file:
+            for raw_line in journal_file:
+                try:
+                    entry = json.loads(raw_line)
+                except ValueError:
+                    # The last line may be cut short if the process died mid-write.
+                    continue
+                if entry.get("status") == "done":
+                    self.completed[entry["image"]] = (entry.get("digest"), entry.get("text", ""))
+                else:
+                    self.completed.pop(entry.get("image"), None)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as journal_file:
+            journal_file.seek(-1, 2)
+            return journal_file.read(1) == b"\n"
+
+    def lookup(self, image_path: Path, digest: Optional[str]) -> Optional[str]:
+        """Text recorded for ``image_path`` by an earlier run, if the image is unchanged."""
+        entry = self.completed.get(_image_key(image_path))
+        if entry is None or entry[0] != digest:
+            return None
+        return entry[1]
+
+    def record(
+        self,
+        image_path: Path,
+        digest: Optional[str],
+        time_range: Optional[Tuple[int, int]],
+        text: str,
+        status: str = "done",
+    ):
+        key = _image_key(image_path)
+        if status == "done" and self.completed.get(key) == (digest, text):
+            return
+        entry = {
+            "image": key,
+            "digest": digest,
+            "start_ms": time_range[0] if time_range else None,
+            "end_ms": time_range[1] if time_range else None,
+            "text": text,
+            "status": status,
+        }
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self, remove: bool = False):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if remove:
+            self.path.unlink(missing_ok=True)
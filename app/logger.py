@@ -2,43 +2,144 @@
 
 from __future__ import annotations
 
+import atexit
+import collections
 import datetime
+import queue
+import threading
 from typing import Optional
 
+from .constants import LOG_VIEW_MAX_LINES
+
+# Control records on the writer queue; log lines are ``(timestamp, message)`` tuples.
+_OPEN = object()
+_CLOSE = object()
+
 
 class GuiLogger:
-    """Log helper that mirrors messages to a Tkinter text widget and a file."""
+    """Log helper that mirrors messages to a Tkinter text widget and a file.
+
+    :meth:`log` never blocks: it appends to a queue and returns, so worker
+    threads neither wait on the disk nor touch Tk. One writer thread keeps
+    the log file open and flushes once per burst of lines. The widget is
+    refreshed in batches from the Tk loop with ``root.after`` and keeps
+    only the last ``max_lines`` lines; the file keeps everything.
+    """
 
-    def __init__(self):
+    def __init__(self, max_lines: int = LOG_VIEW_MAX_LINES, drain_interval_ms: int = 100):
         self._root = None
         self._widget = None
-        self._log_file_path: Optional[str] = None
+        self._stream = None
+        self._max_lines = max_lines
+        self._drain_interval_ms = drain_interval_ms
+        self._records: queue.SimpleQueue = queue.SimpleQueue()
+        self._view: collections.deque = collections.deque(maxlen=max_lines)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        atexit.register(self.close)
 
     def configure(self, root, widget):
         """Attach the Tk root and output widget."""
         self._root = root
         self._widget = widget
+        root.after(self._drain_interval_ms, self._drain_view)
+
+    def set_stream(self, stream):
+        """Also echo every message to ``stream`` (e.g. ``sys.stderr`` for headless runs)."""
+        self._stream = stream
 
     def set_log_file(self, log_file_path: Optional[str]):
-        """Update the log file destination."""
-        self._log_file_path = log_file_path
-        if log_file_path:
-            with open(log_file_path, "w", encoding="utf-8") as log_file:
-                log_file.write("=== STARTING NEW SESSION ===\n")
+        """Update the log file destination; lines logged before the call stay in the old file."""
+        self._put((_OPEN, log_file_path))
 
     def log(self, message: str):
-        """Write a message to the widget and, if configured, to the log file."""
+        """Queue a message for the widget, the stream and, if configured, the log file."""
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._put((timestamp, message))
         if self._widget is not None:
-            self._widget.config(state="normal")
-            self._widget.insert("end", message + "\n")
-            self._widget.see("end")
-            self._widget.config(state="disabled")
-        if self._root is not None:
-            self._root.update_idletasks()
-        if self._log_file_path:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(self._log_file_path, "a", encoding="utf-8") as log_file:
-                log_file.write(f"[{timestamp}] {message}\n")
+            self._view.append(message)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every message logged so far is on disk."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Flush and close the log file; logging again reopens nothing until ``set_log_file``."""
+        if self._writer is not None:
+            self._put((_CLOSE, None))
+            self.flush(timeout=2.0)
+
+    def _put(self, record):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="logger", daemon=True)
+                    self._writer.start()
+        self._records.put(record)
+
+    def _write_loop(self):
+        log_file = None
+        while True:
+            waiters = []
+            record = self._records.get()
+            while True:
+                if isinstance(record, threading.Event):
+                    waiters.append(record)
+                elif record[0] is _OPEN or record[0] is _CLOSE:
+                    log_file = self._reopen(log_file, record[1] if record[0] is _OPEN else None)
+                else:
+                    timestamp, message = record
+                    if self._stream is not None:
+                        self._stream.write(message + "\n")
+                    if log_file is not None:
+                        log_file.write(f"[{timestamp}] {message}\n")
+                try:
+                    record = self._records.get_nowait()
+                except queue.Empty:
+                    break
+            if log_file is not None:
+                log_file.flush()
+            if self._stream is not None:
+                self._stream.flush()
+            for waiter in waiters:
+                waiter.set()
+
+    def _reopen(self, log_file, log_file_path: Optional[str]):
+        if log_file is not None:
+            log_file.close()
+        if not log_file_path:
+            return None
+        try:
+            log_file = open(log_file_path, "w", encoding="utf-8", buffering=64 * 1024)
+        except OSError as exc:
+            self._view.append(f"❌ Không thể ghi file log {log_file_path}: {exc}")
+            return None
+        log_file.write("=== STARTING NEW SESSION ===\n")
+        return log_file
+
+    def _drain_view(self):
+        """Move queued lines into the widget; runs on the Tk thread only."""
+        widget = self._widget
+        try:
+            if self._view and widget is not None:
+                lines = []
+                while self._view:
+                    lines.append(self._view.popleft())
+                widget.config(state="normal")
+                widget.insert("end", "\n".join(lines) + "\n")
+                overflow = int(widget.index("end-1c").split(".")[0]) - 1 - self._max_lines
+                if overflow > 0:
+                    widget.delete("1.0", f"{overflow + 1}.0")
+                widget.see("end")
+                widget.config(state="disabled")
+            self._root.after(self._drain_interval_ms, self._drain_view)
+        except Exception:
+            # The window is gone; the file keeps receiving lines.
+            self._widget = None
 
 
 LOGGER = GuiLogger()
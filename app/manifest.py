@@ -0,0 +1,112 @@
+"""One-pass listing of a VSF images folder, sorted by timecode and kept on disk between runs."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import operator
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import timecodes
+from .constants import APP_SLUG, IMAGE_EXTENSIONS
+from .logger import LOGGER
+
+MANIFEST_NAME = f".{APP_SLUG}_manifest.json"
+MANIFEST_VERSION = 2
+
+
+class ImageEntry:
+    """One image of the folder: where it is and its subtitle times."""
+
+    __slots__ = ("key", "path", "start_ms", "end_ms")
+
+    def __init__(self, key: str, path: str, start_ms: int, end_ms: int):
+        # ``key`` is the path relative to the folder, with ``/`` separators, as stored in the manifest.
+        self.key = key
+        self.path = path
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+
+    @property
+    def time_range(self) -> Optional[Tuple[int, int]]:
+        if self.start_ms == timecodes.NO_TIME:
+            return None
+        return self.start_ms, self.end_ms
+
+
+def walk_images(folder: str) -> Dict[str, os.DirEntry]:
+    """Every image under ``folder`` by manifest key, from a single scandir walk."""
+    found: Dict[str, os.DirEntry] = {}
+    pending = [(folder, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name[name.rfind(".") :].lower() in IMAGE_EXTENSIONS:
+                        found[prefix + name] = entry
+                    elif entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, f"{prefix}{name}/"))
+        except OSError as exc:
+            LOGGER.log(f"⚠️ Không thể đọc thư mục ảnh: {exc}")
+    return found
+
+
+def _load(manifest_path: Path) -> Dict[str, list]:
+    try:
+        document = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if document.get("version") != MANIFEST_VERSION:
+        return {}
+    return {row[0]: row for row in document.get("images", [])}
+
+
+def _save(manifest_path: Path, entries: List[ImageEntry]):
+    rows = [[entry.key, entry.start_ms, entry.end_ms] for entry in entries]
+    temporary = manifest_path.with_name(manifest_path.name + ".tmp")
+    try:
+        temporary.write_text(
+            json.dumps({"version": MANIFEST_VERSION, "images": rows}, separators=(",", ":")), encoding="utf-8"
+        )
+        os.replace(temporary, manifest_path)
+    except OSError as exc:
+        LOGGER.log(f"⚠️ Không thể lưu danh sách ảnh {manifest_path}: {exc}")
+
+
+def build_manifest(folder, persist: bool = True) -> List[ImageEntry]:
+    """List the images under ``folder`` in timeline order.
+
+    Names already in the stored manifest keep their row, in its stored
+    order, without a timecode parse; only new names are parsed and sorted
+    in, and the manifest is rewritten only when the folder changed. No
+    file is stat'ed: the times come from the name, and content changes are
+    caught by the cache digest.
+    """
+    folder = os.fspath(folder)
+    manifest_path = Path(folder) / MANIFEST_NAME
+    known = _load(manifest_path) if persist else {}
+    present = walk_images(folder)
+
+    entries: List[ImageEntry] = []
+    for key, row in known.items():
+        entry = present.pop(key, None)
+        if entry is not None:
+            entries.append(ImageEntry(key, entry.path, row[1], row[2]))
+    removed = len(known) - len(entries)
+
+    if present:
+        for key, entry in present.items():
+            start_ms, end_ms = timecodes.parse_vsf_name(entry.name) or (timecodes.NO_TIME, timecodes.NO_TIME)
+            entries.append(ImageEntry(key, entry.path, start_ms, end_ms))
+        entries.sort(key=operator.attrgetter("start_ms", "end_ms", "key"))
+        # NO_TIME sorts first; names without timecodes cannot be placed on the timeline, so they go last.
+        untimed = bisect.bisect_left(entries, 0, key=operator.attrgetter("start_ms"))
+        if untimed:
+            entries = entries[untimed:] + entries[:untimed]
+    if persist and (present or removed):
+        _save(manifest_path, entries)
+    return entries
@@ -0,0 +1,172 @@
+"""Per-stage latency histograms and run counters, exported as JSON and Prometheus text."""
+
+from __future__ import annotations
+
+import bisect
+import collections
+import contextlib
+import json
+import math
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+from . import concurrency
+from .constants import APP_SLUG
+
+# Upper bounds (seconds) of the Prometheus histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Stages shown in the GUI stats panel, in pipeline order.
+PANEL_STAGES = (
+    ("preprocess_wait", "chờ ảnh"),
+    ("limiter_wait", "chờ"),
+    ("drive_create", "tải lên"),
+    ("drive_export", "xuất"),
+    ("drive_delete_batch", "xoá"),
+    ("tesseract", "tesseract"),
+)
+# The panel's percentiles cover each stage's most recent samples only, so a refresh costs the same all run long.
+PANEL_WINDOW = 512
+
+
+def percentile(ordered, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class RunMetrics:
+    """Latency samples per stage plus counters and error classes for one run.
+
+    Every sample is kept (a few doubles per image), so percentiles are exact
+    and the Prometheus buckets are computed at export time. The GUI panel
+    reads a bounded window of recent samples per stage instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, keep=()):
+        """Start a new run, carrying over the samples of the ``keep`` stages."""
+        with self._lock:
+            kept = {stage: self._samples[stage] for stage in keep if stage in getattr(self, "_samples", {})}
+            self.started = time.time()
+            self._samples: Dict[str, array] = collections.defaultdict(lambda: array("d"), kept)
+            self._recent: Dict[str, collections.deque] = {
+                stage: collections.deque(self._samples.get(stage, ()), maxlen=PANEL_WINDOW)
+                for stage, _ in PANEL_STAGES
+            }
+            self.counters: Dict[str, int] = collections.Counter()
+            self.errors: Dict[str, int] = collections.Counter()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples[stage].append(seconds)
+            recent = self._recent.get(stage)
+            if recent is not None:
+                recent.append(seconds)
+
+    @contextlib.contextmanager
+    def time(self, stage: str):
+        """Record how long the ``with`` body takes under ``stage``, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def error(self, stage: str, exc: BaseException):
+        """Count a failed attempt by stage, error kind and exception type."""
+        kind, _ = concurrency.classify_error(exc)
+        with self._lock:
+            self.errors[f"{stage}:{kind}:{type(exc).__name__}"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            counters = dict(self.counters)
+            errors = dict(self.errors)
+            started = self.started
+        stages = {}
+        for stage, ordered in samples.items():
+            total = sum(ordered)
+            stages[stage] = {
+                "count": len(ordered),
+                "sum_s": round(total, 6),
+                "mean_s": round(total / len(ordered), 6) if ordered else 0.0,
+                "p50_s": round(percentile(ordered, 0.50), 6),
+                "p95_s": round(percentile(ordered, 0.95), 6),
+                "p99_s": round(percentile(ordered, 0.99), 6),
+                "max_s": round(ordered[-1], 6) if ordered else 0.0,
+                "buckets": {str(bound): bisect.bisect_right(ordered, bound) for bound in BUCKETS},
+            }
+        return {
+            "started": started,
+            "elapsed_s": round(time.time() - started, 3),
+            "stages": stages,
+            "counters": counters,
+            "errors": errors,
+        }
+
+    def to_prometheus(self, snapshot: Optional[dict] = None) -> str:
+        snapshot = snapshot or self.snapshot()
+        lines = [
+            f"# HELP {APP_SLUG}_stage_seconds Latency of each pipeline stage.",
+            f"# TYPE {APP_SLUG}_stage_seconds histogram",
+        ]
+        for stage, values in sorted(snapshot["stages"].items()):
+            for bound, cumulative in values["buckets"].items():
+                lines.append(f'{APP_SLUG}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{APP_SLUG}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {values["count"]}')
+            lines.append(f'{APP_SLUG}_stage_seconds_sum{{stage="{stage}"}} {values["sum_s"]}')
+            lines.append(f'{APP_SLUG}_stage_seconds_count{{stage="{stage}"}} {values["count"]}')
+        lines += [f"# HELP {APP_SLUG}_total Run counters.", f"# TYPE {APP_SLUG}_total counter"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f'{APP_SLUG}_total{{name="{name}"}} {value}')
+        lines += [
+            f"# HELP {APP_SLUG}_errors_total Failed attempts by stage and error class.",
+            f"# TYPE {APP_SLUG}_errors_total counter",
+        ]
+        for key, value in sorted(snapshot["errors"].items()):
+            stage, kind, exc_type = key.split(":", 2)
+            lines.append(f'{APP_SLUG}_errors_total{{stage="{stage}",kind="{kind}",type="{exc_type}"}} {value}')
+        lines += [
+            f"# HELP {APP_SLUG}_run_seconds Wall time of the run.",
+            f"# TYPE {APP_SLUG}_run_seconds gauge",
+            f"{APP_SLUG}_run_seconds {snapshot['elapsed_s']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, base_path: Path):
+        """Write ``<base>.metrics.json`` and ``<base>.metrics.prom``; returns the JSON path."""
+        snapshot = self.snapshot()
+        json_path = base_path.with_name(f"{base_path.stem}.metrics.json")
+        json_path.write_text(json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8")
+        json_path.with_suffix(".prom").write_text(self.to_prometheus(snapshot), encoding="utf-8")
+        return json_path
+
+    def panel_text(self) -> str:
+        """One compact line of live figures for the GUI: recent p50/p95 per stage, bytes, retries, errors."""
+        with self._lock:
+            recent = [(label, list(self._recent[stage])) for stage, label in PANEL_STAGES]
+            uploaded = self.counters.get("bytes_uploaded", 0)
+            retries = self.counters.get("retries", 0)
+            errors = sum(self.errors.values())
+        parts = []
+        for label, values in recent:
+            if values:
+                values.sort()
+                parts.append(f"{label} {percentile(values, 0.5):.2f}/{percentile(values, 0.95):.2f}s")
+        parts.append(f"↑ {uploaded / (1024 * 1024):.1f} MB | thử lại {retries} | lỗi {errors}")
+        return " | ".join(parts)
+
+
+METRICS = RunMetrics()
@@ -1,135 +1,249 @@
-"""Watchdog-based monitor for the RGBImages directory."""
+"""Follow the RGBImages folder while VideoSubFinder writes it, in batches."""
 
 from __future__ import annotations
 
-import datetime
 import os
-import re
+import queue
 import threading
-import time
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
+from . import manifest, timecodes
+from .constants import IMAGE_EXTENSIONS
 from .logger import LOGGER
 
 
-class RGBImagesEventHandler(FileSystemEventHandler):
-    """Track new RGB image exports and update the UI."""
+class _EventCollector(FileSystemEventHandler):
+    """Only queue the path; the monitor thread does the work in batches."""
 
-    def __init__(self, gui, video_duration: str = "00:00:00"):
+    def __init__(self, events: queue.SimpleQueue):
         super().__init__()
-        self.gui = gui
-        self.video_duration = video_duration
-        self.file_count = 0
-        try:
-            hrs, mins, secs = map(int, video_duration.split(":"))
-            self.video_duration_timedelta = datetime.timedelta(hours=hrs, minutes=mins, seconds=secs)
-        except ValueError:
-            LOGGER.log("Lỗi định dạng thời lượng video, sử dụng giá trị mặc định '00:00:00'")
-            self.video_duration_timedelta = datetime.timedelta()
+        self.events = events
 
     def on_created(self, event):
-        if event.is_directory:
-            return
-
-        file_name = os.path.basename(event.src_path)
-        self.file_count += 1
-        LOGGER.log(f"📂 RGBImages: {file_name}")
-
-        match = re.search(r"(\d+)_(\d+)_(\d+)_(\d+)", file_name)
-        if not match:
-            return
-
-        extracted_time = f"{match.group(1)}:{match.group(2)}:{match.group(3)}:{match.group(4)}"
-        self.gui.extracted_time = extracted_time
-
-        if self.video_duration_timedelta.total_seconds() <= 0:
+        if not event.is_directory:
+            self.events.put(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.events.put(event.dest_path)
+
+
+class ImagesMonitor:
+    """One watcher per VideoSubFinder run, with an in-memory index of the images produced.
+
+    A single thread waits for the folder, then every ``batch_interval``
+    seconds turns the filesystem events gathered since the last batch into
+    one index update, one log line and one progress report. Every
+    ``rescan_interval`` seconds a scandir diff of the folder checks the
+    events; if an image is still unreported by the next diff (network
+    shares, some virtual drives drop events), or watchdog cannot watch the
+    folder at all, the monitor switches to polling: every batch it stats
+    the folder, and diffs only when the folder's mtime moved or the rescan
+    interval is up (that catches subfolders and coarse mtimes). :meth:`stop`
+    always ends the thread and the observer and takes a last diff so the
+    index is complete.
+    """
+
+    def __init__(
+        self,
+        reporter,
+        folder: str,
+        video_duration: str = "00:00:00",
+        image_stream=None,
+        batch_interval: float = 0.25,
+        rescan_interval: float = 2.0,
+        wait_seconds: float = 10.0,
+        polling: bool = False,
+    ):
+        self.reporter = reporter
+        self.folder = os.path.normpath(folder)
+        self.video_duration = video_duration
+        self.image_stream = image_stream
+        self.batch_interval = batch_interval
+        self.rescan_interval = rescan_interval
+        self.wait_seconds = wait_seconds
+        self.polling = polling
+        self.images: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.video_duration_ms = timecodes.parse_clock(video_duration)
+        if self.video_duration_ms is None:
+            LOGGER.log("Lỗi định dạng thời lượng video, sử dụng giá trị mặc định '00:00:00'")
+            self.video_duration_ms = 0
+        self._latest_ms = 0
+        self._suspects: set = set()
+        self._lock = threading.Lock()
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._observer: Optional[Observer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def file_count(self) -> int:
+        return len(self.images)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="rgbimages-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching and index whatever the events missed; safe to call more than once."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self._stop_observer()
+        if os.path.isdir(self.folder):
+            self._add(self._drain_events() + self._diff())
+
+    def _run(self):
+        waited = 0.0
+        while not os.path.isdir(self.folder):
+            if waited >= self.wait_seconds:
+                LOGGER.log("❌ LỖI: Không thể tìm thấy thư mục RGBImages sau thời gian chờ.")
+                return
+            if self._stop.wait(0.2):
+                return
+            waited += 0.2
+        LOGGER.log(f"👀 Đã thấy thư mục: {self.folder}.\n🚀 Bắt đầu giám sát!")
+
+        if not self.polling:
+            self._start_observer()
+            # Files written before the observer started raise no event; index them now, not as missed later.
+            self._add(self._diff())
+        since_rescan = 0.0
+        folder_mtime = None
+        while not self._stop.wait(self.batch_interval):
+            since_rescan += self.batch_interval
+            if self.polling:
+                # Stat before the diff, so a file written during the walk moves the mtime for the next batch.
+                mtime = self._folder_mtime()
+                if mtime != folder_mtime or mtime is None or since_rescan >= self.rescan_interval:
+                    folder_mtime = mtime
+                    since_rescan = 0.0
+                    self._add(self._diff())
+                continue
+            unreported = self._diff() if since_rescan >= self.rescan_interval else None
+            batch = self._drain_events()
+            if unreported is not None:
+                since_rescan = 0.0
+                # An event can trail the file by a moment; only a file unreported across two diffs was missed.
+                unreported = set(unreported).difference(batch)
+                missed = unreported & self._suspects
+                self._suspects = unreported - missed
+                if missed:
+                    LOGGER.log(f"⚠️ Watchdog bỏ sót {len(missed)} ảnh, chuyển sang quét thư mục định kỳ.")
+                    self.polling = True
+                    self._stop_observer()
+                    batch += self._diff(exclude=batch)
+            self._add(batch)
+
+    def _start_observer(self):
+        observer = Observer()
+        try:
+            observer.schedule(_EventCollector(self._events), self.folder, recursive=True)
+            observer.start()
+        except Exception as exc:
+            LOGGER.log(f"⚠️ Không thể theo dõi sự kiện thư mục ({exc}), chuyển sang quét thư mục định kỳ.")
+            self.polling = True
             return
-
+        self._observer = observer
+
+    def _stop_observer(self):
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+    def _drain_events(self) -> List[str]:
+        paths = []
+        while True:
+            try:
+                path = self._events.get_nowait()
+            except queue.Empty:
+                return paths
+            if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+                paths.append(os.path.normpath(path))
+
+    def _folder_mtime(self) -> Optional[int]:
         try:
-            extracted_time_obj = datetime.datetime.strptime(extracted_time, "%H:%M:%S:%f").time()
-        except ValueError:
-            LOGGER.log("Lỗi xử lý thời gian: Không thể chuyển đổi thời gian vừa trích xuất.")
+            return os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return None
+
+    def _diff(self, exclude=()) -> List[str]:
+        """Images on disk that are neither indexed nor in ``exclude``, from one scandir walk."""
+        skip = set(exclude)
+        return [
+            entry.path
+            for entry in manifest.walk_images(self.folder).values()
+            if entry.path not in self.images and entry.path not in skip
+        ]
+
+    def _add(self, paths: List[str]):
+        """Index a batch of new paths, hand them to the stream and report progress once."""
+        with self._lock:
+            new = [path for path in dict.fromkeys(paths) if path not in self.images]
+            if not new:
+                return
+            for path in new:
+                time_range = timecodes.parse_vsf_name(os.path.basename(path))
+                self.images[path] = time_range
+                if time_range is not None:
+                    self._latest_ms = max(self._latest_ms, time_range[0])
+            count = len(self.images)
+            latest_ms = self._latest_ms
+
+        if self.image_stream is not None:
+            for path in new:
+                self.image_stream.submit(path)
+        LOGGER.log(f"📂 RGBImages: +{len(new)} ảnh (tổng {count}), mới nhất {os.path.basename(new[-1])}")
+
+        if self.video_duration_ms <= 0:
             return
-
-        extracted_timedelta = datetime.timedelta(
-            hours=extracted_time_obj.hour,
-            minutes=extracted_time_obj.minute,
-            seconds=extracted_time_obj.second,
-            microseconds=extracted_time_obj.microsecond,
-        )
-
-        time_remaining = self.video_duration_timedelta - extracted_timedelta
-        time_remaining_str = str(time_remaining).split(".")[0]
-
-        percentage_complete = 0
-        if self.video_duration_timedelta.total_seconds():
-            percentage_complete = (extracted_timedelta / self.video_duration_timedelta) * 100
-            percentage_complete = max(0, min(percentage_complete, 100))
-
-        status_text = (
-            "VSF đang chạy...👀 "
-            f"Còn lại: {time_remaining_str} |⏱ Tổng thời gian: {self.video_duration} |📂 Ảnh: {self.file_count}"
+        percentage = max(0, min(latest_ms / self.video_duration_ms * 100, 100))
+        remaining = timecodes.format_clock(self.video_duration_ms - latest_ms)
+        self.reporter.extraction_progress(
+            percentage,
+            f"VSF đang chạy...👀 Còn lại: {remaining} |⏱ Tổng thời gian: {self.video_duration} |📂 Ảnh: {count}",
         )
-        self.gui.status_label.config(text=status_text)
-        self.gui.root.after(0, self.gui.progress_bar.config, {"value": percentage_complete})
 
 
 class MonitorState:
-    """Holds active observer references."""
+    """The monitors of the VideoSubFinder runs in progress, so the app can stop them on exit."""
 
     def __init__(self):
-        self.observer: Optional[Observer] = None
-        self.event_handler: Optional[RGBImagesEventHandler] = None
-        self.worker_threads: list[threading.Thread] = []
-
-    def stop_all(self):
-        if self.observer and self.observer.is_alive():
-            self.observer.stop()
-            self.observer.join()
-        for thread in self.worker_threads:
-            if thread.is_alive():
-                thread.join(timeout=1)
-        self.observer = None
-        self.event_handler = None
-        self.worker_threads.clear()
-
+        self._lock = threading.Lock()
+        self.monitors: List[ImagesMonitor] = []
 
-STATE = MonitorState()
+    def add(self, images_monitor: ImagesMonitor):
+        with self._lock:
+            self.monitors.append(images_monitor)
 
+    def remove(self, images_monitor: ImagesMonitor):
+        with self._lock:
+            if images_monitor in self.monitors:
+                self.monitors.remove(images_monitor)
 
-def start_monitoring_rgbimages(gui, rgb_images_folder: str, video_duration: str = "00:00:00"):
-    """Start a watchdog observer for the RGBImages folder."""
-    if not os.path.exists(rgb_images_folder):
-        LOGGER.log("❌ Thư mục RGBImages chưa được tạo, không thể giám sát.")
-        return
+    def stop_all(self):
+        with self._lock:
+            monitors, self.monitors = self.monitors, []
+        for images_monitor in monitors:
+            images_monitor.stop()
 
-    if STATE.observer and STATE.observer.is_alive():
-        return
 
-    observer = Observer()
-    handler = RGBImagesEventHandler(gui, video_duration)
-    observer.schedule(handler, rgb_images_folder, recursive=True)
+STATE = MonitorState()
 
-    observer_thread = threading.Thread(target=observer.start, daemon=True)
-    STATE.worker_threads.append(observer_thread)
-    STATE.observer = observer
-    STATE.event_handler = handler
-    observer_thread.start()
 
+def start_monitor(reporter, folder: str, video_duration: str = "00:00:00", image_stream=None, polling=False):
+    """Start an :class:`ImagesMonitor` for ``folder``; call :func:`stop_monitor` when VSF exits."""
+    images_monitor = ImagesMonitor(reporter, folder, video_duration, image_stream, polling=polling)
+    STATE.add(images_monitor)
+    return images_monitor.start()
 
-def wait_for_rgbimages_and_monitor(gui, path: str, video_duration: str, retries: int = 10, delay: int = 1):
-    """Block until the RGBImages folder becomes available, then begin monitoring."""
-    remaining = retries
-    while remaining > 0:
-        if os.path.exists(path):
-            LOGGER.log(f"👀 Đã thấy thư mục: {path}.\n🚀 Bắt đầu giám sát!")
-            start_monitoring_rgbimages(gui, path, video_duration)
-            return
-        LOGGER.log(f"⚠️ Không thấy RGBImages. Đang đợi... {remaining}s còn lại")
-        time.sleep(delay)
-        remaining -= 1
 
-    LOGGER.log("❌ LỖI: Không thể tìm thấy thư mục RGBImages sau thời gian chờ.")
+def stop_monitor(images_monitor: ImagesMonitor):
+    images_monitor.stop()
+    STATE.remove(images_monitor)
@@ -0,0 +1,78 @@
+"""Stack several subtitle strips into one image so Drive OCRs them in one pass."""
+
+from __future__ import annotations
+
+import io
+import re
+from typing import List, Optional, Sequence
+
+from PIL import Image, ImageDraw, ImageFont
+
+MARKER_PATTERN = re.compile(r"#{3,}\s*(\d+)\s*#{3,}")
+MAX_MOSAIC_WIDTH = 2000
+MIN_BAND_HEIGHT = 48
+
+
+def marker_text(position: int) -> str:
+    return f"##### {position} #####"
+
+
+def _marker_font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only ships the fixed-size bitmap font.
+        return ImageFont.load_default()
+
+
+def _separator_band(width: int, height: int, position: int) -> Image.Image:
+    band = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(band)
+    font = _marker_font(int(height * 0.6))
+    draw.text((height // 2, height // 5), marker_text(position), fill="black", font=font)
+    return band
+
+
+def build_mosaic(image_paths: Sequence) -> bytes:
+    """Return a PNG with every strip stacked under a numbered separator band."""
+    strips = []
+    for path in image_paths:
+        with Image.open(path) as image:
+            strip = image.convert("RGB")
+        if strip.width > MAX_MOSAIC_WIDTH:
+            scale = MAX_MOSAIC_WIDTH / strip.width
+            strip = strip.resize((MAX_MOSAIC_WIDTH, max(1, int(strip.height * scale))), Image.LANCZOS)
+        strips.append(strip)
+
+    width = max(strip.width for strip in strips)
+    band_height = max(MIN_BAND_HEIGHT, max(strip.height for strip in strips) // 2)
+    height = sum(strip.height + band_height for strip in strips)
+
+    mosaic = Image.new("RGB", (width, height), "white")
+    offset = 0
+    for position, strip in enumerate(strips):
+        mosaic.paste(_separator_band(width, band_height, position), (0, offset))
+        offset += band_height
+        mosaic.paste(strip, (0, offset))
+        offset += strip.height
+
+    buffer = io.BytesIO()
+    mosaic.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def split_mosaic_text(text: str, count: int) -> Optional[List[str]]:
+    """Split exported OCR text at the separator markers.
+
+    Returns ``None`` unless exactly the markers ``0 .. count - 1`` are found
+    in order, so a misread batch can fall back to per-image OCR.
+    """
+    markers = list(MARKER_PATTERN.finditer(text))
+    if [int(match.group(1)) for match in markers] != list(range(count)):
+        return None
+
+    parts = []
+    for current, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following else len(text)
+        parts.append("".join(text[current.end() : end].split("\n")).strip())
+    return parts
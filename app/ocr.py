@@ -3,70 +3,256 @@
 from __future__ import annotations
 
 import concurrent.futures
-import datetime
+import functools
 import io
 import os
 import shutil
 import threading
 import time
 from pathlib import Path
-import tkinter as tk
-from tkinter import messagebox, scrolledtext
 
-import httplib2
-from apiclient import discovery
-from apiclient.http import MediaFileUpload, MediaIoBaseDownload
-
-from . import auth
-from .config_manager import load_config
+from apiclient.http import MediaIoBaseUpload
+
+from . import (
+    async_engine,
+    auth,
+    backends,
+    concurrency,
+    dedupe,
+    drive_pool,
+    journal,
+    manifest,
+    mosaic,
+    ocr_cache,
+    preprocess,
+    srt_writer,
+    timecodes,
+)
+from .config_manager import load_config, load_pipeline_settings
+from .constants import OCR_CACHE_PATH
 from .logger import LOGGER
+from .metrics import METRICS
 
-SRT_FILE_LIST: dict[int, list[str]] = {}
 PROGRESS_LOCK = threading.Lock()
 STOP_FLAG = False
-TOTAL_IMAGES = 0
-COMPLETED_SCANS = 0
-START_TIME = 0.0
+STOP_EVENT = threading.Event()
+CACHE: ocr_cache.OCRCache | None = None
+LIMITER = concurrency.AdaptiveLimiter(1)
+BACKEND: backends.OCRBackend | None = None
+PREPROCESSOR: preprocess.Preprocessor | None = None
+# The job of the latest start_processing call, kept for callers that read its counters.
+JOB: OCRJob | None = None
+
+
+class OCRJob:
+    """Per-subtitle state of an OCR run.
+
+    The backend, limiter and cache are shared by the whole process; each
+    job has its own SRT writer, journal, text folders and counters, so
+    several videos can be OCR'd by the same pool at once.
+    """
+
+    def __init__(
+        self,
+        reporter,
+        subtitle_path: Path,
+        work_directory: Path,
+        keep_raw_texts: bool = True,
+        keep_texts: bool = True,
+        streaming: bool = False,
+    ):
+        self.reporter = reporter
+        self.subtitle_path = subtitle_path
+        self.raw_texts_dir = work_directory / "raw_texts"
+        self.texts_dir = work_directory / "texts"
+        self.keep_raw_texts = keep_raw_texts
+        self.keep_texts = keep_texts
+        self.streaming = streaming
+        self.srt_writer: srt_writer.SRTWriter | None = None
+        self.journal: journal.RunJournal | None = None
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.start_time = time.time()
+        self.end_time = 0.0
+        self._outstanding = 0
+        self._drained = threading.Condition(PROGRESS_LOCK)
+
+    def open(self, resume: bool = False):
+        """Create the kept text folders, the SRT writer and the journal."""
+        if self.keep_raw_texts:
+            self.raw_texts_dir.mkdir(parents=True, exist_ok=True)
+        if self.keep_texts:
+            self.texts_dir.mkdir(parents=True, exist_ok=True)
+        self.srt_writer = srt_writer.SRTWriter(self.subtitle_path, sort_by_time=self.streaming)
+        self.journal = journal.RunJournal(journal.journal_path(self.subtitle_path), resume=resume)
+        if resume:
+            resumed = self.journal.resumed
+            LOGGER.log(f"♻️ Tiếp tục lần chạy trước: {resumed} ảnh đã OCR xong trong nhật ký.")
+
+    def close(self, replace_empty: bool = False) -> int:
+        """Flush the SRT and close the journal; returns the number of SRT entries.
+
+        An SRT without entries only replaces an existing one with ``replace_empty``.
+        """
+        self.end_time = time.time()
+        written = self.srt_writer.close(replace_empty) if self.srt_writer is not None else 0
+        if self.journal is not None:
+            self.journal.close()
+        return written
+
+    @property
+    def elapsed(self) -> float:
+        return (self.end_time or time.time()) - self.start_time
+
+    def raw_text_path(self, image_name: str, suffix: str = ""):
+        """Where to keep the raw export for ``image_name``, or ``None`` if raw_texts is not kept."""
+        if not self.keep_raw_texts:
+            return None
+        return self.raw_texts_dir / f"{image_name[:-5]}{suffix}.txt"
+
+    def mark_completed(self, weight: int = 1):
+        with PROGRESS_LOCK:
+            self.completed += weight
+            if self.total:
+                self.reporter.ocr_progress(self.completed, self.total, self.streaming)
+
+    def task_submitted(self):
+        with PROGRESS_LOCK:
+            self._outstanding += 1
+
+    def task_done(self):
+        with PROGRESS_LOCK:
+            self._outstanding -= 1
+            if not self._outstanding:
+                self._drained.notify_all()
+
+    def wait_drained(self):
+        """Block until every task submitted for this job has finished."""
+        with PROGRESS_LOCK:
+            while self._outstanding:
+                self._drained.wait()
 
 
 def reset_state():
-    """Restore globals to default values before a new OCR run."""
-    global SRT_FILE_LIST, STOP_FLAG, TOTAL_IMAGES, COMPLETED_SCANS, START_TIME
-    SRT_FILE_LIST = {}
+    """Clear the stop request before a new OCR run."""
+    global STOP_FLAG
     STOP_FLAG = False
-    TOTAL_IMAGES = 0
-    COMPLETED_SCANS = 0
-    START_TIME = 0.0
+    STOP_EVENT.clear()
 
 
 def request_stop():
-    """Signal all workers to stop gracefully."""
+    """Signal all workers to stop and abort the requests they are blocked on."""
     global STOP_FLAG
     STOP_FLAG = True
+    STOP_EVENT.set()
+    LIMITER.abort()
+    if BACKEND is not None:
+        BACKEND.abort()
+
+
+def _cached_text(job, image_path):
+    """Look ``image_path`` up in the job's resume journal, then the cache.
+
+    Returns ``(digest, image_bytes, text_or_None, data)``, where ``data`` is
+    the file's content, kept so a miss can be uploaded without reading it again.
+    """
+    if CACHE is None and job.journal is None:
+        return None, 0, None, None
+    with METRICS.time("cache_lookup"):
+        data = image_path.read_bytes()
+        digest = ocr_cache.digest_bytes(data)
+        text_content = job.journal.lookup(image_path, digest) if job.journal is not None else None
+        if text_content is None and CACHE is not None:
+            text_content = CACHE.lookup(_cache_key(digest), len(data))
+    if text_content is not None:
+        METRICS.count("cache_hits")
+    return digest, len(data), text_content, data
+
+
+def _lookup(job, image_path):
+    """:func:`_cached_text`, treating a failed read, hash or cache query as a miss.
+
+    The lookup is only a shortcut; the image is OCR'd as if it were new
+    rather than failing or retrying its line.
+    """
+    try:
+        return _cached_text(job, image_path)
+    except Exception as exc:
+        METRICS.error("cache_lookup", exc)
+        LOGGER.log(f"⚠️ Không tra được bộ nhớ đệm cho {image_path.name}: {exc}")
+        return None, 0, None, None
+
+
+def _cache_key(digest):
+    """Key of ``digest`` in the cache: OCR of a preprocessed upload is kept apart from OCR of the original."""
+    tag = PREPROCESSOR.options.cache_tag() if PREPROCESSOR is not None else ""
+    return BACKEND.cache_namespace + tag + digest
+
+
+def _cache_store(digest, text_content, image_bytes):
+    if CACHE is not None and digest is not None:
+        CACHE.store(_cache_key(digest), text_content, image_bytes)
 
 
-def stop_processing(gui):
-    """Stop the OCR process and reset UI controls."""
-    request_stop()
-    gui.start_button.config(state=tk.NORMAL)
-    gui.stop_button.config(state=tk.DISABLED)
-    gui.VSF_button.config(state=tk.NORMAL)
-    LOGGER.log("Quá trình đã được dừng.")
+def _record_failure(job, image_path, line, digest=None):
+    """Leave a failed image out of the SRT and mark it for the next resume."""
+    with PROGRESS_LOCK:
+        job.failed += 1
+    METRICS.count("failed_images")
+    job.srt_writer.skip(line)
+    if job.journal is not None:
+        job.journal.record(image_path, digest, None, "", status="failed")
 
 
-def _progress_callback(gui):
-    """Update the progress bar and label safely from worker threads."""
-    if TOTAL_IMAGES == 0:
+def _retry_delay(exc: BaseException, tries: int) -> float:
+    """Backoff before retry ``tries``, honouring Drive's Retry-After header."""
+    kind, retry_after = concurrency.classify_error(exc)
+    delay = concurrency.backoff_delay(tries, retry_after)
+    if kind == "throttle":
+        LOGGER.log(f"⏳ Drive giới hạn tốc độ, thử lại sau {delay:.1f}s")
+    return delay
+
+
+def _record_result(job, image_path, line, text_content, time_range=None, digest=None):
+    """Log, persist, journal and register the SRT entry for one OCR'd image."""
+    imgname = str(image_path.name)
+
+    preview_text = text_content[:55] + "..." if len(text_content) > 55 else text_content
+    LOGGER.log(f"✅ Đã OCR: {preview_text}")
+
+    if job.keep_texts:
+        txtfile = job.texts_dir / f"{imgname[:-5]}.txt"
+        with METRICS.time("disk_write"), open(txtfile, "w", encoding="utf-8") as text_file:
+            text_file.write(text_content)
+
+    if time_range is None:
+        time_range = timecodes.parse_vsf_name(imgname)
+    if time_range is None:
+        LOGGER.log(
+            f"Error processing {imgname}: Filename format is incorrect. Please ensure the correct format is used."
+        )
+        _record_failure(job, image_path, line, digest)
         return
-    gui.progress_bar["value"] = (COMPLETED_SCANS / TOTAL_IMAGES) * 100
-    gui.status_label.config(text=f"✅ Đã OCR: {COMPLETED_SCANS}/{TOTAL_IMAGES}")
-    gui.root.update_idletasks()
 
+    with METRICS.time("srt_write"):
+        if job.journal is not None:
+            job.journal.record(image_path, digest, time_range, text_content)
+        job.srt_writer.add(timecodes.SubtitleEvent(line, time_range[0], time_range[1], text_content))
+    METRICS.count("images_done")
 
-def ocr_image(gui, image_path, line, credentials, folder_id, current_directory):
-    """Perform OCR on a single image via Google Drive conversion."""
-    global STOP_FLAG
+
+def ocr_image(job, image_path, line, time_range=None):
+    """Perform OCR on a single image of ``job`` through the active backend.
+
+    ``time_range`` overrides the filename timecodes with ``(start_ms, end_ms)``
+    when the image stands for a whole group of duplicate frames.
+    """
     tries = 0
+    digest = None
+    started = time.perf_counter()
+    upload = None
+    prepared = PREPROCESSOR is None
 
     while True:
         if STOP_FLAG:
@@ -74,291 +260,603 @@ def ocr_image(gui, image_path, line, credentials, folder_id, current_directory):
             return
 
         try:
-            http = credentials.authorize(httplib2.Http())
-            service = discovery.build("drive", "v3", http=http)
-            imgfile = str(image_path.absolute())
-            imgname = str(image_path.name)
-            raw_txtfile = current_directory / "raw_texts" / f"{imgname[:-5]}.txt"
-            txtfile = current_directory / "texts" / f"{imgname[:-5]}.txt"
-
-            mime = "application/vnd.google-apps.document"
-            res = (
-                service.files()
-                .create(
-                    body={"name": imgname, "mimeType": mime, "parents": [folder_id]},
-                    media_body=MediaFileUpload(imgfile, mimetype=mime, resumable=True),
-                )
-                .execute()
-            )
-
-            downloader = MediaIoBaseDownload(
-                io.FileIO(raw_txtfile, "wb"),
-                service.files().export_media(fileId=res["id"], mimeType="text/plain"),
-            )
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-
-            service.files().delete(fileId=res["id"]).execute()
+            raw_txtfile = job.raw_text_path(image_path.name)
+
+            digest, image_bytes, text_content, original = _lookup(job, image_path)
+            if text_content is None:
+                if not prepared:
+                    upload, prepared = PREPROCESSOR.take(image_path), True
+                text_content = BACKEND.recognize(image_path, raw_txtfile, upload, original)
+                _cache_store(digest, text_content, image_bytes)
+            elif not prepared:
+                PREPROCESSOR.forget(image_path)
+
+            _record_result(job, image_path, line, text_content, time_range, digest)
+            METRICS.observe("image_total", time.perf_counter() - started)
+            break
+        except concurrency.Cancelled:
+            # The run was stopped while waiting for a slot; the line is left for a resume, not failed.
+            return
+        except Exception as exc:
+            drive_pool.POOL.discard()
+            if STOP_FLAG:
+                return
+            METRICS.error("convert", exc)
+            tries += 1
+            if tries >= concurrency.MAX_ATTEMPTS or not concurrency.is_retryable(exc):
+                LOGGER.log(f"Lỗi sau {tries} lần thử: {exc}")
+                _record_failure(job, image_path, line, digest)
+                raise
+            METRICS.count("retries")
+            STOP_EVENT.wait(_retry_delay(exc, tries))
+            continue
 
-            with open(raw_txtfile, "r", encoding="utf-8") as raw_text_file:
-                text_content = raw_text_file.read()
-            text_content = "".join(text_content.split("\n")[2:])
 
-            preview_text = text_content[:55] + "..." if len(text_content) > 55 else text_content
-            LOGGER.log(f"✅ Đã OCR: {preview_text}")
+def ocr_batch(job, items):
+    """OCR several subtitle strips through a single stacked Drive conversion.
 
-            with open(txtfile, "w", encoding="utf-8") as text_file:
-                text_file.write(text_content)
+    ``items`` holds ``(image_path, line, time_range)`` tuples. Cached images
+    are resolved locally; if the strips cannot be stacked, or the exported
+    text cannot be split back into one entry per strip, the batch falls
+    back to :func:`ocr_image` per image. Should anything else fail, every
+    line not yet resolved is skipped so the SRT writer never waits on it.
+    """
+    unresolved = {line: image_path for image_path, line, _ in items}
+    try:
+        _ocr_batch(job, items, unresolved)
+    except Exception as exc:
+        LOGGER.log(f"❌ Lỗi khi OCR nhóm {len(items)} ảnh: {exc}")
+        for line, image_path in unresolved.items():
+            _record_failure(job, image_path, line)
+        raise
 
-            try:
-                start_parts = imgname.split("_")
-                end_parts = imgname.split("__")[1].split("_")
-
-                start_time = f"{start_parts[0][:2]}:{start_parts[1][:2]}:{start_parts[2][:2]},{start_parts[3][:3]}"
-                end_time = f"{end_parts[0][:2]}:{end_parts[1][:2]}:{end_parts[2][:2]},{end_parts[3][:3]}"
-            except (IndexError, ValueError):
-                LOGGER.log(
-                    f"Error processing {imgname}: Filename format is incorrect. Please ensure the correct format is used."
-                )
-                return
 
-            SRT_FILE_LIST[line] = [
-                f"{line}\n",
-                f"{start_time} --> {end_time}\n",
-                f"{text_content}\n\n",
-                "",
-            ]
+def _ocr_batch(job, items, unresolved):
+    """The body of :func:`ocr_batch`; removes each line from ``unresolved`` once it is recorded."""
+    pending = []
+    for image_path, line, time_range in items:
+        if STOP_FLAG:
+            LOGGER.log("❌ Quá trình đã được dừng.")
+            return
+        digest, image_bytes, cached, original = _lookup(job, image_path)
+        if cached is not None:
+            if PREPROCESSOR is not None:
+                PREPROCESSOR.forget(image_path)
+            _record_result(job, image_path, line, cached, time_range, digest)
+            del unresolved[line]
+        else:
+            pending.append((image_path, line, time_range, digest, image_bytes, original))
+
+    if not pending:
+        return
+    first_name = pending[0][0].name
+    raw_txtfile = job.raw_text_path(first_name, f"_x{len(pending)}")
+    data = None
+    if len(pending) > 1:
+        uploads = [item[5] for item in pending]
+        if PREPROCESSOR is not None:
+            uploads = [PREPROCESSOR.take(item[0]) or item[5] for item in pending]
+        strips = [item[0] if upload is None else io.BytesIO(upload) for item, upload in zip(pending, uploads)]
+        try:
+            with METRICS.time("mosaic_build"):
+                data = mosaic.build_mosaic(strips)
+        except Exception as exc:
+            # A strip that cannot be decoded fails the same way every time; retrying would only wait.
+            METRICS.error("mosaic_build", exc)
+            LOGGER.log(f"⚠️ Không ghép được {len(pending)} ảnh ({exc}), OCR lại từng ảnh.")
 
+    texts = None
+    tries = 0
+    while data is not None and texts is None:
+        if STOP_FLAG:
+            LOGGER.log("❌ Quá trình đã được dừng.")
+            return
+        try:
+            media_body = MediaIoBaseUpload(
+                io.BytesIO(data), mimetype="image/png", resumable=len(data) > backends.MULTIPART_MAX_BYTES
+            )
+            raw_text = BACKEND.convert(f"mosaic_{first_name}", media_body, raw_txtfile)
+            texts = mosaic.split_mosaic_text(raw_text, len(pending))
+            if texts is None:
+                LOGGER.log(f"⚠️ Không tách được kết quả ghép {len(pending)} ảnh, OCR lại từng ảnh.")
             break
+        except concurrency.Cancelled:
+            return
         except Exception as exc:
+            drive_pool.POOL.discard()
+            if STOP_FLAG:
+                return
+            METRICS.error("mosaic", exc)
             tries += 1
-            if tries > 5:
-                LOGGER.log(f"Lỗi sau 5 lần thử: {exc}")
-                raise
-            time.sleep(1)
-            continue
+            if tries >= concurrency.MAX_ATTEMPTS or not concurrency.is_retryable(exc):
+                LOGGER.log(f"Lỗi sau {tries} lần thử: {exc}")
+                break
+            METRICS.count("retries")
+            STOP_EVENT.wait(_retry_delay(exc, tries))
 
+    if STOP_FLAG:
+        return
+    if texts is None:
+        for image_path, line, time_range, _, _, _ in pending:
+            del unresolved[line]
+            try:
+                ocr_image(job, image_path, line, time_range)
+            except Exception:
+                # ocr_image has already recorded the failure; the other strips still get their turn.
+                continue
+        return
 
-def preview_srt(gui, srt_content, save_callback):
-    """Show a modal window to preview and optionally edit SRT content."""
-    if gui.root.state() == "iconic":
-        gui.root.deiconify()
-
-    preview_window = tk.Toplevel(gui.root)
-    preview_window.title("Xem trước phụ đề SRT")
-    preview_window.geometry("600x400")
-    preview_window.transient(gui.root)
-    preview_window.grab_set()
-
-    srt_text = scrolledtext.ScrolledText(preview_window, wrap="word", height=20, width=70)
-    srt_text.pack(padx=5, pady=5, fill="both", expand=True)
-    srt_text.insert("end", srt_content)
-    srt_text.config(state="normal")
-
-    button_frame = tk.Frame(preview_window)
-    button_frame.pack(pady=10)
-
-    tk.Button(
-        button_frame,
-        text="Cập nhật và Đóng",
-        command=lambda: [save_callback(srt_text.get("1.0", "end")), preview_window.destroy()],
-    ).pack(side=tk.LEFT, padx=5)
-
-    tk.Button(
-        button_frame,
-        text="Hủy",
-        command=lambda: [save_callback(srt_content), preview_window.destroy()],
-    ).pack(side=tk.LEFT, padx=5)
-
-    preview_window.update_idletasks()
-    x = gui.root.winfo_x() + (gui.root.winfo_width() - preview_window.winfo_width()) // 2
-    y = gui.root.winfo_y() + (gui.root.winfo_height() - preview_window.winfo_height()) // 2
-    preview_window.geometry(f"+{x}+{y}")
-    preview_window.attributes("-topmost", True)
-    preview_window.focus_set()
-
-
-def finalize_processing(
-    gui,
-    subtitle_path: Path,
-    delete_raw_texts: bool,
-    delete_texts: bool,
-    nen_raw_texts: bool,
-    raw_texts_dir: Path,
-    texts_dir: Path,
-):
-    """Handle clean-up tasks after OCR completes."""
+    for (image_path, line, time_range, digest, image_bytes, _), text_content in zip(pending, texts):
+        _cache_store(digest, text_content, image_bytes)
+        _record_result(job, image_path, line, text_content, time_range, digest)
+        del unresolved[line]
+
+
+def _open_cache(settings):
+    """Open the persistent OCR cache if enabled in the pipeline settings."""
+    global CACHE
+    _close_cache(report=False)
+    if not settings["ocr_cache"]:
+        return
+    try:
+        CACHE = ocr_cache.OCRCache(
+            OCR_CACHE_PATH,
+            max_bytes=settings["ocr_cache_max_mb"] * 1024 * 1024,
+            max_age_days=settings["ocr_cache_max_age_days"],
+        )
+    except Exception as exc:
+        LOGGER.log(f"⚠️ Không thể mở bộ nhớ đệm OCR, tiếp tục không dùng cache: {exc}")
+        CACHE = None
+
+
+def _close_cache(report: bool = True):
+    """Report cache statistics for the run and close the cache."""
+    global CACHE
+    if CACHE is None:
+        return
+    cache, CACHE = CACHE, None
+    if report:
+        lookups = cache.hits + cache.misses
+        LOGGER.log(
+            f"💾 Bộ nhớ đệm OCR: {cache.hits}/{lookups} ảnh trúng cache ({cache.hit_rate:.0%}), "
+            f"tiết kiệm {ocr_cache.format_bytes(cache.bytes_saved)} tải lên."
+        )
+    try:
+        cache.close()
+    except Exception as exc:
+        LOGGER.log(f"⚠️ Lỗi khi đóng bộ nhớ đệm OCR: {exc}")
+
+
+def finish_run(metrics_base: Path | None = None):
+    """Release the backend and cache shared by the run's jobs and log run-wide figures.
+
+    With ``metrics_base`` the run's stage latencies and counters are written
+    next to it as ``<stem>.metrics.json`` and ``<stem>.metrics.prom``.
+    """
+    global PREPROCESSOR
+    if BACKEND is not None:
+        BACKEND.close()
+    if PREPROCESSOR is not None:
+        PREPROCESSOR.close()
+        PREPROCESSOR = None
+        preprocess.report()
+    _close_cache()
+    LOGGER.log(f"⚖️ Điều phối đồng thời: {LIMITER.summary()}")
+    if metrics_base is not None:
+        try:
+            LOGGER.log(f"📈 Đã ghi số liệu chạy: {METRICS.write(metrics_base)}")
+        except OSError as exc:
+            LOGGER.log(f"⚠️ Không thể ghi số liệu chạy: {exc}")
+
+
+def finalize_processing(job, delete_raw_texts: bool, delete_texts: bool, nen_raw_texts: bool, end_run: bool = True):
+    """Handle clean-up tasks after OCR of ``job`` completes.
+
+    ``end_run`` also closes what the run's jobs share; the scheduler leaves
+    that to :func:`finish_run` once its last job is done.
+    """
+    reporter = job.reporter
+    raw_texts_dir = job.raw_texts_dir
+    texts_dir = job.texts_dir
     if nen_raw_texts:
         try:
-            zip_file_path = shutil.make_archive(str(subtitle_path), "zip", str(raw_texts_dir))
+            zip_file_path = shutil.make_archive(str(job.subtitle_path), "zip", str(raw_texts_dir))
             new_zip_file_path = zip_file_path.replace(".srt.zip", ".zip")
             os.rename(zip_file_path, new_zip_file_path)
             LOGGER.log(f"✅ Đã nén thư mục: {raw_texts_dir}")
         except Exception as exc:
             LOGGER.log(f"❌ Lỗi khi nén thư mục {raw_texts_dir}: {exc}")
-            messagebox.showerror("Lỗi", f"Không thể nén thư mục {raw_texts_dir}: {exc}")
+            reporter.error("Lỗi", f"Không thể nén thư mục {raw_texts_dir}: {exc}")
 
-    if delete_raw_texts:
+    if delete_raw_texts and raw_texts_dir.exists():
         try:
             shutil.rmtree(raw_texts_dir)
             LOGGER.log(f"✅ Đã xóa thư mục: {raw_texts_dir}")
         except Exception as exc:
             LOGGER.log(f"❌ Lỗi: {exc}")
-            messagebox.showerror("Lỗi", f"Không thể xóa thư mục raw_texts: {exc}")
+            reporter.error("Lỗi", f"Không thể xóa thư mục raw_texts: {exc}")
 
-    if delete_texts:
+    if delete_texts and texts_dir.exists():
         try:
             shutil.rmtree(texts_dir)
             LOGGER.log(f"✅ Đã xóa thư mục: {texts_dir}")
         except Exception as exc:
             LOGGER.log(f"❌ Lỗi: {exc}")
-            messagebox.showerror("Lỗi", f"Không thể xóa thư mục texts: {exc}")
-
-    total_time = time.time() - START_TIME
-    formatted_time = time.strftime("%H:%M:%S", time.gmtime(total_time))
-
-    gui.status_label.config(text=f"✅ Hoàn thành OCR {TOTAL_IMAGES} ảnh. Tổng thời gian: {formatted_time}")
-    gui.start_button.config(state=tk.NORMAL)
-    gui.VSF_button.config(state=tk.NORMAL)
-    gui.stop_button.config(state=tk.DISABLED)
-    gui.subtitle_button.config(state=tk.NORMAL)
-    gui.images_button.config(state=tk.NORMAL)
-    LOGGER.log(f"✅ Hoàn thành OCR {TOTAL_IMAGES} hình ảnh.")
+            reporter.error("Lỗi", f"Không thể xóa thư mục texts: {exc}")
+
+    if end_run:
+        finish_run(job.subtitle_path)
+
+    formatted_time = time.strftime("%H:%M:%S", time.gmtime(job.elapsed))
+
+    reporter.status(f"✅ Hoàn thành OCR {job.total} ảnh. Tổng thời gian: {formatted_time}")
+    LOGGER.log(f"✅ Hoàn thành OCR {job.total} hình ảnh.")
     LOGGER.log(f"✅ Thời gian xử lý OCR: {formatted_time}")
+    reporter.finished()
 
 
-def start_processing(
-    gui,
-    file_sub: str,
-    images_dirr: str,
-    delete_raw_texts: bool,
-    delete_texts: bool,
-    nen_raw_texts: bool,
-    flags,
-):
-    """Main OCR orchestrator."""
-    global TOTAL_IMAGES, COMPLETED_SCANS, START_TIME, STOP_FLAG
+def _on_image_done(job, image, in_flight, weight, future):
+    """Record the outcome of one OCR future covering ``weight`` images and refresh progress."""
+    in_flight.release()
+    try:
+        if future.cancelled() or STOP_FLAG:
+            return
+        exc = future.exception()
+        if exc is not None:
+            LOGGER.log(f"{image} generated an exception: {exc}")
+            return
+        job.mark_completed(weight)
+    finally:
+        job.task_done()
+
+
+def acquire_window(in_flight) -> bool:
+    """Wait for room in the submission window; ``False`` once a stop is requested."""
+    while not in_flight.acquire(timeout=0.2):
+        if STOP_FLAG:
+            return False
+    if STOP_FLAG:
+        in_flight.release()
+        return False
+    return True
+
+
+def batches(images, batch_size):
+    """Yield ``(first_line, images)`` chunks without materialising the whole input."""
+    batch = []
+    first_line = 1
+    for line, image in enumerate(images, start=1):
+        if not batch:
+            first_line = line
+        batch.append(image)
+        if len(batch) == batch_size:
+            yield first_line, batch
+            batch = []
+    if batch:
+        yield first_line, batch
+
+
+def submit_batch(executor, job, first_line, batch, time_ranges, in_flight):
+    """Queue one image, or one mosaic of ``batch``, of ``job`` on ``executor``.
+
+    The caller has taken a slot of ``in_flight``; it is given back when the
+    task finishes.
+    """
+    if PREPROCESSOR is not None:
+        for image in batch:
+            PREPROCESSOR.prefetch(image)
+    if len(batch) > 1:
+        items = [(image, first_line + offset, time_ranges.get(image)) for offset, image in enumerate(batch)]
+        future = executor.submit(ocr_batch, job, items)
+    else:
+        future = executor.submit(ocr_image, job, batch[0], first_line, time_ranges.get(batch[0]))
+    job.task_submitted()
+    future.add_done_callback(functools.partial(_on_image_done, job, batch[0], in_flight, len(batch)))
+
+
+def _run_thread_pool(job, images, time_ranges, batch_size, max_workers):
+    """OCR ``images`` on a thread pool, one image or one mosaic batch per task.
+
+    Tasks are submitted through a window of ``max_workers * 2``, so memory
+    stays flat however many images there are and a stop only has a few
+    queued tasks to cancel.
+    """
+    if batch_size > 1:
+        LOGGER.log(f"🧱 Ghép tối đa {batch_size} ảnh cho mỗi lần chuyển đổi trên Drive.")
+
+    in_flight = threading.BoundedSemaphore(max_workers * 2)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for first_line, batch in batches(images, batch_size):
+            if not acquire_window(in_flight):
+                break
+            if job.streaming:
+                job.total = first_line + len(batch) - 1
+            submit_batch(executor, job, first_line, batch, time_ranges, in_flight)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=STOP_FLAG)
+
+
+def _run_async_engine(job, images, time_ranges, credentials, folder_id, limit, root_url=None):
+    """OCR ``images`` with the asyncio engine instead of the thread pool."""
+
+    def jobs():
+        for line, image in enumerate(images, start=1):
+            if job.streaming:
+                job.total = line
+            time_range = time_ranges.get(image)
+            digest, image_bytes, cached, _ = _lookup(job, image)
+            if cached is not None:
+                _record_result(job, image, line, cached, time_range, digest)
+                job.mark_completed()
+                continue
+            if PREPROCESSOR is not None:
+                PREPROCESSOR.prefetch(image)
+            yield image, line, time_range, digest, image_bytes
+
+    def load(image):
+        data = PREPROCESSOR.take(image) if PREPROCESSOR is not None else None
+        if data is None:
+            return async_engine.read_image(image)
+        return data, "image/png"
+
+    def on_result(item, raw_text):
+        image, line, time_range, digest, image_bytes = item
+        raw_txtfile = job.raw_text_path(image.name)
+        if raw_txtfile is not None:
+            raw_txtfile.write_text(raw_text, encoding="utf-8")
+        text_content = "".join(raw_text.split("\n")[2:])
+        _cache_store(digest, text_content, image_bytes)
+        _record_result(job, image, line, text_content, time_range, digest)
+        job.mark_completed()
+
+    def on_error(item, exc):
+        LOGGER.log(f"{item[0]} generated an exception: {exc}")
+        _record_failure(job, item[0], item[1], item[3])
+
+    def transport_factory():
+        token_provider = async_engine.CredentialsTokenProvider(credentials)
+        return async_engine.AsyncHttpTransport(
+            token_provider, root_url=root_url or async_engine.GOOGLE_ROOT_URL, max_connections=limit
+        )
+
+    LOGGER.log(f"⚡ Dùng engine asyncio với tối đa {limit} yêu cầu đồng thời.")
+    engine = async_engine.AsyncOCREngine(transport_factory, folder_id, limit, discard=BACKEND.discard, load=load)
+    engine.run(jobs(), on_result, on_error, lambda: STOP_FLAG)
+
+
+def prepare_run(flags, backend_name: str | None = None, threads: int | None = None):
+    """Set up the backend, limiter and cache that every job of a run shares.
 
+    Returns ``(settings, folder_id, credentials, threads)``. The backend is
+    created but not started.
+    """
+    global LIMITER, BACKEND, PREPROCESSOR
     reset_state()
-    START_TIME = time.time()
+    # VideoSubFinder usually ran just before, as a separate step; keep its timing in this run's figures.
+    METRICS.reset(keep=("vsf",))
 
     (
-        _,
+        folder_id,
         _delete_raw_texts,
         _delete_texts,
         _nen_raw_texts,
         _,
-        threads,
+        configured_threads,
         _,
     ) = load_config()
+    threads = threads or configured_threads
+
+    settings = load_pipeline_settings()
+    backend_name = backend_name or backends.resolve_backend_name(settings)
+
+    credentials = None
+    if backend_name == "drive":
+        credentials = auth.get_credentials(flags)
+        drive_pool.POOL.configure(credentials, settings["drive_root_url"] or None)
+    _open_cache(settings)
+    if settings["adaptive_concurrency"]:
+        LIMITER = concurrency.AdaptiveLimiter(threads, maximum=max(threads, settings["max_threads"]))
+    else:
+        LIMITER = concurrency.AdaptiveLimiter(threads, minimum=threads, maximum=threads)
+    BACKEND = backends.create_backend(backend_name, settings, folder_id, LIMITER)
+    if PREPROCESSOR is not None:
+        PREPROCESSOR.close()
+    PREPROCESSOR = None
+    if settings["preprocess_images"] and BACKEND.supports_preprocess:
+        options = preprocess.Options(settings["preprocess_binarize"], settings["preprocess_min_text_height"])
+        PREPROCESSOR = preprocess.Preprocessor(options, settings["preprocess_workers"] or None)
+    return settings, folder_id, credentials, threads
+
+
+def collect_images(job, images_dirr: str, settings, threads: int):
+    """List and dedupe the images of ``job`` in timeline order; returns ``(images, time_ranges)``.
+
+    Returns ``None`` after reporting the error if the folder has no images.
+    """
+    with METRICS.time("scan"):
+        entries = manifest.build_manifest(images_dirr)
+    images = [Path(entry.path) for entry in entries]
+
+    job.total = len(images)
+    LOGGER.log(f"👀 Tổng số ảnh tìm thấy trong thư mục '{images_dirr}': {job.total}")
+
+    if job.total == 0:
+        job.reporter.error(
+            "Lỗi",
+            f"Thư mục '{images_dirr}' không chứa hình ảnh hợp lệ.\n"
+            "Hãy kiểm tra định dạng: JPEG, PNG, BMP, GIF.",
+        )
+        LOGGER.log(f"❌ Lỗi: Thư mục '{images_dirr}' không chứa hình ảnh hợp lệ.")
+        return None
+
+    time_ranges = {}
+    if settings["dedupe_frames"]:
+        with METRICS.time("dedupe"):
+            groups = dedupe.group_frames(
+                images,
+                max_distance=settings["dedupe_max_distance"],
+                max_gap_ms=settings["dedupe_max_gap_ms"],
+                workers=threads,
+                times=[entry.time_range for entry in entries],
+            )
+        images = [group.representative for group in groups]
+        time_ranges = {group.representative: group.time_range for group in groups if len(group.members) > 1}
+        if len(images) < job.total:
+            LOGGER.log(f"🧩 Gộp khung hình trùng lặp: {job.total} ảnh → {len(images)} dòng cần OCR.")
+        job.total = len(images)
+    return images, time_ranges
+
+
+def complete_job(job, delete_raw_texts: bool, delete_texts: bool, nen_raw_texts: bool, end_run: bool = True) -> bool:
+    """Close ``job`` once its images are done, then review, save and clean up its SRT.
+
+    Returns ``True`` once the SRT has been saved.
+    """
+    reporter = job.reporter
+    subtitle_path = job.subtitle_path
+    # A finished run with images always leaves its SRT, even if every image failed.
+    written = job.close(replace_empty=not STOP_FLAG and job.total > 0)
+
+    if STOP_FLAG:
+        if written:
+            LOGGER.log(f"💾 Đã lưu {written} dòng phụ đề hoàn thành vào: {subtitle_path}")
+            LOGGER.log("♻️ Bấm 'Tiếp tục OCR' để OCR nốt các ảnh còn lại.")
+        if end_run:
+            # A stopped run still closes the cache and the preprocessing pool and leaves its figures.
+            finish_run(subtitle_path)
+        LOGGER.log("✅ Quá trình đã được dừng.")
+        reporter.info("Dừng", "Quá trình đã dừng lại.")
+        reporter.finished()
+        return False
+
+    if job.total == 0:
+        LOGGER.log("❌ Lỗi: VideoSubFinder không tạo ra hình ảnh nào để OCR.")
+        reporter.error("Lỗi", "VideoSubFinder không tạo ra hình ảnh nào để OCR.")
+        reporter.finished()
+        return False
+
+    srt_content = subtitle_path.read_text(encoding="utf-8")
+    saved = False
+
+    def save_srt_content(content):
+        nonlocal saved
+        try:
+            if content != srt_content:
+                with open(subtitle_path, "w", encoding="utf-8") as srt_file:
+                    srt_file.write(content)
+            LOGGER.log(f"✅ Đã lưu file SRT: {subtitle_path}")
+            job.journal.close(remove=True)
+            saved = True
+        except Exception as exc:
+            LOGGER.log(f"❌ Lỗi khi lưu file SRT: {exc}")
+            reporter.error("Lỗi", f"Không thể lưu file SRT: {exc}")
+        finally:
+            finalize_processing(job, delete_raw_texts, delete_texts, nen_raw_texts, end_run)
 
-    credentials = auth.get_credentials(flags)
+    reporter.review_srt(srt_content, save_srt_content)
+    return saved
 
-    current_directory = Path(Path.cwd())
-    images_dir = Path(images_dirr)
-    raw_texts_dir = current_directory / "raw_texts"
-    texts_dir = current_directory / "texts"
 
+def start_processing(
+    reporter,
+    file_sub: str,
+    images_dirr: str,
+    delete_raw_texts: bool,
+    delete_texts: bool,
+    nen_raw_texts: bool,
+    flags,
+    image_stream=None,
+    backend_name: str | None = None,
+    resume: bool = False,
+    threads: int | None = None,
+) -> bool:
+    """Main OCR orchestrator for a single subtitle.
+
+    Progress, errors and the final SRT review go through ``reporter`` (see
+    :class:`reporting.Reporter`), so the same run works with or without Tk.
+    When ``image_stream`` is given, images are OCR'd as VideoSubFinder
+    produces them instead of being globbed from ``images_dirr`` up front.
+    ``backend_name`` picks the OCR backend; it defaults to the
+    ``ocr_backend`` pipeline setting. With ``resume`` the images already
+    finished in the subtitle's journal are taken from it instead of being
+    OCR'd again. ``threads`` overrides the configured thread count.
+
+    Returns ``True`` once the SRT has been saved. A reporter that reviews
+    the SRT interactively saves it later, so only headless callers should
+    rely on the result; :data:`JOB` holds the run's counters.
+    """
+    global JOB
+
+    settings, folder_id, credentials, threads = prepare_run(flags, backend_name, threads)
+    max_workers = LIMITER.maximum
+
+    images_dir = Path(images_dirr)
     subtitle_path = Path(file_sub)
     if subtitle_path.suffix != ".srt":
         subtitle_path = subtitle_path.with_suffix(".srt")
 
+    # Per-image text files are only written when they outlive the run.
+    JOB = job = OCRJob(
+        reporter,
+        subtitle_path,
+        Path.cwd(),
+        keep_raw_texts=nen_raw_texts or not delete_raw_texts,
+        keep_texts=not delete_texts,
+        streaming=image_stream is not None,
+    )
+
     try:
-        if not images_dir.exists():
+        if image_stream is None and not images_dir.exists():
             LOGGER.log(f"❌ Lỗi: Thư mục {images_dir} không tồn tại.")
-            messagebox.showerror(
+            reporter.error(
                 "Lỗi",
                 f"Thư mục hình ảnh '{images_dirr}' không tồn tại.\nVui lòng kiểm tra lại đường dẫn.",
             )
-            return
-
-        raw_texts_dir.mkdir(exist_ok=True)
-        texts_dir.mkdir(exist_ok=True)
-
-        images = []
-        for extension in ("*.jpeg", "*.jpg", "*.png", "*.bmp", "*.gif"):
-            images.extend(Path(images_dirr).rglob(extension))
-
-        TOTAL_IMAGES = len(images)
-        LOGGER.log(f"|| Số luồng xử lý cùng lúc: {threads}")
-        LOGGER.log(f"👀 Tổng số ảnh tìm thấy trong thư mục '{images_dirr}': {TOTAL_IMAGES}")
-
-        if TOTAL_IMAGES == 0:
-            messagebox.showerror(
-                "Lỗi",
-                f"Thư mục '{images_dirr}' không chứa hình ảnh hợp lệ.\n"
-                "Hãy kiểm tra định dạng: JPEG, PNG, BMP, GIF.",
+            finish_run(subtitle_path)
+            reporter.finished()
+            return False
+
+        BACKEND.start()
+        job.open(resume)
+        LOGGER.log(f"🔤 Công cụ OCR: {backends.BACKEND_LABELS[BACKEND.name]}")
+        LOGGER.log(f"|| Số luồng xử lý cùng lúc: {threads} (tối đa {max_workers})")
+        time_ranges = {}
+        if image_stream is not None:
+            LOGGER.log("📡 OCR song song: xử lý ảnh ngay khi VideoSubFinder tạo ra.")
+            images = image_stream.iter_images(lambda: STOP_FLAG)
+        else:
+            collected = collect_images(job, images_dirr, settings, threads)
+            if collected is None:
+                job.close()
+                # Nothing to OCR, but the run still releases the cache and the preprocessing pool.
+                finish_run(subtitle_path)
+                reporter.finished()
+                return False
+            images, time_ranges = collected
+
+        batch_size = settings["mosaic_batch_size"] if image_stream is None and BACKEND.supports_mosaic else 1
+        use_async = settings["ocr_engine"] == "asyncio" and BACKEND.supports_async and batch_size <= 1
+        if use_async:
+            _run_async_engine(
+                job,
+                images,
+                time_ranges,
+                credentials,
+                folder_id,
+                settings["async_concurrency"],
+                settings["drive_root_url"],
             )
-            LOGGER.log(f"❌ Lỗi: Thư mục '{images_dirr}' không chứa hình ảnh hợp lệ.")
-            return
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
-            future_to_image = {
-                executor.submit(
-                    ocr_image,
-                    gui,
-                    image,
-                    index + 1,
-                    credentials,
-                    gui.folder_id,
-                    current_directory,
-                ): image
-                for index, image in enumerate(images)
-            }
-
-            for future in concurrent.futures.as_completed(future_to_image):
-                if STOP_FLAG:
-                    break
-                try:
-                    future.result()
-                except Exception as exc:
-                    LOGGER.log(f"{future_to_image[future]} generated an exception: {exc}")
-                else:
-                    with PROGRESS_LOCK:
-                        global COMPLETED_SCANS
-                        COMPLETED_SCANS += 1
-                        _progress_callback(gui)
-
-        if STOP_FLAG:
-            LOGGER.log("✅ Quá trình đã được dừng.")
-            messagebox.showinfo("Dừng", "Quá trình đã dừng lại.")
-            return
-
-        srt_content = ""
-        for i in sorted(SRT_FILE_LIST):
-            srt_content += "".join(SRT_FILE_LIST[i])
-
-        def save_srt_content(content):
-            try:
-                with open(subtitle_path, "w", encoding="utf-8") as srt_file:
-                    srt_file.write(content)
-                LOGGER.log(f"✅ Đã lưu file SRT: {subtitle_path}")
-            except Exception as exc:
-                LOGGER.log(f"❌ Lỗi khi lưu file SRT: {exc}")
-                messagebox.showerror("Lỗi", f"Không thể lưu file SRT: {exc}")
-            finally:
-                finalize_processing(
-                    gui,
-                    subtitle_path,
-                    delete_raw_texts,
-                    delete_texts,
-                    nen_raw_texts,
-                    raw_texts_dir,
-                    texts_dir,
-                )
-
-        preview_srt(gui, srt_content, save_srt_content)
+        else:
+            _run_thread_pool(job, images, time_ranges, batch_size, max_workers)
+        job.streaming = False
+        BACKEND.close()
+        return complete_job(job, delete_raw_texts, delete_texts, nen_raw_texts)
 
     except Exception as exc:
+        BACKEND.close()
+        job.close()
         LOGGER.log(f"❌ Lỗi trong quá trình xử lý: {exc}")
-        messagebox.showerror("Lỗi", f"Xảy ra lỗi trong quá trình xử lý: {exc}")
-        finalize_processing(
-            gui,
-            subtitle_path,
-            delete_raw_texts,
-            delete_texts,
-            nen_raw_texts,
-            raw_texts_dir,
-            texts_dir,
-        )
+        reporter.error("Lỗi", f"Xảy ra lỗi trong quá trình xử lý: {exc}")
+        finalize_processing(job, delete_raw_texts, delete_texts, nen_raw_texts)
+        return False
@@ -0,0 +1,128 @@
+"""Persistent, content-addressed cache of OCR results."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_results (
+    digest TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    image_bytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+_ENTRY_OVERHEAD = 128
+
+
+def digest_bytes(data: bytes) -> str:
+    """Return the BLAKE2b digest of an image already read into memory."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def content_digest(image_path) -> Tuple[str, int]:
+    """Return the BLAKE2b digest of an image's bytes and its size."""
+    data = Path(image_path).read_bytes()
+    return digest_bytes(data), len(data)
+
+
+def format_bytes(size: float) -> str:
+    """Render a byte count with a binary unit suffix."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class OCRCache:
+    """SQLite-backed map from image content digest to extracted text.
+
+    Entries unused for ``max_age_days`` are dropped, and the least recently
+    used entries are evicted once the stored text exceeds ``max_bytes``.
+    """
+
+    def __init__(self, path, max_bytes: int, max_age_days: float):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self.evict()
+
+    def lookup(self, digest: str, image_bytes: int = 0) -> Optional[str]:
+        """Return cached text for ``digest`` or ``None``, updating hit statistics."""
+        with self._lock:
+            row = self._connection.execute("SELECT text FROM ocr_results WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE ocr_results SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            self._connection.commit()
+            self.hits += 1
+            self.bytes_saved += image_bytes
+            return row[0]
+
+    def store(self, digest: str, text: str, image_bytes: int):
+        """Remember the OCR text for an image digest."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO ocr_results (digest, text, image_bytes, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (digest, text, image_bytes, now, now),
+            )
+            self._connection.commit()
+
+    def evict(self) -> int:
+        """Apply age- and size-based eviction; return the number of removed entries."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM ocr_results WHERE last_used < ?", (time.time() - self.max_age_seconds,)
+            )
+            removed = cursor.rowcount
+
+            total = self._connection.execute(
+                "SELECT COALESCE(SUM(LENGTH(CAST(text AS BLOB)) + ?), 0) FROM ocr_results", (_ENTRY_OVERHEAD,)
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                rows = self._connection.execute(
+                    "SELECT digest, LENGTH(CAST(text AS BLOB)) + ? FROM ocr_results ORDER BY last_used",
+                    (_ENTRY_OVERHEAD,),
+                ).fetchall()
+                victims = []
+                for digest, size in rows:
+                    if excess <= 0:
+                        break
+                    victims.append((digest,))
+                    excess -= size
+                self._connection.executemany("DELETE FROM ocr_results WHERE digest = ?", victims)
+                removed += len(victims)
+
+            self._connection.commit()
+            return removed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """Evict stale entries and close the database."""
+        self.evict()
+        with self._lock:
+            self._connection.close()
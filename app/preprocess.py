@@ -0,0 +1,170 @@
+"""Shrink subtitle images before upload: crop to the text, grayscale or binarize, upscale, PNG."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from PIL import Image, ImageFilter, ImageOps
+
+from .logger import LOGGER
+from .metrics import METRICS
+
+# Pixels whose edge strength exceeds this count as text when looking for the crop box.
+EDGE_THRESHOLD = 48
+CROP_MARGIN = 8
+# Bump when prepare_image changes its output, so cached OCR of older uploads is not reused.
+PREPROCESS_VERSION = 1
+
+
+class Options(NamedTuple):
+    binarize: bool = False
+    min_text_height: int = 32
+
+    def cache_tag(self) -> str:
+        """Cache-key prefix telling OCR of these uploads apart from OCR of the originals."""
+        return f"pp{PREPROCESS_VERSION}-{'bin' if self.binarize else 'gray'}-{self.min_text_height}:"
+
+
+def otsu_threshold(histogram) -> int:
+    """Grey level that best separates the two classes of a 256-bin histogram."""
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_level, best_variance = 127, -1.0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += level * count
+        mean_background = weighted_background / background
+        mean_foreground = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def text_box(gray: Image.Image):
+    """Bounding box of the strong edges plus a margin, or ``None`` for a blank image."""
+    edges = gray.filter(ImageFilter.FIND_EDGES).point(lambda value: 255 if value > EDGE_THRESHOLD else 0)
+    # FIND_EDGES lights up the outermost pixel ring; ignore it.
+    box = edges.crop((1, 1, max(1, gray.width - 1), max(1, gray.height - 1))).getbbox()
+    if box is None:
+        return None
+    left, top, right, bottom = box
+    return (
+        max(0, left + 1 - CROP_MARGIN),
+        max(0, top + 1 - CROP_MARGIN),
+        min(gray.width, right + 1 + CROP_MARGIN),
+        min(gray.height, bottom + 1 + CROP_MARGIN),
+    )
+
+
+def prepare_image(path: str, options: Options):
+    """Return ``(png_bytes, original_size, seconds)``; runs in a worker process."""
+    started = time.perf_counter()
+    original_size = os.path.getsize(path)
+    with Image.open(path) as image:
+        gray = image.convert("L")
+
+    box = text_box(gray)
+    if box is not None:
+        gray = gray.crop(box)
+    if gray.height < options.min_text_height:
+        scale = options.min_text_height / gray.height
+        gray = gray.resize((max(1, round(gray.width * scale)), options.min_text_height), Image.LANCZOS)
+    if options.binarize:
+        threshold = otsu_threshold(gray.histogram())
+        gray = gray.point(lambda value: 255 if value > threshold else 0)
+        # Drive reads dark text on a light page best; the background is the larger class.
+        if gray.histogram()[255] < gray.width * gray.height / 2:
+            gray = ImageOps.invert(gray)
+        gray = gray.convert("1")
+
+    buffer = io.BytesIO()
+    gray.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue(), original_size, time.perf_counter() - started
+
+
+class Preprocessor:
+    """Prepare images in a process pool ahead of the OCR workers.
+
+    The feeder calls :meth:`prefetch` when it queues an image, so by the
+    time a worker calls :meth:`take` the PNG is usually ready and the
+    worker goes straight to the upload. ``take`` returns ``None`` when an
+    image could not be prepared, or the preprocessor was closed meanwhile;
+    the caller then uploads the original.
+    """
+
+    def __init__(self, options: Options, workers: Optional[int] = None):
+        self.options = options
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._futures: Dict[Path, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def prefetch(self, image_path: Path):
+        with self._lock:
+            if self._closed or image_path in self._futures:
+                return
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+            self._futures[image_path] = self._executor.submit(prepare_image, str(image_path), self.options)
+
+    def forget(self, image_path: Path):
+        """Drop an image that no longer needs uploading, e.g. a cache hit."""
+        with self._lock:
+            future = self._futures.pop(image_path, None)
+        if future is not None:
+            future.cancel()
+
+    def take(self, image_path: Path) -> Optional[bytes]:
+        """The prepared PNG of ``image_path``, waiting for it if needed."""
+        self.prefetch(image_path)
+        with self._lock:
+            future = self._futures.pop(image_path, None)
+        if future is None:
+            return None
+        waited = time.perf_counter()
+        try:
+            data, original_size, seconds = future.result()
+        except concurrent.futures.CancelledError:
+            return None
+        except Exception as exc:
+            LOGGER.log(f"⚠️ Không thể tiền xử lý {image_path.name}, tải ảnh gốc lên: {exc}")
+            return None
+        finally:
+            METRICS.observe("preprocess_wait", time.perf_counter() - waited)
+        METRICS.observe("preprocess", seconds)
+        METRICS.count("preprocess_bytes_in", original_size)
+        METRICS.count("preprocess_bytes_out", len(data))
+        return data
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._closed = True
+            self._futures.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def report():
+    """Log how much preprocessing shrank the uploads of the run."""
+    before = METRICS.counters.get("preprocess_bytes_in", 0)
+    after = METRICS.counters.get("preprocess_bytes_out", 0)
+    if before:
+        LOGGER.log(
+            f"🗜️ Tiền xử lý ảnh: {before / 1024 / 1024:.1f} MB → {after / 1024 / 1024:.1f} MB "
+            f"({(1 - after / before) * 100:.0f}% nhỏ hơn)"
+        )
@@ -0,0 +1,119 @@
+"""Coalesce progress from VideoSubFinder and OCR into a few UI updates per second, with ETAs."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+from . import timecodes
+
+
+class Throughput:
+    """Exponentially weighted rate of a growing counter.
+
+    Samples closer together than ``min_interval`` are merged, so bursts of
+    events do not swing the rate; ``alpha`` weighs the newest sample.
+    """
+
+    def __init__(self, alpha: float = 0.3, min_interval: float = 0.5):
+        self.alpha = alpha
+        self.min_interval = min_interval
+        self.rate: Optional[float] = None
+        self._last_value = 0.0
+        self._last_time: Optional[float] = None
+
+    def update(self, value: float, now: float):
+        if self._last_time is None or value < self._last_value:
+            self._last_value, self._last_time = value, now
+            return
+        elapsed = now - self._last_time
+        if elapsed < self.min_interval:
+            return
+        sample = (value - self._last_value) / elapsed
+        self.rate = sample if self.rate is None else self.alpha * sample + (1 - self.alpha) * self.rate
+        self._last_value, self._last_time = value, now
+
+    def eta(self, remaining: float) -> Optional[float]:
+        """Seconds left for ``remaining`` units at the current rate, if it is known."""
+        if not self.rate or self.rate <= 0:
+            return None
+        return max(0.0, remaining) / self.rate
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    return "" if seconds is None else f" | ⏳ Còn ~{timecodes.format_clock(int(seconds * 1000))}"
+
+
+class ProgressBus:
+    """Latest progress of every stage, published at most ``max_updates_per_second`` times.
+
+    Stages write from any thread; nothing is drawn until :meth:`pump`
+    runs, which the GUI calls from a ``root.after`` loop on the Tk thread.
+    ``publish(percentage, text)`` receives the bar value (``None`` leaves
+    the bar alone) and the status line.
+    """
+
+    def __init__(self, publish: Callable[[Optional[float], str], None], max_updates_per_second: float = 10):
+        self.publish = publish
+        self.interval = 1.0 / max(0.1, max_updates_per_second)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._bar: Optional[float] = None
+        self._text = ""
+        self._last_publish = 0.0
+        self._extraction_text = ""
+        self.extraction = Throughput()
+        self.ocr = Throughput()
+
+    def reset(self):
+        """Forget the rates of the previous run."""
+        with self._lock:
+            self.extraction = Throughput()
+            self.ocr = Throughput()
+            self._extraction_text = ""
+
+    def update_extraction(self, percentage: float, text: str = ""):
+        """``text`` is kept for later updates that only move the percentage."""
+        now = time.monotonic()
+        with self._lock:
+            self.extraction.update(percentage, now)
+            if text:
+                self._extraction_text = text
+            base = self._extraction_text or f"🎞️ VideoSubFinder: {percentage:.0f}%"
+            self._set(percentage, base + format_eta(self.extraction.eta(100 - percentage)))
+
+    def update_ocr(self, done: int, total: int, streaming: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            self.ocr.update(done, now)
+            rate = f" | {self.ocr.rate:.1f} ảnh/s" if self.ocr.rate else ""
+            if streaming:
+                # The progress bar belongs to VideoSubFinder while images are still arriving.
+                self._set(None, f"📡 Đã OCR: {done}/{total} (đang nhận ảnh){rate}")
+            else:
+                eta = format_eta(self.ocr.eta(total - done))
+                self._set(done / total * 100 if total else 0, f"✅ Đã OCR: {done}/{total}{rate}{eta}")
+
+    def set_status(self, text: str):
+        """A one-off status line; it replaces any progress text not yet shown."""
+        with self._lock:
+            self._set(None, text)
+
+    def _set(self, bar: Optional[float], text: str):
+        if bar is not None:
+            self._bar = bar
+        self._text = text
+        self._dirty = True
+
+    def pump(self, force: bool = False):
+        """Publish the latest state if it changed and the rate limit allows it."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty or (not force and now - self._last_publish < self.interval):
+                return
+            bar, text = self._bar, self._text
+            self._bar = None
+            self._dirty = False
+            self._last_publish = now
+        self.publish(bar, text)
@@ -0,0 +1,91 @@
+"""Callbacks through which the pipeline reports to whoever started it."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from . import progress
+
+
+class Reporter:
+    """Progress and outcome hooks for a pipeline run.
+
+    The pipeline modules (``vsf``, ``monitor``, ``ocr``) only talk to a
+    reporter, never to Tk widgets. This base class is the headless
+    behaviour: progress and notices are dropped (the pipeline also logs
+    them) and the SRT is saved without review. The GUI and the CLI
+    override what they need.
+    """
+
+    def extraction_progress(self, percentage: float, text: str = ""):
+        """VideoSubFinder progress, ``0..100``."""
+
+    def ocr_progress(self, done: int, total: int, streaming: bool = False):
+        """``done`` of ``total`` images OCR'd; ``total`` still grows while ``streaming``."""
+
+    def status(self, text: str):
+        """One-line status for the current stage."""
+
+    def error(self, title: str, message: str):
+        """A failure the user has to know about."""
+
+    def info(self, title: str, message: str):
+        """A notice the user has to know about."""
+
+    def review_srt(self, content: str, save: Callable[[str], None]):
+        """Let the user review the SRT, then call ``save`` with the final text."""
+        save(content)
+
+    def finished(self):
+        """The run is over, successfully or not."""
+
+
+class ConsoleReporter(Reporter):
+    """Print progress on one line of a terminal stream, a few times a second.
+
+    With ``redraw=False`` every update goes on its own line instead, for
+    when log lines are printed to the same terminal.
+    """
+
+    def __init__(self, stream, prefix: str = "", max_updates_per_second: float = 4, redraw: bool = True):
+        self.stream = stream
+        self.prefix = prefix
+        self.redraw = redraw
+        self._last = ""
+        self.bus = progress.ProgressBus(self._publish, max_updates_per_second)
+
+    def _publish(self, percentage, text: str):
+        self._write(text)
+
+    def _write(self, text: str):
+        line = f"{self.prefix}{text}"
+        if line == self._last:
+            return
+        self._last = line
+        self.stream.write(f"\r{line:<79}" if self.redraw else f"{line}\n")
+        self.stream.flush()
+
+    def extraction_progress(self, percentage: float, text: str = ""):
+        self.bus.update_extraction(percentage, f"VideoSubFinder {percentage:5.1f}%")
+        self.bus.pump()
+
+    def ocr_progress(self, done: int, total: int, streaming: bool = False):
+        self.bus.update_ocr(done, total, streaming)
+        self.bus.pump()
+
+    def status(self, text: str):
+        self.bus.set_status(text)
+        self.bus.pump(force=True)
+
+    def error(self, title: str, message: str):
+        self.stream.write(f"\n{title}: {message}\n")
+        self.stream.flush()
+        self._last = ""
+
+    def finished(self):
+        self.bus.pump(force=True)
+        self.bus.reset()
+        if self._last and self.redraw:
+            self.stream.write("\n")
+            self.stream.flush()
+        self._last = ""
@@ -0,0 +1,245 @@
+"""Run a batch of videos: VideoSubFinder on the CPU while one OCR pool drains every job."""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from . import ocr, vsf
+from .logger import LOGGER
+from .metrics import METRICS
+
+
+def default_extraction_workers() -> int:
+    """VideoSubFinder processes to run at once; each one already keeps about two cores busy."""
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+class VideoJob:
+    """One video of a batch: how to extract it, its OCR job and its timings."""
+
+    def __init__(self, video: Path, command, output_base: str, subtitle_path: Path, duration: str, reporter):
+        self.video = video
+        self.command = command
+        self.output_base = output_base
+        self.subtitle_path = subtitle_path
+        self.duration = duration
+        self.reporter = reporter
+        self.ocr_job: Optional[ocr.OCRJob] = None
+        self.batches = None
+        self.time_ranges = {}
+        self.extract_seconds = 0.0
+        self.saved = False
+
+    @property
+    def images_folder(self) -> str:
+        return os.path.join(self.output_base, "RGBImages")
+
+    @property
+    def images(self) -> int:
+        return self.ocr_job.total if self.ocr_job is not None else 0
+
+    @property
+    def failed(self) -> int:
+        return self.ocr_job.failed if self.ocr_job is not None else 0
+
+    @property
+    def ocr_seconds(self) -> float:
+        return self.ocr_job.elapsed if self.ocr_job is not None else 0.0
+
+
+class PipelineScheduler:
+    """Overlap CPU-bound extraction of some videos with network-bound OCR of others.
+
+    Up to ``extraction_workers`` VideoSubFinder processes run at once. When a
+    video's images are on disk its OCR job joins a single shared thread
+    pool, and the feeder hands out one task per active job in turn, so a
+    long episode never starves one that finished extracting after it. Each
+    job is reviewed, saved and cleaned up as soon as its last image is done.
+    """
+
+    def __init__(
+        self,
+        flags,
+        delete_flags,
+        backend_name: Optional[str] = None,
+        threads: Optional[int] = None,
+        extraction_workers: Optional[int] = None,
+        resume: bool = False,
+    ):
+        self.flags = flags
+        self.delete_raw_texts, self.delete_texts, self.nen_raw_texts = delete_flags
+        self.backend_name = backend_name
+        self.threads = threads
+        self.extraction_workers = extraction_workers
+        self.resume = resume
+        self.wall_seconds = 0.0
+
+    def run(self, video_jobs: List[VideoJob]) -> List[VideoJob]:
+        """Extract and OCR every job; returns them with their outcome and timings filled in."""
+        started = time.time()
+        METRICS.reset()
+        settings, _folder_id, _credentials, threads = ocr.prepare_run(self.flags, self.backend_name, self.threads)
+        extraction_workers = self.extraction_workers or settings["vsf_workers"] or default_extraction_workers()
+        extraction_workers = min(extraction_workers, len(video_jobs))
+        max_workers = ocr.LIMITER.maximum
+        batch_size = settings["mosaic_batch_size"] if ocr.BACKEND.supports_mosaic else 1
+        ocr.BACKEND.start()
+        LOGGER.log(
+            f"🗂️ Xử lý {len(video_jobs)} video: {extraction_workers} VideoSubFinder song song, "
+            f"{threads} luồng OCR dùng chung (tối đa {max_workers})."
+        )
+
+        ready: queue.Queue = queue.Queue()
+        extractors = concurrent.futures.ThreadPoolExecutor(
+            max_workers=extraction_workers, thread_name_prefix="vsf"
+        )
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr")
+        finishers: List[threading.Thread] = []
+        try:
+            for video_job in video_jobs:
+                extractors.submit(self._extract, video_job, settings, threads, batch_size, ready)
+            self._feed(len(video_jobs), ready, executor, max_workers, finishers)
+        finally:
+            extractors.shutdown(wait=not ocr.STOP_FLAG, cancel_futures=True)
+            executor.shutdown(wait=True, cancel_futures=ocr.STOP_FLAG)
+            for finisher in finishers:
+                finisher.join()
+            ocr.finish_run(video_jobs[0].subtitle_path.with_name("batch.srt") if video_jobs else None)
+            self.wall_seconds = time.time() - started
+
+        for line in format_report(video_jobs, self.wall_seconds):
+            LOGGER.log(line)
+        return video_jobs
+
+    def _extract(self, video_job: VideoJob, settings, threads: int, batch_size: int, ready: queue.Queue):
+        """Run VideoSubFinder for one video and queue its OCR job once the images are ready."""
+        started = time.time()
+        try:
+            extracted = vsf.extract_images(
+                video_job.reporter,
+                video_job.command,
+                video_job.output_base,
+                "RGBImages",
+                video_job.duration,
+                watch_folder=False,
+            )
+            video_job.extract_seconds = time.time() - started
+            if extracted and not ocr.STOP_FLAG:
+                self._prepare_ocr(video_job, settings, threads, batch_size)
+            if ocr.STOP_FLAG and video_job.batches is not None:
+                # The feeder may have stopped already; nothing else would close this job.
+                video_job.ocr_job.close()
+                video_job.batches = None
+        except Exception as exc:
+            LOGGER.log(f"❌ Lỗi khi chuẩn bị OCR cho {video_job.video.name}: {exc}")
+            video_job.reporter.error("Lỗi", f"Xảy ra lỗi trong quá trình xử lý: {exc}")
+            if video_job.ocr_job is not None:
+                video_job.ocr_job.close()
+            video_job.batches = None
+        finally:
+            ready.put(video_job)
+
+    def _prepare_ocr(self, video_job: VideoJob, settings, threads: int, batch_size: int):
+        job = ocr.OCRJob(
+            video_job.reporter,
+            video_job.subtitle_path,
+            Path(video_job.output_base),
+            keep_raw_texts=self.nen_raw_texts or not self.delete_raw_texts,
+            keep_texts=not self.delete_texts,
+        )
+        video_job.ocr_job = job
+        job.open(self.resume)
+        collected = ocr.collect_images(job, video_job.images_folder, settings, threads)
+        if collected is None:
+            job.close()
+            video_job.reporter.finished()
+            return
+        images, video_job.time_ranges = collected
+        video_job.batches = ocr.batches(images, batch_size)
+
+    def _feed(self, pending: int, ready: queue.Queue, executor, max_workers: int, finishers: List[threading.Thread]):
+        """Submit one task per active job in turn until every job has been handed out."""
+        in_flight = threading.BoundedSemaphore(max_workers * 2)
+        active: collections.deque = collections.deque()
+        while pending or active:
+            if ocr.STOP_FLAG:
+                self._stop_active(active, ready, finishers)
+                return
+            try:
+                video_job = ready.get(timeout=0.2) if not active else ready.get_nowait()
+            except queue.Empty:
+                video_job = None
+            if video_job is not None:
+                pending -= 1
+                if video_job.batches is not None:
+                    video_job.ocr_job.start_time = time.time()
+                    active.append(video_job)
+                continue
+            if not active:
+                continue
+
+            video_job = active.popleft()
+            batch = next(video_job.batches, None)
+            if batch is None:
+                self._start_finisher(video_job, finishers)
+                continue
+            if not ocr.acquire_window(in_flight):
+                active.append(video_job)
+                self._stop_active(active, ready, finishers)
+                return
+            first_line, images = batch
+            ocr.submit_batch(executor, video_job.ocr_job, first_line, images, video_job.time_ranges, in_flight)
+            active.append(video_job)
+
+    def _start_finisher(self, video_job: VideoJob, finishers: List[threading.Thread]):
+        finisher = threading.Thread(target=self._finish, args=(video_job,), daemon=True)
+        finishers.append(finisher)
+        finisher.start()
+
+    def _stop_active(self, active: collections.deque, ready: queue.Queue, finishers: List[threading.Thread]):
+        """On a stop, finish every job that has its SRT and journal open, so their done lines are kept."""
+        while True:
+            try:
+                video_job = ready.get_nowait()
+            except queue.Empty:
+                break
+            if video_job.batches is not None:
+                active.append(video_job)
+        while active:
+            self._start_finisher(active.popleft(), finishers)
+
+    def _finish(self, video_job: VideoJob):
+        """Wait for the job's last task, then save and clean up its SRT."""
+        video_job.ocr_job.wait_drained()
+        video_job.saved = ocr.complete_job(
+            video_job.ocr_job, self.delete_raw_texts, self.delete_texts, self.nen_raw_texts, end_run=False
+        )
+
+
+def format_report(video_jobs: List[VideoJob], wall_seconds: float) -> List[str]:
+    """Per-video and aggregate throughput lines for the log and the terminal."""
+    lines = []
+    for video_job in video_jobs:
+        rate = video_job.images / video_job.ocr_seconds if video_job.ocr_seconds else 0.0
+        outcome = "✅" if video_job.saved else "❌"
+        lines.append(
+            f"📊 {outcome} {video_job.video.name}: VSF {video_job.extract_seconds:.1f}s | "
+            f"OCR {video_job.images} ảnh trong {video_job.ocr_seconds:.1f}s ({rate:.2f} ảnh/s) | "
+            f"lỗi {video_job.failed}"
+        )
+    total_images = sum(video_job.images for video_job in video_jobs)
+    extract_seconds = sum(video_job.extract_seconds for video_job in video_jobs)
+    ocr_seconds = sum(video_job.ocr_seconds for video_job in video_jobs)
+    rate = total_images / wall_seconds if wall_seconds else 0.0
+    lines.append(
+        f"📊 Tổng cộng: {len(video_jobs)} video, {total_images} ảnh trong {wall_seconds:.1f}s "
+        f"({rate:.2f} ảnh/s) | VSF {extract_seconds:.1f}s + OCR {ocr_seconds:.1f}s cộng dồn"
+    )
+    return lines
@@ -0,0 +1,197 @@
+"""Split one video into time segments for parallel VideoSubFinder runs, and merge their images back."""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from . import dedupe, manifest, timecodes
+from .logger import LOGGER
+
+SEGMENTS_FOLDER = "segments"
+# Two segments report the same subtitle a frame or two apart around the cut.
+BOUNDARY_TOLERANCE_MS = 250
+_TIMES = re.compile(r"\d+_\d+_\d+_\d+__\d+_\d+_\d+_\d+")
+
+
+class Segment(NamedTuple):
+    """One VSF run: it reads ``start_ms..end_ms`` and owns ``own_start_ms..own_end_ms``.
+
+    The read range adds the overlap on both sides of the owned one; the
+    last segment has no end and reads to the end of the video, since the
+    duration from ``video_utils`` is rounded down to the second.
+    """
+
+    index: int
+    start_ms: int
+    end_ms: Optional[int]
+    own_start_ms: int
+    own_end_ms: Optional[int]
+
+    def folder(self, output_base: str) -> str:
+        return os.path.join(output_base, SEGMENTS_FOLDER, f"{self.index:02d}")
+
+
+def auto_count() -> int:
+    """One segment per two cores, like the batch scheduler's extraction workers."""
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def plan_segments(duration_ms: int, count: int, overlap_ms: int, min_segment_ms: int) -> List[Segment]:
+    """Split ``duration_ms`` into up to ``count`` equal owned ranges of at least ``min_segment_ms``."""
+    if count <= 0:
+        count = auto_count()
+    count = max(1, min(count, duration_ms // max(1, min_segment_ms)))
+    segments = []
+    for index in range(count):
+        own_start = duration_ms * index // count
+        own_end = duration_ms * (index + 1) // count if index < count - 1 else None
+        segments.append(
+            Segment(
+                index + 1,
+                max(0, own_start - overlap_ms),
+                own_end + overlap_ms if own_end is not None else None,
+                own_start,
+                own_end,
+            )
+        )
+    return segments
+
+
+def plan_for_video(settings, video_duration: str) -> List[Segment]:
+    """The segments the ``[pipeline]`` settings ask for; empty when the video is not split."""
+    plan = plan_segments(
+        timecodes.parse_clock(video_duration) or 0,
+        settings["vsf_segments"],
+        settings["vsf_segment_overlap_ms"],
+        settings["vsf_min_segment_seconds"] * 1000,
+    )
+    return plan if len(plan) > 1 else []
+
+
+class _Frame:
+    __slots__ = ("path", "name", "segment", "start_ms", "end_ms", "hash")
+
+    def __init__(self, path: str, name: str, segment: Segment, start_ms: int, end_ms: int):
+        self.path = path
+        self.name = name
+        self.segment = segment
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.hash: Optional[int] = None
+
+    def image_hash(self) -> Optional[int]:
+        if self.hash is None:
+            try:
+                self.hash = dedupe.dhash(self.path)
+            except Exception:
+                self.hash = -1
+        return self.hash if self.hash >= 0 else None
+
+
+def _list_frames(segment: Segment, output_base: str, folder_name: str) -> Tuple[List[_Frame], List[_Frame]]:
+    """Timed frames of a segment in timeline order, and the frames without timecodes."""
+    entries = list(manifest.walk_images(os.path.join(segment.folder(output_base), folder_name)).values())
+    timed, untimed = [], []
+    for entry in entries:
+        time_range = timecodes.parse_vsf_name(entry.name)
+        if time_range is None:
+            untimed.append(_Frame(entry.path, entry.name, segment, timecodes.NO_TIME, timecodes.NO_TIME))
+        else:
+            timed.append(_Frame(entry.path, entry.name, segment, *time_range))
+    timed.sort(key=lambda frame: (frame.start_ms, frame.end_ms, frame.name))
+    return timed, untimed
+
+
+def _boundary_duplicates(left: List[_Frame], right: List[_Frame], cut_ms: int, max_distance: int) -> List[_Frame]:
+    """Frames both neighbours extracted from their overlap; returns the copies to drop.
+
+    A frame of the left segment and one of the right are the same subtitle
+    when their times overlap (within the tolerance) and their dHashes are
+    close. The copy kept is the one whose segment owns the middle of the
+    pair's combined range, and it takes that combined range, since the
+    other copy may have been cut short by its segment's edge.
+    """
+    right_start = right[0].segment.start_ms if right else cut_ms
+    left_end = left[0].segment.end_ms if left else cut_ms
+    tail = [frame for frame in left if frame.end_ms >= right_start - BOUNDARY_TOLERANCE_MS]
+    head = [frame for frame in right if frame.start_ms <= left_end + BOUNDARY_TOLERANCE_MS]
+
+    pairs = []
+    for left_frame in tail:
+        for right_frame in head:
+            shared = min(left_frame.end_ms, right_frame.end_ms) - max(left_frame.start_ms, right_frame.start_ms)
+            if shared < -BOUNDARY_TOLERANCE_MS:
+                continue
+            left_hash, right_hash = left_frame.image_hash(), right_frame.image_hash()
+            if left_hash is None or right_hash is None:
+                continue
+            distance = dedupe.hamming(left_hash, right_hash)
+            if distance <= max_distance:
+                pairs.append((distance, -shared, left_frame, right_frame))
+
+    pairs.sort(key=lambda pair: pair[:2])
+    matched = set()
+    dropped = []
+    for _, _, left_frame, right_frame in pairs:
+        if id(left_frame) in matched or id(right_frame) in matched:
+            continue
+        matched.update((id(left_frame), id(right_frame)))
+        start_ms = min(left_frame.start_ms, right_frame.start_ms)
+        end_ms = max(left_frame.end_ms, right_frame.end_ms)
+        keep, drop = (left_frame, right_frame) if (start_ms + end_ms) // 2 < cut_ms else (right_frame, left_frame)
+        keep.start_ms, keep.end_ms = start_ms, end_ms
+        dropped.append(drop)
+    return dropped
+
+
+def _target_name(frame: _Frame) -> str:
+    """The frame's name with its (possibly widened) times, keeping VSF's suffix."""
+    match = _TIMES.match(frame.name)
+    if match is None:
+        return frame.name
+    times = f"{timecodes.format_vsf_time(frame.start_ms, '_')}__{timecodes.format_vsf_time(frame.end_ms, '_')}"
+    return times + frame.name[match.end() :]
+
+
+def merge_segments(
+    segments: List[Segment], output_base: str, folder_name: str = "RGBImages", max_distance: int = 16
+) -> Tuple[int, int]:
+    """Move the images of every segment into ``output_base/folder_name`` as one timeline.
+
+    Duplicates from the overlaps are dropped (see :func:`_boundary_duplicates`)
+    and the segment folders are removed. Returns ``(images, duplicates)``.
+    """
+    target = os.path.join(output_base, folder_name)
+    os.makedirs(target, exist_ok=True)
+    timed: Dict[int, List[_Frame]] = {}
+    untimed: List[_Frame] = []
+    for segment in segments:
+        timed[segment.index], segment_untimed = _list_frames(segment, output_base, folder_name)
+        untimed.extend(segment_untimed)
+
+    dropped = set()
+    for left, right in zip(segments, segments[1:]):
+        for frame in _boundary_duplicates(timed[left.index], timed[right.index], left.own_end_ms, max_distance):
+            dropped.add(id(frame))
+
+    merged = 0
+    for segment in segments:
+        for frame in timed[segment.index] + [frame for frame in untimed if frame.segment is segment]:
+            if id(frame) in dropped:
+                continue
+            name = _target_name(frame)
+            if os.path.exists(os.path.join(target, name)):
+                stem, extension = os.path.splitext(name)
+                name = f"{stem}_{segment.index:02d}{extension}"
+            try:
+                os.replace(frame.path, os.path.join(target, name))
+            except OSError as exc:
+                LOGGER.log(f"⚠️ Không thể chuyển ảnh {frame.path}: {exc}")
+                continue
+            merged += 1
+
+    shutil.rmtree(os.path.join(output_base, SEGMENTS_FOLDER), ignore_errors=True)
+    return merged, len(dropped)
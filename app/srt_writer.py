@@ -0,0 +1,120 @@
+"""Write SRT entries to disk in order as OCR results arrive out of order."""
+
+from __future__ import annotations
+
+import operator
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .timecodes import SubtitleEvent
+
+
+class SRTWriter:
+    """Append entries to an SRT file in line order through a reorder buffer.
+
+    Workers finish in any order; an entry is written once every earlier
+    line has either been added or skipped, so the file on disk is always a
+    valid, gap-free prefix of the final subtitle. Entries are renumbered
+    consecutively, which keeps the file valid when some lines fail.
+
+    The entries go to ``<name>.part`` next to ``path``, which :meth:`close`
+    moves over ``path``; an existing SRT is only replaced once the run has
+    something to put in its place.
+
+    Streamed images get their lines in arrival order, which VSF does not
+    keep; with ``sort_by_time`` the entries are kept in memory and
+    :meth:`close` rewrites the file ordered by start time.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 2.0, flush_every: int = 50, sort_by_time: bool = False):
+        self.path = Path(path)
+        self.partial_path = self.path.with_name(self.path.name + ".part")
+        self._file = open(self.partial_path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Optional[SubtitleEvent]] = {}
+        self._next_line = 1
+        self._flush_interval = flush_interval
+        self._flush_every = flush_every
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._events: Optional[List[SubtitleEvent]] = [] if sort_by_time else None
+        self.written = 0
+
+    @property
+    def buffered(self) -> int:
+        """Entries waiting for an earlier line before they can be written."""
+        return len(self._pending)
+
+    def add(self, event: SubtitleEvent):
+        with self._lock:
+            self._pending[event.line] = event
+            self._drain()
+
+    def skip(self, line: int):
+        """Mark ``line`` as producing no entry so later lines are not held back.
+
+        A line that is already written or buffered keeps its entry.
+        """
+        with self._lock:
+            if line < self._next_line:
+                return
+            self._pending.setdefault(line, None)
+            self._drain()
+
+    def _drain(self):
+        while self._next_line in self._pending:
+            self._write(self._pending.pop(self._next_line))
+            self._next_line += 1
+        if self._unflushed and (
+            self._unflushed >= self._flush_every or time.monotonic() - self._last_flush >= self._flush_interval
+        ):
+            self._flush()
+
+    def _write(self, event: Optional[SubtitleEvent]):
+        if event is None or self._file is None:
+            return
+        self.written += 1
+        self._file.write(event.to_srt(self.written))
+        self._unflushed += 1
+        if self._events is not None:
+            self._events.append(event)
+
+    def _flush(self):
+        self._file.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self, replace_empty: bool = False) -> int:
+        """Write whatever is still buffered, in order, and move the file into place.
+
+        Lines that never arrived (a stopped run) are left out. When no entry
+        was written the partial file is dropped and an existing SRT is kept,
+        unless ``replace_empty`` is set. Returns the number of entries written.
+        """
+        with self._lock:
+            if self._file is None:
+                return self.written
+            for line in sorted(self._pending):
+                self._write(self._pending[line])
+            self._pending.clear()
+            self._file.close()
+            self._file = None
+            if self._events is not None:
+                self._sort_file()
+            if self.written or replace_empty:
+                os.replace(self.partial_path, self.path)
+            else:
+                self.partial_path.unlink(missing_ok=True)
+            return self.written
+
+    def _sort_file(self):
+        key = operator.attrgetter("start_ms", "line")
+        events, self._events = self._events, None
+        if all(key(earlier) <= key(later) for earlier, later in zip(events, events[1:])):
+            return
+        events.sort(key=key)
+        with open(self.partial_path, "w", encoding="utf-8") as srt_file:
+            srt_file.writelines(event.to_srt(index) for index, event in enumerate(events, start=1))
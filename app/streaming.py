@@ -0,0 +1,129 @@
+"""Hand finished RGBImages to the OCR pool while VideoSubFinder is still running."""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .constants import IMAGE_EXTENSIONS, STREAM_QUEUE_SIZE
+from .logger import LOGGER
+
+_END_OF_STREAM = object()
+
+
+class ImageStream:
+    """Bounded queue of fully written images, closed when VSF exits.
+
+    The monitor calls :meth:`submit` for every new file. A settle thread
+    only forwards a file once its size has stayed the same for
+    ``settle_checks`` consecutive polls, so half-written images are never
+    uploaded. :meth:`close` rescans the folder for anything the watcher
+    missed, flushes every pending file and then ends the stream.
+    """
+
+    def __init__(self, maxsize: int = STREAM_QUEUE_SIZE, settle_interval: float = 0.2, settle_checks: int = 2):
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._settle_interval = settle_interval
+        self._settle_checks = settle_checks
+        self._lock = threading.Lock()
+        self._pending: dict[str, tuple[int, int]] = {}
+        self._seen: set[str] = set()
+        self._closing = threading.Event()
+        self._cancelled = threading.Event()
+        self._settler = threading.Thread(target=self._settle_loop, daemon=True)
+        self._settler.start()
+
+    @property
+    def submitted(self) -> int:
+        """Number of distinct images handed to the stream so far."""
+        return len(self._seen)
+
+    def submit(self, path: str):
+        """Register a newly created image; never blocks the caller."""
+        if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+            return
+        with self._lock:
+            if path in self._seen or self._closing.is_set():
+                return
+            self._seen.add(path)
+            self._pending[path] = (-1, 0)
+
+    def close(self, folder: Optional[str] = None):
+        """Mark the producer as finished, picking up files missed by the watcher."""
+        if folder and os.path.isdir(folder):
+            for root, _dirs, files in os.walk(folder):
+                for name in sorted(files):
+                    self.submit(os.path.join(root, name))
+        self._closing.set()
+
+    def cancel(self):
+        """Abort the stream; consumers stop at the next item."""
+        self._cancelled.set()
+        self._closing.set()
+
+    def _put(self, item) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _settled_paths(self, flush: bool) -> list[str]:
+        ready = []
+        with self._lock:
+            for path, (last_size, stable) in list(self._pending.items()):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    if flush:
+                        del self._pending[path]
+                    continue
+                if flush:
+                    if size > 0:
+                        ready.append(path)
+                    else:
+                        del self._pending[path]
+                    continue
+                stable = stable + 1 if size > 0 and size == last_size else 0
+                if stable >= self._settle_checks:
+                    ready.append(path)
+                else:
+                    self._pending[path] = (size, stable)
+            for path in ready:
+                del self._pending[path]
+        ready.sort()
+        return ready
+
+    def _settle_loop(self):
+        while not self._cancelled.is_set():
+            flush = self._closing.is_set()
+            for path in self._settled_paths(flush):
+                if not self._put(Path(path)):
+                    return
+            if flush:
+                with self._lock:
+                    if not self._pending:
+                        break
+            time.sleep(self._settle_interval)
+        self._put(_END_OF_STREAM)
+
+    def iter_images(self, should_stop: Callable[[], bool] = lambda: False) -> Iterator[Path]:
+        """Yield finished images until the stream ends or ``should_stop`` is true."""
+        while not self._cancelled.is_set():
+            if should_stop():
+                self.cancel()
+                return
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _END_OF_STREAM:
+                LOGGER.log(f"📭 Đã nhận đủ {self.submitted} ảnh từ VideoSubFinder.")
+                return
+            yield item
@@ -0,0 +1,69 @@
+"""VideoSubFinder timecodes as integer milliseconds, and the subtitle events built from them."""
+
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+
+# VSF names images "H_MM_SS_mmm__H_MM_SS_mmm_<suffix>": start and end of the subtitle.
+_VSF_NAME = re.compile(r"(\d+)_(\d+)_(\d+)_(\d+)__(\d+)_(\d+)_(\d+)_(\d+)")
+_CLOCK = re.compile(r"(\d+):(\d+):(\d+)")
+
+NO_TIME = -1
+
+
+def parse_vsf_name(name: str) -> Optional[Tuple[int, int]]:
+    """Return ``(start_ms, end_ms)`` from a VideoSubFinder image name."""
+    match = _VSF_NAME.match(name)
+    if match is None:
+        return None
+    h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.groups())
+    return ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1, ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2
+
+
+def parse_clock(text: str) -> Optional[int]:
+    """``"HH:MM:SS"`` (a video duration) in milliseconds."""
+    match = _CLOCK.fullmatch(text.strip())
+    if match is None:
+        return None
+    hours, minutes, seconds = map(int, match.groups())
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000
+
+
+def format_clock(milliseconds: int) -> str:
+    """``H:MM:SS`` for status lines; negative values clamp to zero."""
+    seconds = max(0, milliseconds) // 1000
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def format_vsf_time(milliseconds: int, separator: str = ":") -> str:
+    """``H:MM:SS:mmm`` as VideoSubFinder's ``-s``/``-e`` take it; ``separator="_"`` gives the image-name form."""
+    seconds, millis = divmod(max(0, milliseconds), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}{separator}{minutes:02d}{separator}{seconds:02d}{separator}{millis:03d}"
+
+
+def format_srt_time(milliseconds: int) -> str:
+    seconds, millis = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+class SubtitleEvent:
+    """One subtitle line: its position in the SRT, its time range and its text."""
+
+    __slots__ = ("line", "start_ms", "end_ms", "text")
+
+    def __init__(self, line: int, start_ms: int, end_ms: int, text: str):
+        self.line = line
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+
+    def to_srt(self, index: int) -> str:
+        """The SRT block for this event, numbered ``index``."""
+        return f"{index}\n{format_srt_time(self.start_ms)} --> {format_srt_time(self.end_ms)}\n{self.text}\n\n"
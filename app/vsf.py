@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 
+import collections
 import os
+import queue
 import re
+import shutil
 import subprocess
 import threading
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-from tkinter import messagebox
-
-from . import monitor
+from . import drive_pool, monitor, segments, timecodes
 from .logger import LOGGER
+from .metrics import METRICS
+
+_PERCENT = re.compile(r"%(\d+)")
+# Progress lines are forwarded at most this often; VSF prints them far faster than anyone reads them.
+PROGRESS_INTERVAL = 0.25
+# Lines of stderr kept for the error report.
+STDERR_TAIL = 50
 
 
 def build_command(
@@ -22,8 +32,10 @@ def build_command(
     crop_left: float,
     crop_right: float,
     create_txtimages: bool,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
 ):
-    """Construct the VideoSubFinder command."""
+    """Construct the VideoSubFinder command; ``start_ms``/``end_ms`` limit it to part of the video."""
     base_command = [
         vsf_path,
         "-c",
@@ -47,104 +59,324 @@ def build_command(
             str(crop_right),
         ]
     )
-    return base_command
+    return base_command + _range_arguments(start_ms, end_ms)
+
+
+def _range_arguments(start_ms: Optional[int], end_ms: Optional[int]) -> List[str]:
+    arguments = []
+    if start_ms:
+        arguments += ["-s", timecodes.format_vsf_time(start_ms)]
+    if end_ms is not None:
+        arguments += ["-e", timecodes.format_vsf_time(end_ms)]
+    return arguments
+
+
+def segment_command(command, segment: segments.Segment, output_base: str) -> List[str]:
+    """``command`` limited to ``segment``'s time range and writing into the segment's own folder."""
+    segment_command = list(command)
+    segment_command[segment_command.index("-o") + 1] = segment.folder(output_base)
+    return segment_command + _range_arguments(segment.start_ms, segment.end_ms)
+
 
+class VsfProcess:
+    """A VideoSubFinder child whose stdout and stderr are both drained while it runs.
 
-def run_vsf(gui, command, output_base_path: str, output_folder_name: str):
-    """Execute VideoSubFinder and update the UI/log accordingly."""
+    One reader thread per pipe pushes ``(stream, line)`` pairs into a single
+    queue (``select`` cannot wait on pipes on Windows), so a chatty stderr
+    never fills its pipe and stalls VSF, and :meth:`lines` blocks instead
+    of spinning while VSF is quiet. The child is tracked in :data:`RUNNING`
+    until :meth:`close`, so it can be killed by PID on exit.
+    """
 
-    def run_videosubfinder():
+    def __init__(self, command):
+        self.command = command
+        self.process: Optional[subprocess.Popen] = None
+        self.cancelled = False
+        self.returncode: Optional[int] = None
+        self.stderr_lines: List[str] = []
+        self._lines: queue.SimpleQueue = queue.SimpleQueue()
+        self._readers: List[threading.Thread] = []
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="replace"
+        )
+        RUNNING.add(self)
+        for stream, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            reader = threading.Thread(target=self._read, args=(stream, pipe), name=f"vsf-{stream}", daemon=True)
+            reader.start()
+            self._readers.append(reader)
+        return self
+
+    def _read(self, stream: str, pipe):
         try:
-            LOGGER.log(f"🚀 Đang chạy lệnh VideoSubFinder: {' '.join(command)}")
+            for line in pipe:
+                self._lines.put((stream, line.strip()))
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._lines.put((stream, None))
 
-            video_output_folder = output_base_path
-            images_folder = os.path.join(video_output_folder, output_folder_name)
-            rgb_images_folder = os.path.join(video_output_folder, "RGBImages")
+    def lines(self) -> Iterator[Tuple[str, str]]:
+        """``(stream, line)`` in arrival order until both pipes are closed."""
+        open_pipes = len(self._readers)
+        while open_pipes:
+            stream, line = self._lines.get()
+            if line is None:
+                open_pipes -= 1
+            else:
+                yield stream, line
 
-            LOGGER.log(f"👀 Bắt đầu giám sát thư mục RGBImages tại: {rgb_images_folder}")
-            threading.Thread(
-                target=monitor.wait_for_rgbimages_and_monitor,
-                args=(gui, rgb_images_folder, gui.duration or "00:00:00"),
-                daemon=True,
-            ).start()
-
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                if not line:
-                    continue
-                line = line.strip()
+    def follow(self, progress: "_Progress", index: int = 0):
+        """Log the output and forward the progress until the pipes close, keeping the tail of stderr."""
+        stderr_tail = collections.deque(maxlen=STDERR_TAIL)
+        percentage = None
+        for stream, line in self.lines():
+            if stream == "stderr":
+                stderr_tail.append(line)
+                continue
+            match = _PERCENT.search(line)
+            if match is None:
+                if line:
+                    LOGGER.log(line)
+                continue
+            percentage = int(match.group(1))
+            if progress.update(index, percentage):
                 LOGGER.log(line)
-                match = re.search(r"%(\d+)", line)
-                if match:
-                    try:
-                        percentage = int(match.group(1))
-                        gui.root.after(0, gui.progress_bar.config, {"value": percentage})
-                    except ValueError:
-                        LOGGER.log("Lỗi chuyển đổi phần trăm")
-
-            stderr_output = process.stderr.read()
-            if stderr_output:
-                LOGGER.log(f"❌ Lỗi VideoSubFinder: {stderr_output}")
-                gui.root.after(
-                    0,
-                    lambda: messagebox.showerror("Lỗi", f"Quá trình xử lý video thất bại: {stderr_output}"),
-                )
-                gui.root.after(0, gui.status_label.config, {"text": "❌ Lỗi!"})
-
-            returncode = process.wait()
-
-            if returncode != 0:
-                LOGGER.log("✅ VideoSubFinder đã hoàn tất xử lý ảnh từ Video")
-                gui.root.after(
-                    0,
-                    lambda: messagebox.showinfo("Thông báo", "VideoSubFinder đã hoàn tất xử lý ảnh từ Video"),
-                )
-                if monitor.STATE.event_handler:
-                    total_images = monitor.STATE.event_handler.file_count
-                    gui.root.after(
-                        0,
-                        gui.status_label.config,
-                        {"text": f"Đã xử lý xong Video! | 📂 Tổng ảnh: {total_images}"},
-                    )
-            else:
-                LOGGER.log("✅ Quá trình xử lý video đã hoàn tất.")
-                gui.root.after(0, gui.status_label.config, {"text": "✅ Hoàn thành!"})
-
-            if os.path.exists(images_folder):
-                gui.root.after(0, lambda: gui.images_entry.delete(0, "end"))
-                gui.root.after(0, lambda: gui.images_entry.insert(0, images_folder))
-                gui.images_dirr = images_folder
-                threading.Timer(
-                    3.0, monitor.start_monitoring_rgbimages, args=[gui, rgb_images_folder, gui.duration or "00:00:00"]
-                ).start()
-            else:
-                LOGGER.log("❌ Lỗi: Thư mục RGBImages không tồn tại.")
-                gui.root.after(
-                    0,
-                    lambda: messagebox.showerror("Lỗi", "Thư mục RGBImages không tồn tại."),
-                )
-        except FileNotFoundError:
-            LOGGER.log(f"❌ Lỗi: Không tìm thấy file: {command[0]}")
-            gui.root.after(
-                0,
-                lambda: messagebox.showerror("Lỗi", f"Không tìm thấy VideoSubFinder tại: {command[0]}"),
-            )
-            gui.root.after(0, gui.status_label.config, {"text": "Lỗi!"})
-        except Exception as exc:
-            LOGGER.log(f"❌ Lỗi hệ thống:{exc}")
-            gui.root.after(
-                0,
-                lambda: messagebox.showerror("Lỗi hệ thống", f"Không thể thực thi lệnh: {exc}"),
-            )
-            gui.root.after(0, gui.status_label.config, {"text": "Lỗi!"})
-        finally:
-            gui.root.after(0, gui.VSF_button.config, {"state": "normal"})
-            gui.root.after(0, gui.start_button.config, {"state": "normal"})
-            gui.root.after(0, gui.subtitle_button.config, {"state": "normal"})
-            gui.root.after(0, gui.images_button.config, {"state": "normal"})
+        if percentage is not None:
+            progress.update(index, percentage, force=True)
+        self.stderr_lines = list(stderr_tail)
+
+    def wait(self) -> int:
+        self.returncode = self.process.wait()
+        for reader in self._readers:
+            reader.join()
+        return self.returncode
+
+    def cancel(self, grace_seconds: float = 3.0):
+        """Terminate the child, then kill it if it is still alive after ``grace_seconds``."""
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.cancelled = True
+        LOGGER.log(f"⚠️ Đang đóng VideoSubFinder (PID {self.pid})...")
+        try:
+            self.process.terminate()
+            self.process.wait(grace_seconds)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        except OSError as exc:
+            LOGGER.log(f"❌ Lỗi khi đóng VideoSubFinder (PID {self.pid}): {exc}")
+            return
+        LOGGER.log(f"✅ Đã đóng VideoSubFinder (PID {self.pid}).")
+
+    def close(self):
+        """Make sure the child is gone and stop tracking it."""
+        self.cancel()
+        RUNNING.remove(self)
+
+
+class RunningProcesses:
+    """The VideoSubFinder children started by this app, so a stop or exit can end exactly those."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.processes: List[VsfProcess] = []
+
+    def add(self, vsf_process: VsfProcess):
+        with self._lock:
+            self.processes.append(vsf_process)
+
+    def remove(self, vsf_process: VsfProcess):
+        with self._lock:
+            if vsf_process in self.processes:
+                self.processes.remove(vsf_process)
+
+    def cancel_all(self):
+        with self._lock:
+            processes = list(self.processes)
+        for vsf_process in processes:
+            vsf_process.cancel()
+
+
+RUNNING = RunningProcesses()
+
+
+def cancel_all():
+    """Stop every VideoSubFinder this app is running."""
+    RUNNING.cancel_all()
+
+
+class _Progress:
+    """Mean percentage of the VSF runs of one extraction, forwarded at most every :data:`PROGRESS_INTERVAL`."""
+
+    def __init__(self, reporter, runs: int):
+        self.reporter = reporter
+        self.percentages = [0] * runs
+        self._lock = threading.Lock()
+        self._reported: Optional[int] = None
+        self._last_report = 0.0
+
+    def update(self, index: int, percentage: int, force: bool = False) -> bool:
+        """Record one run's percentage; returns whether the mean was forwarded."""
+        now = time.monotonic()
+        with self._lock:
+            self.percentages[index] = percentage
+            mean = sum(self.percentages) // len(self.percentages)
+            if mean == self._reported or (not force and now - self._last_report < PROGRESS_INTERVAL):
+                return False
+            self._reported, self._last_report = mean, now
+        self.reporter.extraction_progress(mean)
+        return True
+
+
+def run_vsf(reporter, commands: Sequence[List[str]], warm_up_clients: int = 0) -> List[VsfProcess]:
+    """Run one VideoSubFinder per command side by side and wait for all of them.
+
+    The first run is followed on the calling thread, the others on their
+    own. Each returned process carries its ``returncode``, ``stderr_lines``
+    and ``cancelled`` flag. If a run cannot start, the ones already
+    started are killed and the error propagates.
+    """
+    processes = [VsfProcess(command) for command in commands]
+    progress = _Progress(reporter, len(processes))
+    try:
+        for vsf_process in processes:
+            vsf_process.start()
+        if warm_up_clients:
+            drive_pool.warm_up_in_background(warm_up_clients)
+        followers = [
+            threading.Thread(target=vsf_process.follow, args=(progress, index), name=f"vsf-{index}", daemon=True)
+            for index, vsf_process in enumerate(processes[1:], start=1)
+        ]
+        for follower in followers:
+            follower.start()
+        processes[0].follow(progress)
+        for follower in followers:
+            follower.join()
+        for vsf_process in processes:
+            vsf_process.wait()
+    finally:
+        for vsf_process in processes:
+            vsf_process.close()
+    return processes
+
+
+def _merge(plan: List[segments.Segment], output_base_path: str, output_folder_name: str):
+    started = time.perf_counter()
+    merged, duplicates = segments.merge_segments(plan, output_base_path, output_folder_name)
+    METRICS.observe("vsf_merge", time.perf_counter() - started)
+    LOGGER.log(f"🧩 Đã ghép {len(plan)} đoạn: {merged} ảnh, bỏ {duplicates} ảnh trùng ở ranh giới các đoạn.")
+
+
+def extract_images(
+    reporter,
+    command,
+    output_base_path: str,
+    output_folder_name: str,
+    video_duration: str = "00:00:00",
+    warm_up_clients: int = 0,
+    image_stream=None,
+    watch_folder: bool = True,
+    segment_plan: Sequence[segments.Segment] = (),
+) -> bool:
+    """Run VideoSubFinder to completion, reporting progress through ``reporter``.
+
+    ``image_stream`` receives every RGBImage as it is written and is closed
+    once VideoSubFinder exits, so a concurrent OCR run knows when to stop.
+    ``warm_up_clients`` Drive clients are prepared while the video is read.
+    ``watch_folder=False`` skips the RGBImages monitor; batch runs read
+    progress from VideoSubFinder's output alone.
+    With more than one segment in ``segment_plan`` (see
+    :func:`segments.plan_segments`), one VideoSubFinder per time segment
+    runs in parallel and their images are merged into the output folder
+    once all of them finish.
+    Returns ``True`` if the image folder exists afterwards.
+    """
+    images_folder = os.path.join(output_base_path, output_folder_name)
+    rgb_images_folder = os.path.join(output_base_path, "RGBImages")
+    images_monitor = None
+    plan = list(segment_plan)
+    if len(plan) > 1 and output_folder_name != "RGBImages":
+        LOGGER.log("⚠️ Chia đoạn video chỉ hỗ trợ RGBImages, chạy một tiến trình VideoSubFinder.")
+        plan = []
+    if len(plan) > 1:
+        commands = [segment_command(command, segment, output_base_path) for segment in plan]
+        if "-c" in command:
+            # -c clears each segment's own folder; the merged folder is ours to clear.
+            shutil.rmtree(images_folder, ignore_errors=True)
+        os.makedirs(images_folder, exist_ok=True)
+    else:
+        plan = []
+        commands = [command]
+
+    try:
+        for run_command in commands:
+            LOGGER.log(f"🚀 Đang chạy lệnh VideoSubFinder: {' '.join(run_command)}")
+
+        if watch_folder:
+            LOGGER.log(f"👀 Bắt đầu giám sát thư mục RGBImages tại: {rgb_images_folder}")
+            images_monitor = monitor.start_monitor(reporter, rgb_images_folder, video_duration, image_stream)
+
+        started = time.perf_counter()
+        processes = run_vsf(reporter, commands, warm_up_clients)
+        METRICS.observe("vsf", time.perf_counter() - started)
+        cancelled = any(vsf_process.cancelled for vsf_process in processes)
+        if plan and not cancelled:
+            _merge(plan, output_base_path, output_folder_name)
+        if images_monitor is not None:
+            monitor.stop_monitor(images_monitor)
+
+        stderr_lines = [line for vsf_process in processes for line in vsf_process.stderr_lines]
+        returncode = next((vsf_process.returncode for vsf_process in processes if vsf_process.returncode), 0)
+        if cancelled:
+            if plan:
+                shutil.rmtree(os.path.join(output_base_path, segments.SEGMENTS_FOLDER), ignore_errors=True)
+            if image_stream is not None:
+                image_stream.cancel()
+            LOGGER.log("⏹ VideoSubFinder đã bị dừng.")
+            reporter.status("⏹ Đã dừng.")
+            return False
+
+        if stderr_lines:
+            stderr_output = "\n".join(stderr_lines)
+            LOGGER.log(f"❌ Lỗi VideoSubFinder: {stderr_output}")
+            reporter.error("Lỗi", f"Quá trình xử lý video thất bại: {stderr_output}")
+            reporter.status("❌ Lỗi!")
+
+        if returncode != 0:
+            LOGGER.log("✅ VideoSubFinder đã hoàn tất xử lý ảnh từ Video")
+            reporter.info("Thông báo", "VideoSubFinder đã hoàn tất xử lý ảnh từ Video")
+            if images_monitor is not None:
+                reporter.status(f"Đã xử lý xong Video! | 📂 Tổng ảnh: {images_monitor.file_count}")
+        else:
+            LOGGER.log("✅ Quá trình xử lý video đã hoàn tất.")
+            reporter.status("✅ Hoàn thành!")
 
-    threading.Thread(target=run_videosubfinder, daemon=True).start()
+        if os.path.exists(images_folder):
+            return True
+        LOGGER.log("❌ Lỗi: Thư mục RGBImages không tồn tại.")
+        reporter.error("Lỗi", "Thư mục RGBImages không tồn tại.")
+        return False
+    except FileNotFoundError:
+        if image_stream is not None:
+            image_stream.cancel()
+        LOGGER.log(f"❌ Lỗi: Không tìm thấy file: {command[0]}")
+        reporter.error("Lỗi", f"Không tìm thấy VideoSubFinder tại: {command[0]}")
+        reporter.status("Lỗi!")
+        return False
+    except Exception as exc:
+        if image_stream is not None:
+            image_stream.cancel()
+        LOGGER.log(f"❌ Lỗi hệ thống:{exc}")
+        reporter.error("Lỗi hệ thống", f"Không thể thực thi lệnh: {exc}")
+        reporter.status("Lỗi!")
+        return False
+    finally:
+        if images_monitor is not None:
+            monitor.stop_monitor(images_monitor)
+        if image_stream is not None:
+            image_stream.close(rgb_images_folder)
@@ -0,0 +1,79 @@
+"""Compare the thread-pool and asyncio OCR engines against the fake Drive server.
+
+Usage: python benchmarks/bench_async_engine.py [--images 1000] [--latency 0.2] [--threads 20] [--async-limit 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from apiclient.http import MediaFileUpload  # noqa: E402
+
+from app import async_engine, backends  # noqa: E402
+from app.drive_pool import POOL  # noqa: E402
+from bench_client_pool import NoAuthCredentials  # noqa: E402
+from fake_drive import FakeDriveServer  # noqa: E402
+
+
+def run_threads(images, root_url: str, threads: int, raw_dir: Path) -> float:
+    POOL.configure(NoAuthCredentials(), root_url=root_url)
+    backend = backends.DriveBackend("bench", limiter=None)
+
+    def work(image):
+        media = MediaFileUpload(str(image), mimetype=backends.DOCUMENT_MIME, resumable=False)
+        backend.convert_unlimited(image.name, media, raw_dir / f"{image.stem}.txt")
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, images))
+    return time.perf_counter() - started
+
+
+def run_asyncio(images, root_url: str, limit: int) -> float:
+    failures = []
+    engine = async_engine.AsyncOCREngine(
+        lambda: async_engine.AsyncHttpTransport(root_url=root_url, max_connections=limit), "bench", limit
+    )
+    started = time.perf_counter()
+    engine.run(((image,) for image in images), lambda job, text: None, lambda job, exc: failures.append(exc))
+    elapsed = time.perf_counter() - started
+    if failures:
+        print(f"asyncio engine: {len(failures)} failures, first: {failures[0]}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake server latency per request (s)")
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--async-limit", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        images = []
+        for index in range(args.images):
+            image = tmp_path / f"00_00_{index // 1000:02d}_{index % 1000:03d}__00_00_00_000_0000.png"
+            image.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 2048)
+            images.append(image)
+
+        with FakeDriveServer(latency=args.latency) as server:
+            thread_time = run_threads(images, server.root_url, args.threads, tmp_path)
+        with FakeDriveServer(latency=args.latency) as server:
+            async_time = run_asyncio(images, server.root_url, args.async_limit)
+
+    print(f"{'engine':<24}{'seconds':>10}{'img/s':>10}")
+    print(f"{'threads x' + str(args.threads):<24}{thread_time:>10.2f}{args.images / thread_time:>10.1f}")
+    print(f"{'asyncio x' + str(args.async_limit):<24}{async_time:>10.2f}{args.images / async_time:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
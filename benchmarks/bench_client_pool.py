@@ -0,0 +1,121 @@
+"""Compare per-image Drive client overhead with and without the client pool.
+
+Usage: python benchmarks/bench_client_pool.py [--images 200] [--threads 8] [--latency 0.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httplib2  # noqa: E402
+from apiclient import discovery  # noqa: E402
+from apiclient.http import MediaFileUpload, MediaIoBaseDownload  # noqa: E402
+
+from app.drive_pool import DriveClientPool  # noqa: E402
+from fake_drive import FakeDriveServer  # noqa: E402
+
+MIME = "application/vnd.google-apps.document"
+
+
+class NoAuthCredentials:
+    """Credentials stand-in for the fake server, which does not check tokens."""
+
+    invalid = False
+
+    def authorize(self, http):
+        return http
+
+
+def _convert(service, image_file: str, name: str) -> str:
+    res = (
+        service.files()
+        .create(
+            body={"name": name, "mimeType": MIME, "parents": ["bench"]},
+            media_body=MediaFileUpload(image_file, mimetype=MIME, resumable=True),
+        )
+        .execute()
+    )
+    buffer = io.BytesIO()
+    downloader = MediaIoBaseDownload(buffer, service.files().export_media(fileId=res["id"], mimeType="text/plain"))
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+    service.files().delete(fileId=res["id"]).execute()
+    return buffer.getvalue().decode("utf-8")
+
+
+def _per_call_client(credentials, root_url: str):
+    http = credentials.authorize(httplib2.Http())
+    return discovery.build(
+        "drive",
+        "v3",
+        http=http,
+        discoveryServiceUrl=root_url + "discovery/v1/apis/{api}/{apiVersion}/rest",
+        cache_discovery=False,
+        static_discovery=False,
+    )
+
+
+def run(mode: str, images: int, threads: int, latency: float, image_file: str) -> dict:
+    credentials = NoAuthCredentials()
+    with FakeDriveServer(latency=latency) as server:
+        if mode == "pool":
+            pool = DriveClientPool()
+            pool.configure(credentials, root_url=server.root_url)
+            pool.warm_up(threads, prime=False)
+            get_service = pool.get
+        else:
+            def get_service():
+                return _per_call_client(credentials, server.root_url)
+
+        def work(index: int):
+            _convert(get_service(), image_file, f"{index:06d}.jpeg")
+
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(work, range(images)))
+        elapsed = time.perf_counter() - started
+
+        return {
+            "mode": mode,
+            "elapsed": elapsed,
+            "per_image_ms": elapsed / images * 1000 * threads,
+            "images_per_s": images / elapsed,
+            "connections": server.state.connections,
+            "requests": server.state.requests,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake server latency per request (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_file = str(Path(tmp) / "strip.png")
+        Path(image_file).write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 2048)
+
+        results = [run(mode, args.images, args.threads, args.latency, image_file) for mode in ("per-call", "pool")]
+
+    print(f"{'mode':<10}{'ms/image':>10}{'img/s':>10}{'conns':>8}{'reqs':>8}")
+    for result in results:
+        print(
+            f"{result['mode']:<10}{result['per_image_ms']:>10.2f}{result['images_per_s']:>10.1f}"
+            f"{result['connections']:>8}{result['requests']:>8}"
+        )
+    before, after = results
+    print(f"Per-image overhead saved: {before['per_image_ms'] - after['per_image_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Log lines per second from many worker threads, old open-per-line logger vs the queue logger.
+
+Usage: python benchmarks/bench_logger.py [--threads 20] [--lines 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.logger import GuiLogger  # noqa: E402
+
+
+class OpenPerLineLogger:
+    """The previous GuiLogger.log file path: open, append and close for every message."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def log(self, message: str):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(self.path, "a", encoding="utf-8") as log_file:
+            log_file.write(f"[{timestamp}] {message}\n")
+
+    def flush(self):
+        pass
+
+
+def hammer(logger, threads: int, lines: int):
+    """Return ``(seconds until every log() call returned, seconds until the lines are on disk)``."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        barrier.wait()
+        for line in range(lines):
+            logger.log(f"✅ Đã OCR: worker {index} line {line} Lorem ipsum dolor sit amet")
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    returned = time.perf_counter() - started
+    logger.flush()
+    return returned, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=5000, help="Lines logged by each thread")
+    args = parser.parse_args()
+    total = args.threads * args.lines
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = OpenPerLineLogger(str(Path(tmp) / "legacy.log"))
+        queued = GuiLogger()
+        queued.set_log_file(str(Path(tmp) / "queued.log"))
+        results = [
+            ("open per line", hammer(legacy, args.threads, args.lines)),
+            ("queue + writer thread", hammer(queued, args.threads, args.lines)),
+        ]
+        queued.close()
+        written = sum(1 for _ in open(Path(tmp) / "queued.log", encoding="utf-8")) - 1
+        if written != total:
+            print(f"queue logger wrote {written} of {total} lines")
+
+    print(f"{args.threads} threads x {args.lines} lines")
+    print(f"{'logger':<24}{'log() k/s':>12}{'on disk k/s':>14}")
+    for label, (returned, on_disk) in results:
+        print(f"{label:<24}{total / returned / 1000:>12.1f}{total / on_disk / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
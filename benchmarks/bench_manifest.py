@@ -0,0 +1,60 @@
+"""Listing a large VSF images folder: five rglob scans vs the scandir manifest, cold and reused.
+
+Usage: python benchmarks/bench_manifest.py [--images 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import manifest  # noqa: E402
+from corpus import vsf_name  # noqa: E402
+
+
+def rglob_listing(folder: Path):
+    """The previous collect_images listing: one rglob per extension, filesystem order."""
+    images = []
+    for extension in ("*.jpeg", "*.jpg", "*.png", "*.bmp", "*.gif"):
+        images.extend(folder.rglob(extension))
+    return images
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "RGBImages"
+        folder.mkdir()
+        clock = 0
+        for index in range(args.images):
+            (folder / vsf_name(clock, clock + 1200, index + 1)).touch()
+            clock += 1500
+
+        rows = [
+            ("rglob x5", timed(rglob_listing, folder)),
+            ("manifest, no file", timed(manifest.build_manifest, folder, False)),
+            ("manifest, first run", timed(manifest.build_manifest, folder)),
+            ("manifest, reused", timed(manifest.build_manifest, folder)),
+        ]
+
+    print(f"{'listing':<22}{'images':>9}{'seconds':>10}")
+    for label, (seconds, count) in rows:
+        print(f"{label:<22}{count:>9}{seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
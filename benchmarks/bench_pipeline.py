@@ -0,0 +1,213 @@
+"""End-to-end OCR pipeline throughput against the fake Drive server, across thread counts.
+
+Each scenario runs ``ocr.start_processing`` on a synthetic subtitle corpus
+(see ``corpus.py``) in a scratch directory with its own ``config.ini``, so
+the real settings, cache, dedupe, retries and SRT writing are exercised
+without credentials or quota. Results are saved as JSON; ``--compare``
+checks them against an earlier file and exits with status 1 on a regression.
+
+Usage: python benchmarks/bench_pipeline.py [--threads 4 8 16] [--engine threads] [--lines 300] [--format jpeg]
+           [--no-preprocess] [--latency 0.05] [--jitter 0.02] [--error-rate 0.0] [--throttle-rate 0.0]
+           [--output results.json] [--compare baseline.json] [--threshold 0.10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import auth, ocr, reporting  # noqa: E402
+from app.metrics import METRICS  # noqa: E402
+from corpus import generate_corpus  # noqa: E402
+from fake_drive import FakeDriveServer  # noqa: E402
+
+# Figures compared between runs: key, label, True when higher is better.
+COMPARED = (
+    ("images_per_second", "img/s", True),
+    ("wall_s", "wall s", False),
+    ("drive_create_p95_s", "create p95 s", False),
+    ("drive_export_p95_s", "export p95 s", False),
+    ("bytes_uploaded", "uploaded B", False),
+    ("failed", "failed", False),
+)
+
+
+class BenchCredentials:
+    """Credentials stand-in for the fake server, which does not check tokens."""
+
+    invalid = False
+
+    def authorize(self, http):
+        return http
+
+    def get_access_token(self):
+        return types.SimpleNamespace(access_token="bench", expires_in=3600)
+
+
+@contextlib.contextmanager
+def scenario_directory(settings: dict, pipeline: dict):
+    """A scratch working directory holding the scenario's ``config.ini``."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="segg-bench-") as tmp:
+        lines = ["[settings]"] + [f"{key} = {value}" for key, value in settings.items()]
+        lines += ["", "[pipeline]"] + [f"{key} = {value}" for key, value in pipeline.items()]
+        Path(tmp, "config.ini").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(previous)
+
+
+@contextlib.contextmanager
+def offline_credentials():
+    original = auth.get_credentials
+    auth.get_credentials = lambda flags: BenchCredentials()
+    try:
+        yield
+    finally:
+        auth.get_credentials = original
+
+
+def run_scenario(corpus: Path, threads: int, args) -> dict:
+    """OCR the corpus once with ``threads`` workers; returns the scenario's figures."""
+    faults = {
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate,
+        "retry_after": args.retry_after,
+        "seed": args.seed,
+    }
+    with FakeDriveServer(latency=args.latency, **faults) as server, offline_credentials():
+        settings = {"threads": threads, "delete_raw_texts": True, "delete_texts": True}
+        pipeline = {
+            "drive_root_url": server.root_url,
+            "ocr_backend": "drive",
+            "ocr_engine": args.engine,
+            "ocr_cache": False,
+            "adaptive_concurrency": args.adaptive,
+            "async_concurrency": threads,
+            "preprocess_images": not args.no_preprocess,
+        }
+        with scenario_directory(settings, pipeline) as workdir:
+            started = time.perf_counter()
+            saved = ocr.start_processing(
+                reporting.Reporter(), str(workdir / "bench.srt"), str(corpus), True, True, False, None
+            )
+            wall = time.perf_counter() - started
+            snapshot = METRICS.snapshot()
+        requests = server.state.requests
+        injected = dict(server.state.injected)
+
+    stages = snapshot["stages"]
+    job = ocr.JOB
+    return {
+        "threads": threads,
+        "saved": saved,
+        "images": job.total,
+        "failed": job.failed,
+        "wall_s": round(wall, 3),
+        "images_per_second": round(job.total / wall, 2) if wall else 0.0,
+        "requests": requests,
+        "injected_429": injected.get(429, 0),
+        "injected_503": injected.get(503, 0),
+        "retries": snapshot["counters"].get("retries", 0),
+        "bytes_uploaded": snapshot["counters"].get("bytes_uploaded", 0),
+        "drive_create_p95_s": stages.get("drive_create", {}).get("p95_s", 0.0),
+        "drive_export_p95_s": stages.get("drive_export", {}).get("p95_s", 0.0),
+        "stages": {stage: {k: v for k, v in values.items() if k != "buckets"} for stage, values in stages.items()},
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Print per-scenario deltas; returns the regressions beyond ``threshold``."""
+    previous = {scenario["threads"]: scenario for scenario in baseline["scenarios"]}
+    regressions = []
+    print(f"\ncompared with {baseline.get('label') or 'baseline'} (threshold {threshold:.0%})")
+    print(f"{'threads':>8}  {'figure':<14}{'before':>10}{'after':>10}{'change':>9}")
+    for scenario in current["scenarios"]:
+        before = previous.get(scenario["threads"])
+        if before is None:
+            continue
+        for key, label, higher_is_better in COMPARED:
+            old, new = before.get(key, 0), scenario.get(key, 0)
+            change = (new - old) / old if old else (1.0 if new else 0.0)
+            worse = -change if higher_is_better else change
+            # Failures regress on any increase; timings only beyond the noise threshold.
+            regressed = worse > 0 if key == "failed" else worse > threshold
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{scenario['threads']:>8}  {label:<14}{old:>10}{new:>10}{change:>+9.1%}{flag}")
+            if regressed:
+                regressions.append((scenario["threads"], label, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads")
+    parser.add_argument("--adaptive", action="store_true", help="Let the AIMD limiter grow past --threads")
+    parser.add_argument("--lines", type=int, default=300, help="Subtitle lines in the synthetic corpus")
+    parser.add_argument("--format", choices=("jpeg", "bmp"), default="jpeg", help="Image format of the corpus")
+    parser.add_argument("--no-preprocess", action="store_true", help="Upload the images as they are on disk")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Share of lines split over several frames")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every Drive request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="Name stored with the results, e.g. a git revision")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Earlier results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    args = parser.parse_args()
+
+    results = {
+        "label": args.label,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "options": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="segg-corpus-") as tmp:
+        corpus = Path(tmp) / "RGBImages"
+        written = generate_corpus(corpus, args.lines, args.duplicates, seed=args.seed, image_format=args.format)
+        print(
+            f"{written} {args.format} images, {args.lines} lines, engine {args.engine}, latency {args.latency}s, "
+            f"preprocessing {'off' if args.no_preprocess else 'on'}"
+        )
+        print(f"{'threads':>8}{'images':>8}{'failed':>8}{'wall s':>9}{'img/s':>9}{'requests':>10}"
+              f"{'429':>6}{'503':>6}{'retries':>9}{'create p95':>12}{'upload MB':>11}")
+        for threads in args.threads:
+            scenario = run_scenario(corpus, threads, args)
+            results["scenarios"].append(scenario)
+            print(
+                f"{threads:>8}{scenario['images']:>8}{scenario['failed']:>8}{scenario['wall_s']:>9.2f}"
+                f"{scenario['images_per_second']:>9.1f}{scenario['requests']:>10}{scenario['injected_429']:>6}"
+                f"{scenario['injected_503']:>6}{scenario['retries']:>9}{scenario['drive_create_p95_s']:>12.3f}"
+                f"{scenario['bytes_uploaded'] / 1024 / 1024:>11.2f}"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"results written to {args.output}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Segmented VideoSubFinder extraction: wall time and speedup per segment count, with the stub VSF.
+
+Each row runs ``vsf.extract_images`` on the same timeline (see
+``stub_vsf.py``) split into K segments, then checks the merged RGBImages
+against the timeline: every subtitle should come out as exactly one
+image, so ``missing`` and ``extra`` must stay at zero across the cuts.
+
+The stub sleeps by default, which models one core per VSF process; pass
+``--busy`` to make each stub burn a real core, in which case the speedup
+is bounded by the machine's cores.
+
+Usage: python benchmarks/bench_segments.py [--segments 1 2 4 8] [--minutes 20] [--cost 0.5] [--overlap-ms 2000] [--busy]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import manifest, reporting, segments, timecodes, vsf  # noqa: E402
+from stub_vsf import write_timeline  # noqa: E402
+
+STUB = str(Path(__file__).resolve().parent / "stub_vsf.py")
+
+
+def check(folder: str, lines: list):
+    """``(missing, extra)`` subtitles: timeline lines without an image, and images beyond one per line."""
+    images = manifest.walk_images(folder)
+    images_per_line = [0] * len(lines)
+    line_starts = [line[0] for line in lines]
+    for start_ms, end_ms in filter(None, (timecodes.parse_vsf_name(entry.name) for entry in images.values())):
+        # The line an image shows is the one it overlaps most; lines are far enough apart to be unambiguous.
+        index = min(range(len(lines)), key=lambda i: abs(line_starts[i] - start_ms) + abs(lines[i][1] - end_ms))
+        images_per_line[index] += 1
+    missing = sum(1 for count in images_per_line if count == 0)
+    extra = sum(count - 1 for count in images_per_line if count > 1)
+    return missing, extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--minutes", type=float, default=20, help="Length of the simulated video")
+    parser.add_argument("--cost", type=float, default=0.5, help="Stub seconds per minute of video")
+    parser.add_argument("--overlap-ms", type=int, default=2000)
+    parser.add_argument("--busy", action="store_true", help="Make each stub VSF burn a core instead of sleeping")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    duration_ms = int(args.minutes * 60_000)
+    with tempfile.TemporaryDirectory(prefix="segg-segments-") as tmp:
+        timeline = Path(tmp) / "video.json"
+        lines = write_timeline(timeline, duration_ms, args.seed)
+        stub = [sys.executable, STUB, "--cost", str(args.cost)] + (["--busy"] if args.busy else [])
+        print(
+            f"{len(lines)} subtitles over {args.minutes:g} min, stub cost {args.cost}s/min "
+            f"({'busy' if args.busy else 'sleep'}), {os.cpu_count()} cpus"
+        )
+        print(f"{'K':>3}{'wall s':>9}{'speedup':>9}{'images':>8}{'missing':>9}{'extra':>7}")
+        baseline = None
+        for count in args.segments:
+            output_base = os.path.join(tmp, f"out{count}")
+            command = stub + vsf.build_command("vsf", str(timeline), output_base, 0, 1, 0, 1, False)[1:]
+            plan = segments.plan_segments(duration_ms, count, args.overlap_ms, 1000)
+            started = time.perf_counter()
+            extracted = vsf.extract_images(
+                reporting.Reporter(),
+                command,
+                output_base,
+                "RGBImages",
+                timecodes.format_clock(duration_ms),
+                watch_folder=False,
+                segment_plan=plan if len(plan) > 1 else (),
+            )
+            wall = time.perf_counter() - started
+            baseline = baseline or wall
+            folder = os.path.join(output_base, "RGBImages")
+            images = len(manifest.walk_images(folder)) if extracted else 0
+            missing, extra = check(folder, lines) if extracted else (len(lines), 0)
+            print(f"{count:>3}{wall:>9.2f}{baseline / wall:>9.2f}{images:>8}{missing:>9}{extra:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare per-file timecode parsing before and after the shared timecodes module.
+
+Usage: python benchmarks/bench_timecodes.py [--names 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import timecodes  # noqa: E402
+
+
+def legacy_monitor(name: str):
+    """What the RGBImages watcher used to do for every new file."""
+    match = re.search(r"(\d+)_(\d+)_(\d+)_(\d+)", name)
+    if not match:
+        return None
+    parsed = datetime.datetime.strptime(":".join(match.groups()), "%H:%M:%S:%f").time()
+    return datetime.timedelta(
+        hours=parsed.hour, minutes=parsed.minute, seconds=parsed.second, microseconds=parsed.microsecond
+    )
+
+
+def timed(label: str, function, names, baseline=None):
+    started = time.perf_counter()
+    function(names)
+    elapsed = time.perf_counter() - started
+    speedup = f"{baseline / elapsed:>9.1f}x" if baseline else f"{'':>10}"
+    print(f"{label:<34}{elapsed:>10.3f}{len(names) / elapsed / 1000:>12.0f}{speedup}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=100_000)
+    args = parser.parse_args()
+
+    names = [
+        f"{i // 3_600_000}_{i // 60_000 % 60:02d}_{i // 1000 % 60:02d}_{i % 1000:03d}__"
+        f"{i // 3_600_000}_{i // 60_000 % 60:02d}_{i // 1000 % 60:02d}_{(i + 900) % 1000:03d}_"
+        "0000000000000000000000000.jpeg"
+        for i in range(0, args.names * 37, 37)
+    ]
+
+    print(f"{'parser':<34}{'seconds':>10}{'k names/s':>12}{'speedup':>10}")
+    monitor = timed("monitor: regex + strptime", lambda batch: [legacy_monitor(n) for n in batch], names)
+    timed("timecodes.parse_vsf_name", lambda batch: [timecodes.parse_vsf_name(n) for n in batch], names, monitor)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Generate a synthetic VideoSubFinder output folder of subtitle images.
+
+Images are named like VSF's ``H_MM_SS_mmm__H_MM_SS_mmm_<index>.jpeg`` and show
+a random line of white text on black. Some subtitles are written as several
+consecutive near-identical frames, the way VSF splits a line around a scene
+change, so frame dedupe has something to merge.
+
+Usage: python benchmarks/corpus.py OUTPUT_DIR [--lines 500] [--duplicates 0.2] [--format jpeg] [--seed 1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+WORDS = (
+    "anh em chúng ta đi về nhà hôm nay trời mưa không biết sao lại thế này "
+    "đừng lo mọi chuyện sẽ ổn thôi cô ấy nói rằng sẽ quay lại vào sáng mai"
+).split()
+
+
+def vsf_clock(ms: int) -> str:
+    hours, rest = divmod(ms, 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    seconds, millis = divmod(rest, 1000)
+    return f"{hours}_{minutes:02d}_{seconds:02d}_{millis:03d}"
+
+
+def vsf_name(start_ms: int, end_ms: int, index: int, extension: str = ".jpeg") -> str:
+    return f"{vsf_clock(start_ms)}__{vsf_clock(end_ms)}_{index:019d}{extension}"
+
+
+def load_font(height: int):
+    try:
+        return ImageFont.load_default(size=max(12, height // 3))
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_line(text: str, width: int, height: int, rng: random.Random, font) -> Image.Image:
+    image = Image.new("L", (width, height), 0)
+    draw = ImageDraw.Draw(image)
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    x = max(0, (width - (right - left)) // 2) + rng.randint(-2, 2)
+    y = max(0, (height - (bottom - top)) // 2)
+    draw.text((x, y), text, fill=255, font=font)
+    return image
+
+
+def generate_corpus(
+    folder: Path,
+    lines: int = 500,
+    duplicates: float = 0.2,
+    width: int = 960,
+    height: int = 96,
+    seed: int = 1,
+    image_format: str = "jpeg",
+) -> int:
+    """Write the images of ``lines`` subtitles into ``folder``; returns how many files were written.
+
+    ``duplicates`` is the share of subtitles written as two or three
+    back-to-back frames instead of one. ``image_format`` is ``jpeg`` or
+    ``bmp``, the two formats VSF writes, as full-colour RGB.
+    """
+    rng = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+    font = load_font(height)
+
+    written = 0
+    clock = 1000
+    for _ in range(lines):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(3, 9)))
+        frames = rng.randint(2, 3) if rng.random() < duplicates else 1
+        image = render_line(text, width, height, rng, font).convert("RGB")
+        for _ in range(frames):
+            duration = rng.randint(600, 2500)
+            written += 1
+            image.save(folder / vsf_name(clock, clock + duration, written, f".{image_format}"), quality=90)
+            # Back-to-back frames of one line are a single frame apart.
+            clock += duration + 40
+        clock += rng.randint(300, 3000)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Share of lines split over several frames")
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=96)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--format", choices=("jpeg", "bmp"), default="jpeg")
+    args = parser.parse_args()
+    written = generate_corpus(
+        args.output, args.lines, args.duplicates, args.width, args.height, args.seed, args.format
+    )
+    print(f"{written} images for {args.lines} lines in {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Local stand-in for the Drive v3 endpoints used by the OCR pipeline.
+
+Latency, random 5xx errors and 429 throttling can be injected so benchmarks
+exercise the retry and backoff paths without real credentials or quota.
+Batched deletes go through the ``/batch/drive/v3`` multipart endpoint.
+"""
+
+from __future__ import annotations
+
+import collections
+import datetime
+import email.parser
+import itertools
+import json
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.constants import DRIVE_UPLOAD_PROPERTIES  # noqa: E402
+from app.drive_pool import discovery_document  # noqa: E402
+
+_NAME_PATTERN = re.compile(rb'"name"\s*:\s*"([^"]*)"')
+_PROPERTIES_PATTERN = re.compile(rb'"appProperties"\s*:\s*(\{[^}]*\})')
+EXPORT_HEADER = "________________\n\n"
+
+
+class FakeDriveState:
+    """In-memory file table shared by all request handlers."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.injected: collections.Counter = collections.Counter()
+        self.lock = threading.Lock()
+        self.files: dict[str, dict] = {}
+        self.sessions: dict[str, bytes] = {}
+        self.counter = itertools.count(1)
+        self.requests = 0
+        self.connections = 0
+
+    def create(self, metadata: bytes, age: float = 0.0) -> dict:
+        match = _NAME_PATTERN.search(metadata)
+        name = match.group(1).decode("utf-8") if match else "untitled"
+        properties = _PROPERTIES_PATTERN.search(metadata)
+        created = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=age)
+        with self.lock:
+            file_id = f"fake{next(self.counter)}"
+            entry = {
+                "id": file_id,
+                "name": name,
+                "mimeType": "application/vnd.google-apps.document",
+                "createdTime": created.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            }
+            if properties:
+                entry["appProperties"] = json.loads(properties.group(1))
+            self.files[file_id] = entry
+        return entry
+
+    def plant_orphans(self, count: int, age: float, tagged: bool = True) -> list:
+        """Add converted docs as if a crashed run had left them ``age`` seconds ago.
+
+        With ``tagged=False`` they look like the user's own docs that happen to share the folder.
+        """
+        properties = json.dumps({"appProperties": DRIVE_UPLOAD_PROPERTIES}) if tagged else "{}"
+        return [
+            self.create(f'{{"name": "orphan{index}.jpeg"}}{properties}'.encode(), age)["id"] for index in range(count)
+        ]
+
+    def delete(self, file_id: str) -> bool:
+        with self.lock:
+            return self.files.pop(file_id, None) is not None
+
+    def delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def fault(self) -> int | None:
+        """Status code to fail this request with, if one is injected."""
+        if not self.error_rate and not self.throttle_rate:
+            return None
+        with self.lock:
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                status = 429
+            elif roll < self.throttle_rate + self.error_rate:
+                status = 503
+            else:
+                return None
+            self.injected[status] += 1
+        return status
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeDrive/1.0"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        return
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+    def _send_json_headers(self, status: int, payload, headers):
+        self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+    def _begin(self):
+        state = self.server.state
+        with state.lock:
+            state.requests += 1
+        delay = state.delay()
+        if delay:
+            time.sleep(delay)
+        url = urlparse(self.path)
+        return url.path, parse_qs(url.query)
+
+    def _inject_fault(self) -> bool:
+        """Answer with an injected 429 or 503 instead of serving the request."""
+        status = self.server.state.fault()
+        if status is None:
+            return False
+        if status == 429:
+            error = {"code": 429, "message": "Rate Limit Exceeded", "errors": [{"reason": "rateLimitExceeded"}]}
+            self._send_json_headers(429, {"error": error}, {"Retry-After": str(self.server.state.retry_after)})
+        else:
+            error = {"code": 503, "message": "Backend Error", "errors": [{"reason": "backendError"}]}
+            self._send_json(503, {"error": error})
+        return True
+
+    def do_GET(self):
+        path, query = self._begin()
+        state = self.server.state
+        if path == "/discovery/v1/apis/drive/v3/rest":
+            document = discovery_document(self.server.root_url)
+            self._send(200, json.dumps(document).encode("utf-8"))
+            return
+        if self._inject_fault():
+            return
+        match = re.fullmatch(r"/drive/v3/files/([^/]+)/export", path)
+        if match:
+            entry = state.files.get(match.group(1))
+            if entry is None:
+                self._send_json(404, {"error": {"code": 404, "message": "File not found"}})
+                return
+            text = f"{EXPORT_HEADER}OCR {entry['name']}"
+            self._send(200, text.encode("utf-8"), "text/plain; charset=utf-8")
+            return
+        if path == "/drive/v3/files":
+            # The query is not evaluated; callers filter what they get back.
+            with state.lock:
+                files = list(state.files.values())
+            start = int(query.get("pageToken", ["0"])[0])
+            size = int(query.get("pageSize", ["100"])[0])
+            payload = {"files": files[start:start + size]}
+            if start + size < len(files):
+                payload["nextPageToken"] = str(start + size)
+            self._send_json(200, payload)
+            return
+        self._send_json(404, {"error": {"code": 404, "message": "Unknown path"}})
+
+    def do_POST(self):
+        path, query = self._begin()
+        state = self.server.state
+        body = self._read_body()
+        if self._inject_fault():
+            return
+        if path == "/upload/drive/v3/files":
+            upload_type = query.get("uploadType", ["multipart"])[0]
+            if upload_type == "resumable":
+                with state.lock:
+                    session_id = f"session{next(state.counter)}"
+                    state.sessions[session_id] = body
+                location = f"{self.server.root_url}upload/drive/v3/files?uploadType=resumable&upload_id={session_id}"
+                self._send(200, headers={"Location": location})
+                return
+            self._send_json(200, state.create(body))
+            return
+        if path == "/batch/drive/v3":
+            self._batch(body)
+            return
+        self._send_json(404, {"error": {"code": 404, "message": "Unknown path"}})
+
+    def _batch(self, body: bytes):
+        """Run the DELETE calls of a multipart/mixed batch and answer in the same format."""
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1")
+        message = email.parser.BytesParser().parsebytes(header + body)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().lstrip().split("\n", 1)[0].split()
+            method, target = request_line[0], request_line[1]
+            match = re.fullmatch(r"/drive/v3/files/([^/?]+)(\?.*)?", urlparse(target).path)
+            if method == "DELETE" and match and self.server.state.delete(match.group(1)):
+                status = "204 No Content"
+            else:
+                status = "404 Not Found"
+            content_id = part["Content-ID"].strip("<>")
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n\r\n\r\n"
+            )
+        payload = "".join(parts) + f"--{boundary}--\r\n"
+        self._send(200, payload.encode("utf-8"), f"multipart/mixed; boundary={boundary}")
+
+    def do_PUT(self):
+        path, query = self._begin()
+        state = self.server.state
+        self._read_body()
+        if self._inject_fault():
+            return
+        session_id = query.get("upload_id", [""])[0]
+        with state.lock:
+            metadata = state.sessions.pop(session_id, None)
+        if metadata is None:
+            self._send_json(404, {"error": {"code": 404, "message": "Unknown upload session"}})
+            return
+        self._send_json(200, state.create(metadata))
+
+    def do_DELETE(self):
+        path, _ = self._begin()
+        state = self.server.state
+        if self._inject_fault():
+            return
+        match = re.fullmatch(r"/drive/v3/files/([^/]+)", path)
+        if match and state.delete(match.group(1)):
+            self._send(204)
+            return
+        self._send_json(404, {"error": {"code": 404, "message": "File not found"}})
+
+
+class _FakeDriveHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class FakeDriveServer:
+    """Run :class:`FakeDriveHandler` on a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, **faults):
+        """``faults`` go to :class:`FakeDriveState`: jitter, error_rate, throttle_rate, retry_after, seed."""
+        self.state = FakeDriveState(latency=latency, **faults)
+        self._server = _FakeDriveHTTPServer((host, port), FakeDriveHandler)
+        self._server.state = self.state
+        self._server.root_url = self.root_url
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
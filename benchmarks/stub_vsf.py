@@ -0,0 +1,111 @@
+"""Stand-in for VideoSubFinder on machines without it, driven by a subtitle timeline.
+
+The "video" passed with ``-i`` is a JSON timeline written by
+:func:`write_timeline`. The stub takes VSF's options (``-c``, ``-o``,
+``-s``/``-e`` as ``H:MM:SS:mmm``; the crop options are accepted and
+ignored), prints ``%N`` progress the way VSF does, and writes one RGBImage
+per subtitle visible in its time range into ``<output>/RGBImages``. A
+subtitle cut by the range starts or ends at the range edge, and the edges
+of every subtitle are moved by up to one frame, so two runs over
+overlapping ranges disagree slightly, as real VSF runs do.
+
+Reading the video costs ``--cost`` seconds per minute of video, slept by
+default or spent in a busy loop with ``--busy`` to load one core.
+
+Usage: python benchmarks/stub_vsf.py [--cost 0.5] [--busy] -c -r -i TIMELINE.json -o OUTPUT [-s 0:01:00:000] [-e ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import WORDS, load_font, render_line, vsf_name  # noqa: E402
+
+FRAME_MS = 40
+WIDTH, HEIGHT = 960, 96
+
+
+def write_timeline(path: Path, duration_ms: int, seed: int = 1) -> list:
+    """A random subtitle timeline over ``duration_ms``; returns its ``[start, end, text]`` lines."""
+    rng = random.Random(seed)
+    lines = []
+    clock = 1000
+    while True:
+        start = clock // FRAME_MS * FRAME_MS
+        end = start + rng.randint(15, 100) * FRAME_MS
+        if end >= duration_ms:
+            break
+        lines.append([start, end, " ".join(rng.choices(WORDS, k=rng.randint(3, 9)))])
+        clock = end + rng.randint(300, 3000)
+    path.write_text(json.dumps({"duration_ms": duration_ms, "lines": lines}), encoding="utf-8")
+    return lines
+
+
+def parse_time(text: str) -> int:
+    hours, minutes, seconds, millis = map(int, text.split(":"))
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+
+def spend(seconds: float, busy: bool):
+    if not busy:
+        time.sleep(seconds)
+        return
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cost", type=float, default=0.5, help="Seconds per minute of video read")
+    parser.add_argument("--busy", action="store_true", help="Burn CPU instead of sleeping")
+    parser.add_argument("-i", dest="video", type=Path, required=True)
+    parser.add_argument("-o", dest="output", type=Path, required=True)
+    parser.add_argument("-s", dest="start", default="0:00:00:000")
+    parser.add_argument("-e", dest="end")
+    parser.add_argument("-c", dest="clear", action="store_true")
+    parser.add_argument("-r", dest="run", action="store_true")
+    parser.add_argument("-ccti", action="store_true")
+    for crop in ("-te", "-be", "-le", "-re"):
+        parser.add_argument(crop)
+    args = parser.parse_args()
+
+    timeline = json.loads(args.video.read_text(encoding="utf-8"))
+    start_ms = parse_time(args.start)
+    end_ms = min(parse_time(args.end), timeline["duration_ms"]) if args.end else timeline["duration_ms"]
+    if args.clear:
+        shutil.rmtree(args.output, ignore_errors=True)
+    folder = args.output / "RGBImages"
+    folder.mkdir(parents=True, exist_ok=True)
+
+    font = load_font(HEIGHT)
+    # Runs over different ranges place the same edge differently, like VSF starting on another frame.
+    jitter = random.Random(start_ms)
+    visible = [(index, line) for index, line in enumerate(timeline["lines"]) if line[1] > start_ms and line[0] < end_ms]
+    steps = 100
+    step_ms = max(1, end_ms - start_ms) / steps
+    written = 0
+    for step in range(1, steps + 1):
+        spend(args.cost * step_ms / 60_000, args.busy)
+        reached = start_ms + step * step_ms
+        while visible and (visible[0][1][1] <= reached or step == steps):
+            index, (line_start, line_end, text) = visible.pop(0)
+            shown_start = max(line_start, start_ms) + jitter.choice((0, 0, FRAME_MS))
+            shown_end = min(line_end, end_ms) - jitter.choice((0, 0, FRAME_MS))
+            image = render_line(text, WIDTH, HEIGHT, random.Random(index), font).convert("RGB")
+            written += 1
+            image.save(folder / vsf_name(shown_start, shown_end, written), quality=90)
+        print(f"%{step} {written} images", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+from fake_drive import EXPORT_HEADER, FakeDriveServer
+
+from app import async_engine, concurrency
+
+
+def _images(folder, count):
+    images = []
+    for index in range(count):
+        image = folder / f"0_00_{index // 1000:02d}_{index % 1000:03d}__0_00_00_000_{index}.png"
+        image.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 256)
+        images.append(image)
+    return images
+
+
+def _run(server, images, limit=8, max_tries=concurrency.MAX_ATTEMPTS, should_stop=lambda: False, on_result=None):
+    results, errors = {}, {}
+    lock = threading.Lock()
+
+    def record(job, text):
+        with lock:
+            results[job[0].name] = text
+        if on_result is not None:
+            on_result()
+
+    def fail(job, exc):
+        with lock:
+            errors[job[0].name] = exc
+
+    engine = async_engine.AsyncOCREngine(
+        lambda: async_engine.AsyncHttpTransport(root_url=server.root_url, max_connections=limit),
+        "folder",
+        limit,
+        max_tries=max_tries,
+    )
+    engine.run(((image,) for image in images), record, fail, should_stop)
+    return results, errors
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(concurrency, "backoff_delay", lambda attempt, retry_after=None, cap=None: 0.0)
+
+
+def test_every_image_is_converted_and_cleaned_up(tmp_path):
+    images = _images(tmp_path, 30)
+    with FakeDriveServer() as server:
+        results, errors = _run(server, images)
+        assert not server.state.files
+    assert not errors
+    assert results == {image.name: f"{EXPORT_HEADER}OCR {image.name}" for image in images}
+
+
+def test_throttled_requests_are_retried(tmp_path):
+    images = _images(tmp_path, 20)
+    with FakeDriveServer(throttle_rate=0.3, retry_after=0.01, seed=7) as server:
+        results, errors = _run(server, images, max_tries=20)
+        # Deletes are not retried: a throttled one leaves an orphan for the sweep, so only the results are checked.
+        assert server.state.injected[429] > 0
+    assert not errors
+    assert sorted(results) == sorted(image.name for image in images)
+
+
+def test_throttling_past_the_last_try_is_reported(tmp_path):
+    images = _images(tmp_path, 3)
+    with FakeDriveServer(throttle_rate=1.0, retry_after=0.01) as server:
+        results, errors = _run(server, images, max_tries=2)
+        assert server.state.injected[429] == 6
+    assert not results
+    assert sorted(errors) == sorted(image.name for image in images)
+    assert all(isinstance(exc, async_engine.HTTPStatusError) for exc in errors.values())
+    assert all(concurrency.classify_error(exc)[0] == "throttle" for exc in errors.values())
+
+
+def test_a_missing_image_fails_without_touching_drive(tmp_path):
+    images = _images(tmp_path, 2)
+    images[0].unlink()
+    with FakeDriveServer() as server:
+        results, errors = _run(server, images)
+        assert server.state.requests == 3
+    assert list(results) == [images[1].name]
+    assert isinstance(errors[images[0].name], FileNotFoundError)
+
+
+def test_a_stop_request_cancels_the_conversions_in_flight(tmp_path):
+    images = _images(tmp_path, 40)
+    stop = threading.Event()
+    with FakeDriveServer(latency=0.2) as server:
+        started = time.monotonic()
+        results, errors = _run(server, images, limit=4, should_stop=stop.is_set, on_result=stop.set)
+        elapsed = time.monotonic() - started
+    # Forty images four at a time would take several seconds at this latency.
+    assert elapsed < 2.5
+    assert 1 <= len(results) < len(images)
+    assert not errors
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+from bench_pipeline import offline_credentials, scenario_directory
+from fake_drive import FakeDriveServer
+from stub_vsf import write_timeline
+
+from app import cli, ocr, vsf
+
+STUB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "stub_vsf.py")
+CROP = ["--crop", "0", "0.3", "0", "1"]
+
+
+@pytest.fixture
+def stub_vsf(tmp_path):
+    """An executable that runs the stub VSF, since the CLI runs whatever ``--vsf`` names."""
+    if os.name == "nt":
+        pytest.skip("the stub wrapper is a shell script")
+    wrapper = tmp_path / "vsf.sh"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{STUB}" --cost 0 "$@"\n', encoding="utf-8")
+    wrapper.chmod(0o755)
+    return str(wrapper)
+
+
+@pytest.fixture
+def workdir():
+    with FakeDriveServer() as server, offline_credentials():
+        pipeline = {"drive_root_url": server.root_url, "ocr_cache": False, "drive_sweep_orphans": False}
+        with scenario_directory({"threads": 4}, pipeline) as workdir:
+            yield workdir
+
+
+def test_exit_code_of_a_run():
+    assert cli._exit_code(True, 0) == cli.EXIT_OK
+    assert cli._exit_code(True, 2) == cli.EXIT_PARTIAL
+    assert cli._exit_code(False, 0) == cli.EXIT_FAILED
+    assert cli._merge_exit_codes([cli.EXIT_OK, cli.EXIT_PARTIAL, cli.EXIT_OK]) == cli.EXIT_PARTIAL
+    assert cli._merge_exit_codes([cli.EXIT_PARTIAL, cli.EXIT_FAILED, cli.EXIT_PARTIAL]) == cli.EXIT_FAILED
+    assert cli._merge_exit_codes([]) == cli.EXIT_OK
+
+
+def test_bad_arguments_exit_with_usage(workdir, stub_vsf, capsys):
+    video = str(workdir / "video.json")
+    assert cli.main([video, *CROP]) == cli.EXIT_USAGE
+    assert cli.main([video, "--profile", "không có", "--vsf", stub_vsf]) == cli.EXIT_USAGE
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([video, "--vsf", stub_vsf])
+    assert exit_info.value.code == cli.EXIT_USAGE
+    assert "--vsf" in capsys.readouterr().err
+
+
+def test_a_video_is_turned_into_an_srt(workdir, stub_vsf):
+    lines = write_timeline(workdir / "video.json", 20_000)
+    assert cli.main([str(workdir / "video.json"), *CROP, "--vsf", stub_vsf]) == cli.EXIT_OK
+    assert (workdir / "video.srt").read_text(encoding="utf-8").count("-->") == len(lines)
+
+
+def test_a_missing_video_fails_but_the_others_still_run(workdir, stub_vsf):
+    write_timeline(workdir / "video.json", 20_000)
+    videos = [str(workdir / "missing.json"), str(workdir / "video.json")]
+    assert cli.main([*videos, *CROP, "--vsf", stub_vsf]) == cli.EXIT_FAILED
+    assert (workdir / "video.srt").exists()
+
+
+def test_ctrl_c_stops_the_run(workdir, stub_vsf, monkeypatch):
+    stopped = []
+
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(cli, "process_video", interrupt)
+    monkeypatch.setattr(ocr, "request_stop", lambda: stopped.append("ocr"))
+    monkeypatch.setattr(vsf, "cancel_all", lambda: stopped.append("vsf"))
+    assert cli.main([str(workdir / "video.json"), *CROP, "--vsf", stub_vsf]) == cli.EXIT_INTERRUPTED
+    assert stopped == ["ocr", "vsf"]
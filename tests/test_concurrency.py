@@ -0,0 +1,118 @@
+import json
+import random
+import socket
+import threading
+
+import httplib2
+import pytest
+from apiclient.errors import HttpError
+
+from app import concurrency
+
+
+def _http_error(status, reason=None, retry_after=None):
+    headers = {"status": str(status)}
+    if retry_after is not None:
+        headers["retry-after"] = retry_after
+    content = json.dumps({"error": {"errors": [{"reason": reason}]}} if reason else {}).encode("utf-8")
+    return HttpError(httplib2.Response(headers), content)
+
+
+@pytest.mark.parametrize(
+    "exc, kind",
+    [
+        (_http_error(429), "throttle"),
+        (_http_error(403, "userRateLimitExceeded"), "throttle"),
+        (_http_error(403, "insufficientFilePermissions"), "other"),
+        (_http_error(400, "badRequest"), "other"),
+        (_http_error(404), "other"),
+        (_http_error(500), "server"),
+        (_http_error(503), "server"),
+        (ConnectionResetError("reset"), "network"),
+        (socket.timeout("timed out"), "network"),
+        (TimeoutError(), "network"),
+        (httplib2.ServerNotFoundError("no dns"), "network"),
+        (FileNotFoundError("gone.jpeg"), "other"),
+        (PermissionError("locked.jpeg"), "other"),
+        (ValueError("cannot identify image"), "other"),
+    ],
+)
+def test_classify_error(exc, kind):
+    assert concurrency.classify_error(exc)[0] == kind
+    assert concurrency.is_retryable(exc) == (kind != "other")
+
+
+def test_classify_error_reads_retry_after():
+    assert concurrency.classify_error(_http_error(429, retry_after="7")) == ("throttle", 7.0)
+    assert concurrency.classify_error(_http_error(503, retry_after="soon")) == ("server", None)
+
+
+def test_backoff_delay_grows_with_full_jitter_and_respects_the_cap(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    assert [concurrency.backoff_delay(attempt) for attempt in range(1, 6)] == [1.0, 2.0, 4.0, 8.0, 16.0]
+    assert concurrency.backoff_delay(20, cap=8.0) == 8.0
+    monkeypatch.setattr(random, "uniform", lambda low, high: low)
+    assert concurrency.backoff_delay(3) == 0.0
+    assert concurrency.backoff_delay(3, retry_after=5.0) == 5.0
+
+
+def test_limiter_adds_one_per_window_of_successes():
+    limiter = concurrency.AdaptiveLimiter(4, maximum=10)
+    # 1/limit per success, with the limit growing along the way: 4 + 1/4 + 1/4.25 + ... passes 5 on the fifth.
+    for _ in range(4):
+        limiter.on_success(0.1)
+    assert limiter.limit == 4
+    limiter.on_success(0.1)
+    assert limiter.limit == 5
+    for _ in range(100):
+        limiter.on_success(0.1)
+    assert limiter.limit == 10
+
+
+def test_limiter_halves_on_throttle_once_per_cooldown():
+    limiter = concurrency.AdaptiveLimiter(16, cooldown=60.0)
+    limiter.on_failure(_http_error(429))
+    assert limiter.limit == 8
+    limiter.on_failure(_http_error(429))
+    assert limiter.limit == 8
+    assert limiter.throttled == 2
+    assert [reason for _, _, reason in limiter.history] == ["start", "throttle"]
+
+
+def test_limiter_ignores_client_errors_and_keeps_its_minimum():
+    limiter = concurrency.AdaptiveLimiter(2, minimum=2, cooldown=0.0)
+    limiter.on_failure(_http_error(400))
+    limiter.on_failure(ValueError("bad image"))
+    assert limiter.limit == 2
+    limiter.on_failure(_http_error(500))
+    assert limiter.limit == 2
+
+
+def test_limiter_shrinks_gently_when_latency_climbs():
+    limiter = concurrency.AdaptiveLimiter(10, cooldown=0.0)
+    limiter.on_success(0.1)
+    for _ in range(10):
+        limiter.on_success(2.0)
+    assert limiter.limit < 10
+    assert "latency" in [reason for _, _, reason in limiter.history]
+
+
+def test_aborted_limiter_wakes_waiters_with_cancelled():
+    limiter = concurrency.AdaptiveLimiter(1, maximum=1)
+    limiter.acquire()
+    outcome = []
+
+    def wait():
+        try:
+            limiter.acquire()
+        except concurrency.Cancelled:
+            outcome.append("cancelled")
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    limiter.abort()
+    waiter.join(5)
+    assert outcome == ["cancelled"]
+    limiter.release()
+    with pytest.raises(concurrency.Cancelled):
+        limiter.acquire()
@@ -0,0 +1,70 @@
+import numpy as np
+from PIL import Image
+
+from app import dedupe
+
+
+def _name(start_ms, end_ms, suffix):
+    def clock(ms):
+        return f"{ms // 3_600_000}_{ms // 60_000 % 60:02d}_{ms // 1000 % 60:02d}_{ms % 1000:03d}"
+
+    return f"{clock(start_ms)}__{clock(end_ms)}_{suffix}.png"
+
+
+def _line(seed):
+    """A black strip with a random pattern of white glyph-sized blocks."""
+    blocks = np.random.default_rng(seed).random((4, 24)) > 0.5
+    return np.kron(blocks, np.ones((8, 12), dtype=bool)) * 255
+
+
+def _frame(folder, start_ms, end_ms, line, suffix, noise=0):
+    pixels = np.zeros((48, 320), dtype=np.uint8)
+    pixels[8:40, 16:304] = line
+    if noise:
+        # A few flipped pixels, like compression noise between two frames of the same line.
+        rng = np.random.default_rng(noise)
+        rows, columns = rng.integers(8, 40, 6), rng.integers(16, 304, 6)
+        pixels[rows, columns] = 255 - pixels[rows, columns]
+    path = folder / _name(start_ms, end_ms, suffix)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_dhash_sees_through_noise_but_not_another_line(tmp_path):
+    first = dedupe.dhash(_frame(tmp_path, 0, 500, _line(1), "a"))
+    noisy = dedupe.dhash(_frame(tmp_path, 500, 1000, _line(1), "b", noise=3))
+    other = dedupe.dhash(_frame(tmp_path, 1000, 1500, _line(2), "c"))
+    assert dedupe.hamming(first, noisy) <= 16
+    assert dedupe.hamming(first, other) > 16
+
+
+def test_adjacent_frames_of_one_line_are_merged(tmp_path):
+    first, second = _line(1), _line(2)
+    images = [
+        _frame(tmp_path, 3000, 3400, second, "d"),
+        _frame(tmp_path, 1000, 1200, first, "a"),
+        _frame(tmp_path, 1300, 2000, first, "b", noise=5),
+        _frame(tmp_path, 2100, 2300, first, "c", noise=7),
+    ]
+    groups = dedupe.group_frames(images, workers=2)
+
+    assert [group.members for group in groups] == [images[1:], images[:1]]
+    assert groups[0].time_range == (1000, 2300)
+    # The longest-lasting frame reads best, so it is the one sent to OCR.
+    assert groups[0].representative == images[2]
+    assert groups[1].time_range == (3000, 3400)
+
+
+def test_a_gap_or_an_unreadable_image_starts_a_new_group(tmp_path):
+    line = _line(1)
+    before = _frame(tmp_path, 0, 500, line, "a")
+    after_gap = _frame(tmp_path, 1000, 1500, line, "b")
+    broken = tmp_path / _name(1500, 2000, "c")
+    broken.write_bytes(b"not an image")
+    after_broken = _frame(tmp_path, 2000, 2500, line, "d")
+    untimed = tmp_path / "cover.png"
+    Image.fromarray(np.zeros((48, 320), dtype=np.uint8)).save(untimed)
+
+    groups = dedupe.group_frames([untimed, after_broken, broken, after_gap, before], max_gap_ms=250)
+    assert [group.members for group in groups] == [[before], [after_gap], [broken], [after_broken], [untimed]]
+    assert groups[-1].time_range is None
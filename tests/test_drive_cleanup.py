@@ -0,0 +1,52 @@
+from app import drive_cleanup, drive_pool
+from app.constants import DRIVE_UPLOAD_PROPERTIES
+
+OLD = "2020-01-01T00:00:00.000Z"
+
+
+class _Files:
+    def __init__(self, entries):
+        self.entries = entries
+        self.queries = []
+
+    def list(self, q, fields, pageSize, pageToken):
+        self.queries.append(q)
+        return self
+
+    def execute(self):
+        return {"files": self.entries}
+
+
+class _Service:
+    def __init__(self, entries):
+        self._files = _Files(entries)
+
+    def files(self):
+        return self._files
+
+
+class _Deleter:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, file_id, attempt=1):
+        self.submitted.append(file_id)
+
+
+def test_sweep_only_deletes_tagged_uploads(monkeypatch):
+    service = _Service(
+        [
+            {"id": "ours", "name": "0_00_01_000__0_00_02_000_1.jpeg", "createdTime": OLD,
+             "appProperties": dict(DRIVE_UPLOAD_PROPERTIES)},
+            {"id": "users", "name": "holiday.jpeg", "createdTime": OLD},
+            {"id": "other-app", "name": "scan.png", "createdTime": OLD, "appProperties": {"other": "upload"}},
+        ]
+    )
+    monkeypatch.setattr(drive_pool.POOL, "get", lambda: service)
+    deleter = _Deleter()
+
+    assert drive_cleanup.sweep_folder("folder", 600, deleter) == 1
+    assert deleter.submitted == ["ours"]
+    (query,) = service.files().queries
+    for key, value in DRIVE_UPLOAD_PROPERTIES.items():
+        assert f"appProperties has {{ key='{key}' and value='{value}' }}" in query
@@ -0,0 +1,22 @@
+import pytest
+from fake_drive import FakeDriveServer
+
+from app import drive_pool
+
+
+def test_abort_closes_the_connections_the_pool_opened():
+    pool = drive_pool.DriveClientPool()
+    with FakeDriveServer() as server:
+        pool.configure(None, server.root_url)
+        service = pool.get()
+        service.files().list(pageSize=1, fields="files(id)").execute()
+        assert len(pool._connections) == 1
+
+        pool.abort()
+        with pytest.raises(OSError):
+            service.files().list(pageSize=1, fields="files(id)").execute()
+
+        fresh = pool.get()
+        assert fresh is not service
+        fresh.files().list(pageSize=1, fields="files(id)").execute()
+        assert len(pool._connections) == 2
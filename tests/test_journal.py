@@ -0,0 +1,75 @@
+import json
+
+from app import journal
+
+
+def _image(tmp_path, name="0_00_01_000__0_00_02_000_1.jpeg"):
+    path = tmp_path / name
+    path.write_bytes(b"image")
+    return path
+
+
+def test_resume_returns_recorded_text_for_an_unchanged_image(tmp_path):
+    path = journal.journal_path(tmp_path / "movie.srt")
+    assert path.name == "movie.journal.jsonl"
+    image = _image(tmp_path)
+
+    first = journal.RunJournal(path)
+    first.record(image, "abc", (1000, 2000), "xin chào")
+    first.close()
+
+    resumed = journal.RunJournal(path, resume=True)
+    assert resumed.resumed == 1
+    assert resumed.lookup(image, "abc") == "xin chào"
+    assert resumed.lookup(image, "changed") is None
+    resumed.close()
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = tmp_path / "movie.journal.jsonl"
+    image = _image(tmp_path)
+    first = journal.RunJournal(path)
+    first.record(image, "abc", (1000, 2000), "text")
+    first.close()
+
+    fresh = journal.RunJournal(path)
+    assert fresh.resumed == 0
+    assert fresh.lookup(image, "abc") is None
+    fresh.close()
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def test_a_later_failure_cancels_an_earlier_success(tmp_path):
+    path = tmp_path / "movie.journal.jsonl"
+    image = _image(tmp_path)
+    run = journal.RunJournal(path)
+    run.record(image, "abc", (1000, 2000), "text")
+    run.record(image, "abc", None, "", status="failed")
+    run.close()
+
+    resumed = journal.RunJournal(path, resume=True)
+    assert resumed.lookup(image, "abc") is None
+    resumed.close()
+
+
+def test_a_line_cut_short_by_a_crash_is_ignored_and_terminated(tmp_path):
+    path = tmp_path / "movie.journal.jsonl"
+    done, pending = _image(tmp_path, "a.jpeg"), _image(tmp_path, "b.jpeg")
+    run = journal.RunJournal(path)
+    run.record(done, "1", (0, 1), "kept")
+    run.close()
+    with open(path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"image": "half')
+
+    resumed = journal.RunJournal(path, resume=True)
+    assert resumed.resumed == 1
+    resumed.record(pending, "2", (1, 2), "appended")
+    resumed.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["text"] == "appended"
+    again = journal.RunJournal(path, resume=True)
+    assert again.lookup(done, "1") == "kept"
+    assert again.lookup(pending, "2") == "appended"
+    again.close(remove=True)
+    assert not path.exists()
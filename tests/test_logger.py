@@ -0,0 +1,111 @@
+import io
+import threading
+
+from app.logger import GuiLogger
+
+
+def _messages(path):
+    return [line.split("] ", 1)[1] for line in path.read_text(encoding="utf-8").splitlines()[1:]]
+
+
+class _Text:
+    """Just enough of a Tk Text widget for the logger's view: whole lines, appended at the end."""
+
+    def __init__(self):
+        self.lines = []
+
+    def config(self, **options):
+        pass
+
+    def insert(self, index, text):
+        self.lines.extend(text.splitlines())
+
+    def index(self, index):
+        return f"{len(self.lines) + 1}.0"
+
+    def delete(self, first, last):
+        del self.lines[: int(last.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+class _Root:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+
+def test_flush_waits_until_every_line_is_on_disk(tmp_path):
+    logger = GuiLogger()
+    logger.log("trước khi có file")
+    logger.set_log_file(str(tmp_path / "run.log"))
+    for index in range(500):
+        logger.log(f"dòng {index}")
+    assert logger.flush(timeout=5)
+    assert _messages(tmp_path / "run.log") == [f"dòng {index}" for index in range(500)]
+    logger.close()
+
+
+def test_lines_follow_the_log_file_they_were_logged_under(tmp_path):
+    logger = GuiLogger()
+    logger.set_log_file(str(tmp_path / "first.log"))
+    logger.log("một")
+    logger.set_log_file(str(tmp_path / "second.log"))
+    logger.log("hai")
+    logger.close()
+    assert _messages(tmp_path / "first.log") == ["một"]
+    assert _messages(tmp_path / "second.log") == ["hai"]
+
+
+def test_close_flushes_and_later_lines_stay_out_of_the_file(tmp_path):
+    stream = io.StringIO()
+    logger = GuiLogger()
+    logger.set_stream(stream)
+    logger.set_log_file(str(tmp_path / "run.log"))
+    logger.log("trước")
+    logger.close()
+    assert _messages(tmp_path / "run.log") == ["trước"]
+    logger.log("sau")
+    assert logger.flush(timeout=5)
+    assert _messages(tmp_path / "run.log") == ["trước"]
+    assert stream.getvalue() == "trước\nsau\n"
+
+
+def test_each_thread_keeps_its_order(tmp_path):
+    logger = GuiLogger()
+    logger.set_log_file(str(tmp_path / "run.log"))
+
+    def work(name):
+        for index in range(200):
+            logger.log(f"{name} {index}")
+
+    workers = [threading.Thread(target=work, args=(name,)) for name in "abcd"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    logger.close()
+    messages = _messages(tmp_path / "run.log")
+    assert len(messages) == 800
+    for name in "abcd":
+        assert [message for message in messages if message.startswith(name)] == [f"{name} {i}" for i in range(200)]
+
+
+def test_the_widget_is_filled_in_batches_and_keeps_the_last_lines():
+    logger = GuiLogger(max_lines=5)
+    root, widget = _Root(), _Text()
+    logger.configure(root, widget)
+    for index in range(3):
+        logger.log(f"dòng {index}")
+    assert widget.lines == []
+    root.scheduled.pop(0)()
+    assert widget.lines == ["dòng 0", "dòng 1", "dòng 2"]
+    for index in range(3, 12):
+        logger.log(f"dòng {index}")
+    root.scheduled.pop(0)()
+    assert widget.lines == [f"dòng {index}" for index in range(7, 12)]
+    assert len(root.scheduled) == 1
+    logger.close()
@@ -0,0 +1,48 @@
+import json
+
+from app import manifest
+
+
+def _touch(folder, name):
+    path = folder / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"image")
+    return path
+
+
+def test_manifest_orders_by_time_and_puts_untimed_images_last(tmp_path):
+    _touch(tmp_path, "0_00_05_000__0_00_06_000_a.jpeg")
+    _touch(tmp_path, "cover.png")
+    _touch(tmp_path, "sub/0_00_01_000__0_00_02_000_b.jpeg")
+    _touch(tmp_path, "notes.txt")
+
+    entries = manifest.build_manifest(tmp_path)
+    assert [entry.key for entry in entries] == [
+        "sub/0_00_01_000__0_00_02_000_b.jpeg",
+        "0_00_05_000__0_00_06_000_a.jpeg",
+        "cover.png",
+    ]
+    assert entries[0].time_range == (1000, 2000)
+    assert entries[-1].time_range is None
+    assert manifest.MANIFEST_NAME == ".segg_ocr_manifest.json"
+
+
+def test_reused_manifest_follows_added_and_removed_images(tmp_path):
+    first = _touch(tmp_path, "0_00_03_000__0_00_04_000_a.jpeg")
+    manifest.build_manifest(tmp_path)
+
+    first.unlink()
+    _touch(tmp_path, "0_00_01_000__0_00_02_000_b.jpeg")
+    entries = manifest.build_manifest(tmp_path)
+    assert [entry.key for entry in entries] == ["0_00_01_000__0_00_02_000_b.jpeg"]
+
+    stored = json.loads((tmp_path / manifest.MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert stored == {"version": manifest.MANIFEST_VERSION, "images": [["0_00_01_000__0_00_02_000_b.jpeg", 1000, 2000]]}
+
+
+def test_manifest_of_another_version_is_ignored(tmp_path):
+    _touch(tmp_path, "0_00_01_000__0_00_02_000_b.jpeg")
+    (tmp_path / manifest.MANIFEST_NAME).write_text(
+        json.dumps({"version": 1, "images": [["0_00_01_000__0_00_02_000_b.jpeg", 5, 0, 9000, 9500]]}), encoding="utf-8"
+    )
+    assert manifest.build_manifest(tmp_path)[0].time_range == (1000, 2000)
@@ -0,0 +1,55 @@
+from app import metrics
+
+
+def test_percentile_is_nearest_rank():
+    assert metrics.percentile(list(range(1, 7)), 0.50) == 3
+    assert metrics.percentile(list(range(1, 21)), 0.95) == 19
+    assert metrics.percentile(list(range(1, 21)), 0.50) == 10
+    assert metrics.percentile([4.0], 0.99) == 4.0
+    assert metrics.percentile(list(range(1, 11)), 0.0) == 1
+    assert metrics.percentile(list(range(1, 11)), 1.0) == 10
+    assert metrics.percentile([], 0.5) == 0.0
+
+
+def test_snapshot_reports_exact_percentiles_and_buckets():
+    run = metrics.RunMetrics()
+    for value in range(1, 21):
+        run.observe("drive_export", value / 100)
+    stage = run.snapshot()["stages"]["drive_export"]
+    assert stage["count"] == 20
+    assert stage["p50_s"] == 0.10
+    assert stage["p95_s"] == 0.19
+    assert stage["max_s"] == 0.20
+    assert stage["buckets"]["0.1"] == 10
+
+
+def test_panel_uses_only_the_recent_window():
+    run = metrics.RunMetrics()
+    for _ in range(metrics.PANEL_WINDOW):
+        run.observe("drive_export", 9.0)
+    for _ in range(metrics.PANEL_WINDOW):
+        run.observe("drive_export", 1.0)
+    assert "xuất 1.00/1.00s" in run.panel_text()
+    assert run.snapshot()["stages"]["drive_export"]["count"] == 2 * metrics.PANEL_WINDOW
+
+
+def test_reset_keeps_the_requested_stages():
+    run = metrics.RunMetrics()
+    run.observe("vsf", 2.0)
+    run.observe("drive_export", 0.5)
+    run.count("retries")
+    run.reset(keep=("vsf",))
+    snapshot = run.snapshot()
+    assert list(snapshot["stages"]) == ["vsf"]
+    assert snapshot["counters"] == {}
+    assert "xuất" not in run.panel_text()
+
+
+def test_prometheus_names_start_with_the_app_slug():
+    run = metrics.RunMetrics()
+    run.observe("vsf", 1.0)
+    run.count("retries", 2)
+    text = run.to_prometheus()
+    assert 'segg_ocr_stage_seconds_count{stage="vsf"} 1' in text
+    assert 'segg_ocr_total{name="retries"} 2' in text
+    assert all(line.split()[2 if line.startswith("#") else 0].startswith("segg_ocr_") for line in text.splitlines())
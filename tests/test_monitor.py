@@ -0,0 +1,112 @@
+import os
+import time
+
+from app import monitor, reporting
+
+NAME = "0_00_0{0}_000__0_00_0{0}_500_{0}.jpeg"
+
+
+class _Progress(reporting.Reporter):
+    def __init__(self):
+        self.percentages = []
+
+    def extraction_progress(self, percentage, text=""):
+        self.percentages.append(percentage)
+
+
+def _touch(folder, index):
+    path = folder / NAME.format(index)
+    path.write_bytes(b"image")
+    return os.path.normpath(str(path))
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _monitor(folder, **options):
+    options.setdefault("batch_interval", 0.02)
+    options.setdefault("rescan_interval", 0.1)
+    return monitor.ImagesMonitor(_Progress(), str(folder), "00:00:10", **options)
+
+
+def test_files_written_before_the_watcher_started_are_indexed_at_once(tmp_path):
+    before = [_touch(tmp_path, index) for index in (1, 2)]
+    # A rescan far in the future: only the first diff can find the early files.
+    images = _monitor(tmp_path, rescan_interval=60).start()
+    try:
+        assert _wait_for(lambda: images.file_count == 2, timeout=2.0)
+        assert sorted(images.images) == sorted(before)
+        assert images.images[before[0]] == (1000, 1500)
+        after = _touch(tmp_path, 3)
+        assert _wait_for(lambda: after in images.images)
+    finally:
+        images.stop()
+    assert not images.polling
+    assert images.reporter.percentages[-1] == 30.0
+
+
+def test_early_files_are_not_taken_for_missed_events(tmp_path):
+    for index in (1, 2, 3):
+        _touch(tmp_path, index)
+    images = _monitor(tmp_path).start()
+    try:
+        assert _wait_for(lambda: images.file_count == 3)
+        # Several rescans go by; none of them may blame the watcher for the early files.
+        time.sleep(0.5)
+    finally:
+        images.stop()
+    assert not images.polling
+
+
+def test_polling_mode_indexes_new_files(tmp_path):
+    images = _monitor(tmp_path, polling=True).start()
+    try:
+        paths = [_touch(tmp_path, index) for index in (1, 2)]
+        assert _wait_for(lambda: images.file_count == 2)
+        assert sorted(images.images) == sorted(paths)
+    finally:
+        images.stop()
+
+
+def test_a_watcher_that_misses_events_falls_back_to_polling(tmp_path, monkeypatch):
+    monkeypatch.setattr(monitor._EventCollector, "on_created", lambda self, event: None)
+    images = _monitor(tmp_path).start()
+    try:
+        assert _wait_for(lambda: images._observer is not None)
+        time.sleep(0.1)
+        path = _touch(tmp_path, 1)
+        assert _wait_for(lambda: images.polling)
+        assert _wait_for(lambda: path in images.images)
+        later = _touch(tmp_path, 2)
+        assert _wait_for(lambda: later in images.images)
+    finally:
+        images.stop()
+
+
+def test_a_folder_that_cannot_be_watched_is_polled(tmp_path, monkeypatch):
+    class BrokenObserver:
+        def schedule(self, *args, **kwargs):
+            raise OSError("inotify watch limit reached")
+
+    monkeypatch.setattr(monitor, "Observer", BrokenObserver)
+    images = _monitor(tmp_path).start()
+    try:
+        path = _touch(tmp_path, 1)
+        assert _wait_for(lambda: path in images.images)
+        assert images.polling
+    finally:
+        images.stop()
+
+
+def test_stop_indexes_what_the_batches_have_not_seen_yet(tmp_path):
+    images = _monitor(tmp_path, batch_interval=60, polling=True).start()
+    path = _touch(tmp_path, 1)
+    images.stop()
+    images.stop()
+    assert list(images.images) == [path]
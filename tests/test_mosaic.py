@@ -0,0 +1,44 @@
+import io
+
+from PIL import Image
+
+from app import mosaic
+
+
+def _drive_text(parts):
+    """What Drive exports for a mosaic: each marker on its own line, wrapped strip text after it."""
+    return "________________\n\n" + "".join(f"{mosaic.marker_text(index)}\n{part}\n" for index, part in enumerate(parts))
+
+
+def test_split_mosaic_text_returns_the_text_under_each_marker():
+    text = _drive_text(["xin chào", "dòng một\ndòng hai", ""])
+    assert mosaic.split_mosaic_text(text, 3) == ["xin chào", "dòng mộtdòng hai", ""]
+
+
+def test_split_mosaic_text_tolerates_how_drive_reads_the_markers():
+    text = "### 0 ###\nmột\n####1####\nhai\n###### 2 ####\nba"
+    assert mosaic.split_mosaic_text(text, 3) == ["một", "hai", "ba"]
+
+
+def test_split_mosaic_text_rejects_a_misread_batch():
+    assert mosaic.split_mosaic_text(_drive_text(["một", "hai"]), 3) is None
+    assert mosaic.split_mosaic_text(_drive_text(["một", "hai", "ba"]).replace("##### 1 #####", "#### I ####"), 3) is None
+    swapped = f"{mosaic.marker_text(1)}\nhai\n{mosaic.marker_text(0)}\nmột\n"
+    assert mosaic.split_mosaic_text(swapped, 2) is None
+    assert mosaic.split_mosaic_text("## 0 ##\nmột", 1) is None
+
+
+def test_build_mosaic_stacks_every_strip_under_a_band(tmp_path):
+    paths = []
+    for index, size in enumerate([(400, 60), (3000, 90)]):
+        path = tmp_path / f"{index}.png"
+        Image.new("RGB", size, "black").save(path)
+        paths.append(path)
+
+    with Image.open(io.BytesIO(mosaic.build_mosaic(paths))) as image:
+        assert image.width == mosaic.MAX_MOSAIC_WIDTH
+        band = max(mosaic.MIN_BAND_HEIGHT, 60 // 2)
+        assert image.height == 60 + 60 + 2 * band
+        # The wide strip is scaled to the width limit and sits under the second band.
+        assert image.getpixel((10, band + 60 + band + 5)) == (0, 0, 0)
+        assert image.getpixel((500, band + 5)) == (255, 255, 255)
@@ -0,0 +1,97 @@
+import httplib2
+import pytest
+from apiclient.errors import HttpError
+from bench_pipeline import offline_credentials, scenario_directory
+from fake_drive import FakeDriveServer
+
+from app import backends, ocr, ocr_cache, reporting
+
+OLD_SRT = "1\n00:00:01,000 --> 00:00:02,000\nold\n\n"
+
+
+def test_a_run_without_images_keeps_the_srt_and_still_tears_down(tmp_path):
+    with FakeDriveServer() as server, offline_credentials():
+        pipeline = {"drive_root_url": server.root_url, "preprocess_images": True, "drive_sweep_orphans": False}
+        with scenario_directory({"threads": 1}, pipeline) as workdir:
+            (workdir / "RGBImages").mkdir()
+            (workdir / "video.srt").write_text(OLD_SRT, encoding="utf-8")
+            saved = ocr.start_processing(
+                reporting.Reporter(), str(workdir / "video.srt"), str(workdir / "RGBImages"), True, True, False, None
+            )
+            assert not saved
+            assert (workdir / "video.srt").read_text(encoding="utf-8") == OLD_SRT
+            assert not (workdir / "video.srt.part").exists()
+            assert (workdir / "video.metrics.json").exists()
+    assert ocr.CACHE is None
+    assert ocr.PREPROCESSOR is None
+
+
+class _FlakyBackend(backends.OCRBackend):
+    name = "drive"
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+        self.originals = []
+
+    def recognize(self, image_path, raw_txtfile, data=None, original=None):
+        self.calls += 1
+        self.originals.append(original)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "xin chào"
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "CACHE", None)
+    monkeypatch.setattr(ocr, "PREPROCESSOR", None)
+    monkeypatch.setattr(ocr, "_retry_delay", lambda exc, tries: 0.0)
+    ocr.reset_state()
+    job = ocr.OCRJob(reporting.Reporter(), tmp_path / "video.srt", tmp_path, keep_raw_texts=False, keep_texts=False)
+    job.open()
+    image = tmp_path / "0_00_01_000__0_00_02_000_1.jpeg"
+    image.write_bytes(b"image")
+    yield job, image
+    job.close()
+
+
+def test_a_client_error_fails_the_image_without_retrying(job, monkeypatch):
+    job, image = job
+    backend = _FlakyBackend([HttpError(httplib2.Response({"status": "400"}), b"{}")])
+    monkeypatch.setattr(ocr, "BACKEND", backend)
+    with pytest.raises(HttpError):
+        ocr.ocr_image(job, image, 1)
+    assert backend.calls == 1
+    assert job.failed == 1
+
+
+def test_transient_errors_are_retried(job, monkeypatch):
+    job, image = job
+    backend = _FlakyBackend([HttpError(httplib2.Response({"status": "503"}), b"{}"), ConnectionResetError("reset")])
+    monkeypatch.setattr(ocr, "BACKEND", backend)
+    ocr.ocr_image(job, image, 1)
+    assert backend.calls == 3
+    assert job.failed == 0
+    assert job.close() == 1
+
+
+def test_the_bytes_read_for_the_cache_lookup_are_uploaded(job, monkeypatch):
+    job, image = job
+    backend = _FlakyBackend()
+    monkeypatch.setattr(ocr, "BACKEND", backend)
+    monkeypatch.setattr(ocr, "CACHE", ocr_cache.OCRCache(image.parent / "cache.sqlite3", 1 << 20, 30))
+    ocr.ocr_image(job, image, 1)
+    ocr.CACHE.close()
+    assert backend.originals == [b"image"]
+
+
+def test_drive_uploads_bytes_in_memory_without_reading_the_file(tmp_path):
+    backend = backends.DriveBackend("folder", limiter=None, multipart_max_bytes=4)
+    missing = tmp_path / "gone.jpeg"
+    small = backend.media_body(missing, original=b"jpeg")
+    assert (small.mimetype(), small.resumable(), small.getbytes(0, 4)) == ("image/jpeg", False, b"jpeg")
+    large = backend.media_body(missing, original=b"jpeg data")
+    assert large.resumable()
+    preprocessed = backend.media_body(missing, b"png", b"jpeg")
+    assert (preprocessed.mimetype(), preprocessed.getbytes(0, 3)) == ("image/png", b"png")
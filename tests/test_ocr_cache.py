@@ -0,0 +1,75 @@
+import pytest
+
+from app import ocr_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(ocr_cache.time, "time", clock)
+    return clock
+
+
+def _cache(tmp_path, max_bytes=1 << 20, max_age_days=30):
+    return ocr_cache.OCRCache(tmp_path / "cache.sqlite3", max_bytes, max_age_days)
+
+
+def test_content_digest_depends_only_on_the_bytes(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"same")
+    (tmp_path / "b.png").write_bytes(b"same")
+    (tmp_path / "c.png").write_bytes(b"other")
+    digest, size = ocr_cache.content_digest(tmp_path / "a.png")
+    assert size == 4
+    assert ocr_cache.content_digest(tmp_path / "b.png")[0] == digest
+    assert ocr_cache.content_digest(tmp_path / "c.png")[0] != digest
+
+
+def test_lookup_counts_hits_misses_and_saved_bytes(tmp_path, clock):
+    cache = _cache(tmp_path)
+    assert cache.lookup("a", 100) is None
+    cache.store("a", "xin chào", 100)
+    assert cache.lookup("a", 100) == "xin chào"
+    assert (cache.hits, cache.misses, cache.bytes_saved) == (1, 1, 100)
+    assert cache.hit_rate == 0.5
+    cache.close()
+
+    reopened = _cache(tmp_path)
+    assert reopened.lookup("a") == "xin chào"
+    reopened.close()
+
+
+def test_the_least_recently_used_entries_go_first_over_the_size_limit(tmp_path, clock):
+    # Each entry costs its text plus the fixed overhead: three fit, a fourth does not.
+    cache = _cache(tmp_path, max_bytes=3 * (ocr_cache._ENTRY_OVERHEAD + 10))
+    for digest in "abc":
+        clock.now += 1
+        cache.store(digest, "x" * 10, 1)
+    clock.now += 1
+    cache.lookup("a")
+    clock.now += 1
+    cache.store("d", "x" * 10, 1)
+
+    assert cache.evict() == 1
+    assert cache.lookup("b") is None
+    assert [cache.lookup(digest) for digest in "acd"] == ["x" * 10] * 3
+    cache.close()
+
+
+def test_entries_unused_for_too_long_expire(tmp_path, clock):
+    cache = _cache(tmp_path, max_age_days=1)
+    cache.store("old", "cũ", 1)
+    clock.now += 3600
+    cache.store("recent", "mới", 1)
+    clock.now += 86400 - 1800
+    assert cache.evict() == 1
+    assert cache.lookup("old") is None
+    assert cache.lookup("recent") == "mới"
+    cache.close()
@@ -0,0 +1,40 @@
+from PIL import Image
+
+from app import backends, ocr, preprocess
+
+
+def _image(path):
+    image = Image.new("RGB", (200, 40), "black")
+    image.paste((255, 255, 255), (60, 12, 140, 28))
+    image.save(path)
+    return path
+
+
+def test_take_returns_the_prepared_png(tmp_path):
+    preprocessor = preprocess.Preprocessor(preprocess.Options(), workers=1)
+    try:
+        data = preprocessor.take(_image(tmp_path / "a.png"))
+    finally:
+        preprocessor.close()
+    assert data.startswith(b"\x89PNG")
+
+
+def test_take_after_close_falls_back_to_the_original(tmp_path):
+    image = _image(tmp_path / "a.png")
+    preprocessor = preprocess.Preprocessor(preprocess.Options(), workers=1)
+    preprocessor.prefetch(image)
+    preprocessor.close()
+    assert preprocessor.take(image) is None
+    assert preprocessor._executor is None
+
+
+def test_cache_keys_tell_preprocessed_uploads_apart(monkeypatch):
+    monkeypatch.setattr(ocr, "BACKEND", backends.OCRBackend())
+    monkeypatch.setattr(ocr, "PREPROCESSOR", None)
+    raw = ocr._cache_key("abc")
+    keys = {raw}
+    for options in (preprocess.Options(), preprocess.Options(binarize=True), preprocess.Options(min_text_height=48)):
+        monkeypatch.setattr(ocr, "PREPROCESSOR", preprocess.Preprocessor(options))
+        keys.add(ocr._cache_key("abc"))
+    assert raw == "abc"
+    assert len(keys) == 4
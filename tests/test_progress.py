@@ -0,0 +1,56 @@
+import pytest
+
+from app import progress
+
+
+def test_throughput_starts_from_the_first_sample_after_min_interval():
+    rate = progress.Throughput(alpha=0.5, min_interval=1.0)
+    rate.update(0, 10.0)
+    assert rate.rate is None
+    assert rate.eta(100) is None
+    rate.update(5, 10.5)
+    assert rate.rate is None
+    rate.update(20, 12.0)
+    assert rate.rate == pytest.approx(10.0)
+
+
+def test_throughput_weighs_new_samples_by_alpha():
+    rate = progress.Throughput(alpha=0.25, min_interval=0.0)
+    rate.update(0, 0.0)
+    rate.update(10, 1.0)
+    rate.update(30, 2.0)
+    assert rate.rate == pytest.approx(0.25 * 20 + 0.75 * 10)
+    rate.update(30, 4.0)
+    assert rate.rate == pytest.approx(0.75 * 12.5)
+    assert rate.eta(75) == pytest.approx(75 / (0.75 * 12.5))
+    assert rate.eta(-5) == 0.0
+
+
+def test_a_counter_that_goes_back_starts_a_new_baseline():
+    rate = progress.Throughput(alpha=1.0, min_interval=0.0)
+    rate.update(50, 0.0)
+    rate.update(60, 1.0)
+    rate.update(0, 2.0)
+    assert rate.rate == pytest.approx(10.0)
+    rate.update(4, 4.0)
+    assert rate.rate == pytest.approx(2.0)
+
+
+def test_the_bus_publishes_only_the_latest_state_at_its_rate(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(progress.time, "monotonic", lambda: clock[0])
+    published = []
+    bus = progress.ProgressBus(lambda bar, text: published.append((bar, text)), max_updates_per_second=2)
+    bus.update_ocr(1, 10)
+    bus.update_ocr(2, 10)
+    bus.pump()
+    assert published == [(20.0, "✅ Đã OCR: 2/10")]
+    bus.update_ocr(3, 10)
+    clock[0] += 0.1
+    bus.pump()
+    assert len(published) == 1
+    clock[0] += 0.5
+    bus.pump()
+    bus.pump(force=True)
+    assert published[-1][0] == 30.0
+    assert len(published) == 2
@@ -0,0 +1,75 @@
+import queue
+import types
+from pathlib import Path
+
+import pytest
+
+from app import ocr, reporting, scheduler
+
+
+def _video_job(name, images, batch_size=1):
+    video_job = scheduler.VideoJob(Path(f"{name}.mp4"), [], name, Path(f"{name}.srt"), "00:01:00", reporting.Reporter())
+    video_job.ocr_job = types.SimpleNamespace(name=name, start_time=None)
+    video_job.batches = ocr.batches([f"{name}{line}" for line in range(1, images + 1)], batch_size)
+    return video_job
+
+
+@pytest.fixture
+def feeder(monkeypatch):
+    """Run ``_feed`` with batch submission and job finishing recorded instead of done."""
+    monkeypatch.setattr(ocr, "STOP_FLAG", False)
+    batch = scheduler.PipelineScheduler(None, (True, True, False))
+    submitted, finished, arrivals = [], [], {}
+    ready: queue.Queue = queue.Queue()
+
+    def submit(executor, job, first_line, images, time_ranges, in_flight):
+        submitted.append(images[0])
+        in_flight.release()
+        for video_job in arrivals.pop(images[0], []):
+            ready.put(video_job)
+
+    monkeypatch.setattr(ocr, "submit_batch", submit)
+    monkeypatch.setattr(batch, "_start_finisher", lambda video_job, finishers: finished.append(video_job.ocr_job.name))
+
+    def feed(video_jobs, later=None):
+        for video_job in video_jobs:
+            ready.put(video_job)
+        arrivals.update(later or {})
+        pending = len(video_jobs) + sum(len(jobs) for jobs in (later or {}).values())
+        batch._feed(pending, ready, None, 2, [])
+        return submitted, finished
+
+    return feed
+
+
+def test_active_jobs_are_fed_one_task_each_in_turn(feeder):
+    submitted, finished = feeder([_video_job("a", 3), _video_job("b", 2), _video_job("c", 1)])
+    assert submitted == ["a1", "b1", "c1", "a2", "b2", "a3"]
+    assert finished == ["c", "b", "a"]
+
+
+def test_a_job_ready_later_joins_the_rotation_instead_of_waiting(feeder):
+    late = _video_job("d", 2)
+    submitted, finished = feeder([_video_job("a", 4, batch_size=2), _video_job("b", 3)], later={"b1": [late]})
+    # d joins the back of the rotation as soon as it is ready, behind the jobs already running.
+    assert submitted == ["a1", "b1", "a3", "b2", "d1", "b3", "d2"]
+    assert finished == ["a", "b", "d"]
+    assert late.ocr_job.start_time is not None
+
+
+def test_jobs_without_images_are_not_fed(feeder):
+    empty = _video_job("e", 0)
+    empty.batches = None
+    submitted, finished = feeder([empty, _video_job("a", 1)])
+    assert submitted == ["a1"]
+    assert finished == ["a"]
+
+
+def test_a_stop_finishes_every_job_already_open(feeder, monkeypatch):
+    def stop_after_first(executor, job, first_line, images, time_ranges, in_flight):
+        monkeypatch.setattr(ocr, "STOP_FLAG", True)
+        in_flight.release()
+
+    monkeypatch.setattr(ocr, "submit_batch", stop_after_first)
+    _, finished = feeder([_video_job("a", 3), _video_job("b", 2)])
+    assert sorted(finished) == ["a", "b"]
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+from app import manifest, segments, timecodes
+from stub_vsf import FRAME_MS, write_timeline
+
+STUB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "stub_vsf.py")
+SETTINGS = {"vsf_segments": 3, "vsf_segment_overlap_ms": 2000, "vsf_min_segment_seconds": 60}
+
+
+def test_plan_for_video_splits_into_owned_ranges_with_overlap():
+    plan = segments.plan_for_video(SETTINGS, "00:06:00")
+    assert [segment.index for segment in plan] == [1, 2, 3]
+    assert [(segment.own_start_ms, segment.own_end_ms) for segment in plan] == [
+        (0, 120_000),
+        (120_000, 240_000),
+        (240_000, None),
+    ]
+    assert [(segment.start_ms, segment.end_ms) for segment in plan] == [
+        (0, 122_000),
+        (118_000, 242_000),
+        (238_000, None),
+    ]
+
+
+def test_plan_for_video_leaves_short_or_unsplit_videos_whole():
+    assert segments.plan_for_video(SETTINGS, "00:01:30") == []
+    assert segments.plan_for_video(dict(SETTINGS, vsf_segments=1), "01:00:00") == []
+    assert segments.plan_for_video(SETTINGS, "not a duration") == []
+    assert len(segments.plan_for_video(SETTINGS, "00:02:00")) == 2
+
+
+def _run_stub(timeline, segment, output_base):
+    command = [sys.executable, STUB, "--cost", "0", "-c", "-r", "-i", str(timeline)]
+    command += ["-o", segment.folder(output_base), "-s", timecodes.format_vsf_time(segment.start_ms)]
+    if segment.end_ms is not None:
+        command += ["-e", timecodes.format_vsf_time(segment.end_ms)]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def test_merge_keeps_one_image_per_subtitle_across_the_cuts(tmp_path):
+    duration_ms = 360_000
+    timeline = tmp_path / "video.json"
+    lines = write_timeline(timeline, duration_ms, seed=2)
+    plan = segments.plan_for_video(SETTINGS, timecodes.format_clock(duration_ms))
+    output_base = str(tmp_path / "out")
+    for segment in plan:
+        _run_stub(timeline, segment, output_base)
+
+    cuts = [segment.own_end_ms for segment in plan[:-1]]
+    # Lines read by both neighbours of a cut come out of both stub runs.
+    shared = [line for line in lines if any(line[1] > cut - 2000 and line[0] < cut + 2000 for cut in cuts)]
+    crossing = [line for line in lines if any(line[0] < cut < line[1] for cut in cuts)]
+    assert shared and crossing
+
+    merged, duplicates = segments.merge_segments(plan, output_base)
+    assert duplicates == len(shared)
+    assert merged == len(lines)
+    assert not os.path.exists(os.path.join(output_base, segments.SEGMENTS_FOLDER))
+
+    images = manifest.walk_images(os.path.join(output_base, "RGBImages"))
+    times = sorted(timecodes.parse_vsf_name(name) for name in images)
+    assert len(times) == len(lines)
+    for (start_ms, end_ms), (line_start, line_end, _) in zip(times, lines):
+        # Each kept image spans its whole line: the copy cut at a segment edge was widened, not kept.
+        assert abs(start_ms - line_start) <= FRAME_MS
+        assert abs(end_ms - line_end) <= FRAME_MS
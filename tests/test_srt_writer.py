@@ -0,0 +1,116 @@
+from app import srt_writer
+from app.timecodes import SubtitleEvent
+
+
+def _event(line, text=None):
+    return SubtitleEvent(line, line * 1000, line * 1000 + 500, text or f"line {line}")
+
+
+def _texts(path):
+    blocks = [block.split("\n") for block in path.read_text(encoding="utf-8").strip().split("\n\n") if block]
+    return [(int(block[0]), block[2]) for block in blocks]
+
+
+def test_out_of_order_entries_are_written_in_line_order(tmp_path):
+    writer = srt_writer.SRTWriter(tmp_path / "a.srt")
+    for line in (3, 1, 5, 2, 4):
+        writer.add(_event(line))
+    assert writer.close() == 5
+    assert _texts(tmp_path / "a.srt") == [(index, f"line {index}") for index in range(1, 6)]
+
+
+def test_later_lines_wait_for_earlier_ones(tmp_path):
+    writer = srt_writer.SRTWriter(tmp_path / "a.srt", flush_every=1)
+    writer.add(_event(2))
+    writer.add(_event(3))
+    assert writer.written == 0
+    assert writer.buffered == 2
+    writer.add(_event(1))
+    assert writer.written == 3
+    assert writer.buffered == 0
+    writer.close()
+
+
+def test_skipped_lines_release_the_buffer_and_entries_are_renumbered(tmp_path):
+    writer = srt_writer.SRTWriter(tmp_path / "a.srt")
+    writer.add(_event(3))
+    writer.skip(2)
+    writer.add(_event(1))
+    writer.skip(4)
+    writer.add(_event(5))
+    assert writer.buffered == 0
+    assert writer.close() == 3
+    assert _texts(tmp_path / "a.srt") == [(1, "line 1"), (2, "line 3"), (3, "line 5")]
+
+
+def test_file_on_disk_is_a_valid_prefix_before_close(tmp_path):
+    path = tmp_path / "a.srt"
+    writer = srt_writer.SRTWriter(path, flush_every=1)
+    writer.add(_event(1))
+    writer.add(_event(3))
+    assert _texts(writer.partial_path) == [(1, "line 1")]
+    writer.close()
+    assert not writer.partial_path.exists()
+
+
+def test_close_writes_what_is_buffered_past_a_gap(tmp_path):
+    writer = srt_writer.SRTWriter(tmp_path / "a.srt")
+    writer.add(_event(1))
+    writer.add(_event(4))
+    writer.add(_event(3))
+    assert writer.close() == 3
+    assert writer.close() == 3
+    assert _texts(tmp_path / "a.srt") == [(1, "line 1"), (2, "line 3"), (3, "line 4")]
+
+
+def test_skipping_a_written_line_is_harmless(tmp_path):
+    writer = srt_writer.SRTWriter(tmp_path / "a.srt")
+    writer.add(_event(1))
+    writer.skip(1)
+    assert writer.buffered == 0
+    writer.add(_event(2))
+    assert writer.close() == 2
+
+
+def test_sort_by_time_rewrites_the_file_in_timeline_order_on_close(tmp_path):
+    path = tmp_path / "a.srt"
+    writer = srt_writer.SRTWriter(path, sort_by_time=True)
+    # Lines in arrival order; line 1 arrived last but starts first.
+    writer.add(SubtitleEvent(1, 9000, 9500, "late"))
+    writer.add(SubtitleEvent(2, 1000, 1500, "first"))
+    writer.skip(3)
+    writer.add(SubtitleEvent(4, 5000, 5500, "middle"))
+    assert writer.close() == 3
+    assert _texts(path) == [(1, "first"), (2, "middle"), (3, "late")]
+
+
+def test_without_sort_by_time_entries_keep_line_order(tmp_path):
+    writer = srt_writer.SRTWriter(tmp_path / "a.srt")
+    writer.add(SubtitleEvent(1, 9000, 9500, "late"))
+    writer.add(SubtitleEvent(2, 1000, 1500, "first"))
+    writer.close()
+    assert _texts(tmp_path / "a.srt") == [(1, "late"), (2, "first")]
+
+
+def test_a_run_that_writes_nothing_keeps_the_existing_srt(tmp_path):
+    path = tmp_path / "a.srt"
+    path.write_text("1\n00:00:01,000 --> 00:00:02,000\nold\n\n", encoding="utf-8")
+    writer = srt_writer.SRTWriter(path)
+    assert _texts(path) == [(1, "old")]
+    writer.skip(1)
+    assert writer.close() == 0
+    assert _texts(path) == [(1, "old")]
+    assert not writer.partial_path.exists()
+
+
+def test_entries_or_replace_empty_replace_the_existing_srt(tmp_path):
+    path = tmp_path / "a.srt"
+    path.write_text("1\n00:00:01,000 --> 00:00:02,000\nold\n\n", encoding="utf-8")
+    writer = srt_writer.SRTWriter(path)
+    writer.add(_event(1))
+    writer.close()
+    assert _texts(path) == [(1, "line 1")]
+
+    empty = srt_writer.SRTWriter(path)
+    assert empty.close(replace_empty=True) == 0
+    assert path.read_text(encoding="utf-8") == ""
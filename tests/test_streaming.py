@@ -0,0 +1,107 @@
+import threading
+import time
+
+from app import streaming
+
+
+def _write(path, size=10):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def _drain(stream, timeout=10.0):
+    images = []
+    done = threading.Event()
+
+    def consume():
+        images.extend(stream.iter_images())
+        done.set()
+
+    threading.Thread(target=consume, daemon=True).start()
+    assert done.wait(timeout), "the stream never ended"
+    return images
+
+
+def test_stream_forwards_settled_images_and_ends_on_close(tmp_path):
+    stream = streaming.ImageStream(settle_interval=0.01)
+    paths = [_write(tmp_path / f"{index}.jpeg") for index in range(5)]
+    for path in paths:
+        stream.submit(str(path))
+    stream.submit(str(paths[0]))
+    stream.close()
+    assert sorted(_drain(stream)) == paths
+    assert stream.submitted == 5
+
+
+def test_stream_ignores_non_images_and_drops_empty_files(tmp_path):
+    stream = streaming.ImageStream(settle_interval=0.01)
+    image = _write(tmp_path / "a.png")
+    stream.submit(str(_write(tmp_path / "notes.txt")))
+    stream.submit(str(_write(tmp_path / "empty.jpeg", 0)))
+    stream.submit(str(image))
+    stream.close()
+    assert _drain(stream) == [image]
+
+
+def test_close_picks_up_files_the_watcher_missed(tmp_path):
+    stream = streaming.ImageStream(settle_interval=0.01)
+    seen = _write(tmp_path / "1.jpeg")
+    (tmp_path / "sub").mkdir()
+    missed = _write(tmp_path / "sub" / "2.jpeg")
+    stream.submit(str(seen))
+    stream.close(str(tmp_path))
+    assert sorted(_drain(stream)) == [seen, missed]
+
+
+def test_submit_after_close_is_ignored(tmp_path):
+    stream = streaming.ImageStream(settle_interval=0.01)
+    stream.close()
+    stream.submit(str(_write(tmp_path / "late.jpeg")))
+    assert _drain(stream) == []
+
+
+def test_cancel_and_should_stop_end_the_iteration(tmp_path):
+    stream = streaming.ImageStream(settle_interval=0.01)
+    stream.submit(str(_write(tmp_path / "a.jpeg")))
+    stream.cancel()
+    assert _drain(stream) == []
+
+    stream = streaming.ImageStream(settle_interval=0.01)
+    assert list(stream.iter_images(lambda: True)) == []
+
+
+def test_streamed_run_writes_the_srt_in_timeline_order(tmp_path):
+    from bench_pipeline import offline_credentials, scenario_directory
+    from corpus import generate_corpus
+    from fake_drive import FakeDriveServer
+
+    from app import ocr, reporting, timecodes
+
+    folder = tmp_path / "RGBImages"
+    generate_corpus(folder, lines=6, duplicates=0)
+    images = sorted(folder.iterdir())
+    stream = streaming.ImageStream(settle_interval=0.01)
+
+    def produce():
+        # Later subtitles first, each in its own settle batch, as a watcher that saw the first files late would.
+        for image in reversed(images):
+            stream.submit(str(image))
+            time.sleep(0.05)
+        stream.close()
+
+    with FakeDriveServer() as server, offline_credentials():
+        pipeline = {"drive_root_url": server.root_url, "ocr_cache": False, "drive_sweep_orphans": False}
+        with scenario_directory({"threads": 1, "delete_raw_texts": True, "delete_texts": True}, pipeline) as workdir:
+            producer = threading.Thread(target=produce, daemon=True)
+            producer.start()
+            saved = ocr.start_processing(
+                reporting.Reporter(), str(workdir / "video.srt"), str(folder), True, True, False, None, stream
+            )
+            producer.join()
+            srt = (workdir / "video.srt").read_text(encoding="utf-8")
+
+    assert saved
+    blocks = [block.split("\n") for block in srt.strip().split("\n\n")]
+    assert [int(block[0]) for block in blocks] == list(range(1, len(images) + 1))
+    starts = [block[1].split(" --> ")[0] for block in blocks]
+    assert starts == [timecodes.format_srt_time(timecodes.parse_vsf_name(image.name)[0]) for image in images]
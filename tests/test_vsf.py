@@ -0,0 +1,77 @@
+import os
+import signal
+import sys
+import time
+
+import pytest
+from stub_vsf import write_timeline
+
+from app import reporting, vsf
+
+STUB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "stub_vsf.py")
+IGNORE_TERM = (
+    "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print('%1', flush=True); time.sleep(60)"
+)
+
+posix_only = pytest.mark.skipif(os.name == "nt", reason="terminate() already kills on Windows")
+
+
+class _Progress(reporting.Reporter):
+    def __init__(self):
+        self.percentages = []
+
+    def extraction_progress(self, percentage, text=""):
+        self.percentages.append(percentage)
+
+
+def _first_line(vsf_process):
+    """Wait until the child has printed, so it is past its setup."""
+    return next(vsf_process.lines())
+
+
+def test_both_pipes_are_drained_and_the_stderr_tail_is_kept():
+    chatty = "import sys\nfor i in range(5000): print('warning', i, file=sys.stderr)\nprint('%100', flush=True)\n"
+    vsf_process = vsf.VsfProcess([sys.executable, "-c", chatty]).start()
+    vsf_process.follow(vsf._Progress(_Progress(), 1))
+    assert vsf_process.wait() == 0
+    assert len(vsf_process.stderr_lines) == vsf.STDERR_TAIL
+    assert vsf_process.stderr_lines[-1] == "warning 4999"
+    vsf_process.close()
+
+
+@posix_only
+def test_cancel_terminates_a_running_vsf(tmp_path):
+    timeline = tmp_path / "video.json"
+    write_timeline(timeline, 600_000)
+    command = [sys.executable, STUB, "--cost", "2", "-c", "-r", "-i", str(timeline), "-o", str(tmp_path / "out")]
+    vsf_process = vsf.VsfProcess(command).start()
+    assert vsf_process in vsf.RUNNING.processes
+    _first_line(vsf_process)
+    started = time.monotonic()
+    vsf_process.cancel(grace_seconds=5)
+    assert time.monotonic() - started < 2
+    assert vsf_process.cancelled
+    assert vsf_process.wait() == -signal.SIGTERM
+    vsf_process.close()
+    assert vsf_process not in vsf.RUNNING.processes
+
+
+@posix_only
+def test_cancel_kills_a_vsf_that_ignores_terminate():
+    vsf_process = vsf.VsfProcess([sys.executable, "-c", IGNORE_TERM]).start()
+    _first_line(vsf_process)
+    started = time.monotonic()
+    vsf_process.cancel(grace_seconds=0.3)
+    assert 0.3 <= time.monotonic() - started < 5
+    assert vsf_process.wait() == -signal.SIGKILL
+    vsf_process.close()
+
+
+def test_cancel_all_stops_every_tracked_vsf():
+    processes = [vsf.VsfProcess([sys.executable, "-c", "import time; time.sleep(60)"]).start() for _ in range(2)]
+    vsf.cancel_all()
+    assert all(vsf_process.wait() != 0 for vsf_process in processes)
+    assert all(vsf_process.cancelled for vsf_process in processes)
+    for vsf_process in processes:
+        vsf_process.close()
+    assert not [vsf_process for vsf_process in processes if vsf_process in vsf.RUNNING.processes]